@@ -0,0 +1,66 @@
+"""
+This script compares the training time and the F-measure of the numpy CRF learner with those of CRF++ on the same
+template, training and test files. It is run from the main directory as follows:
+
+    python3 -m benchmarks.crf_benchmark template training test [workers] [error_label]
+
+The numpy learner is trained with one worker process and with 'workers' processes (default is the number of CPUs).
+CRF++ is only benchmarked if 'crf_learn' is found, with as many threads as workers. Both are trained with the default
+parameters a = 'CRF-L2', c = 1 and f = 1.
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+from context_sensitive_spell_chk.numpy_crf import NumpyCRFLearner
+from context_sensitive_spell_chk.crf_pp_interface import CRFPlusPlusInterface
+
+
+def measure(learner, train, template, training, test, directory):
+
+    model = os.path.join(directory, "model")
+    start = time.perf_counter()
+    train(template, training, model)
+    training_time = time.perf_counter() - start
+    start = time.perf_counter()
+    learner.test(test, os.path.join(directory, "result"), model)
+    test_time = time.perf_counter() - start
+    precision = learner.compute_precision()
+    recall = learner.compute_recall()
+
+    return training_time, test_time, precision, recall, learner.compute_f_measure(precision, recall)
+
+
+if __name__ == '__main__':
+
+    if len(sys.argv) < 4:
+        print(__doc__)
+        sys.exit(1)
+
+    (template, training, test) = sys.argv[1:4]
+    workers = int(sys.argv[4]) if len(sys.argv) > 4 else os.cpu_count() or 1
+    error_label = sys.argv[5] if len(sys.argv) > 5 else "1"
+    directory = tempfile.mkdtemp()
+
+    rows = list()
+    for n in sorted({1, workers}):
+        learner = NumpyCRFLearner(error_label, workers=n)
+        rows.append(("numpy (" + str(n) + " workers)", measure(learner, learner.train, template, training, test,
+                                                                 directory)))
+    if shutil.which("crf_learn"):
+        learner = CRFPlusPlusInterface(error_label)
+        rows.append(("CRF++ (" + str(workers) + " threads)",
+                     measure(learner, lambda t, tr, m: learner.train(t, tr, m, threads=workers), template, training,
+                             test, directory)))
+    else:
+        print("crf_learn has not been found. CRF++ will not be benchmarked.")
+    shutil.rmtree(directory)
+
+    print('{0:24}{1:<16}{2:<16}{3:<14}{4:<14}{5}'.format('LEARNER', 'TRAINING (s)', 'TEST (s)', 'PRECISION',
+                                                         'RECALL', 'F-MEASURE'))
+    print('{:_<96}'.format(''))
+    for (name, (training_time, test_time, precision, recall, f_measure)) in rows:
+        print('{0:24}{1:<16.2f}{2:<16.2f}{3:<14.4f}{4:<14.4f}{5:.4f}'.format(name, training_time, test_time,
+                                                                             precision, recall, f_measure))
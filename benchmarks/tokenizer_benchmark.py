@@ -0,0 +1,102 @@
+"""
+This script compares the throughput of the tokenizer, whose regular expressions are compiled once, with that of
+dividing texts the way 'Preprocessor.chop_off_text_into_sentences' and 'Preprocessor.divide_sentence_into_words' used
+to do it, building the regular expressions on every call. It is run from the main directory as follows:
+
+    python3 -m benchmarks.tokenizer_benchmark [number_of_sentences]
+
+The texts are generated randomly from Arabic letters, so no corpus file is needed.
+"""
+
+import re
+import sys
+import time
+from context_sensitive_spell_chk.preprocessing import Preprocessor
+from benchmarks.vocabulary_benchmark import generate_sentences
+
+
+def old_chop_off_text_into_sentences(text, ar_sent_terminator_regex):
+
+    if text.isspace() or not text:
+        return
+
+    s = re.split("(" + ar_sent_terminator_regex + ")", text)
+    s = [word.strip() for word in s if word and not word.isspace()]
+
+    sentence = ""
+    final_list = list()
+    for sent in s:
+        if True if re.match(ar_sent_terminator_regex + "$", sent) else False:
+            final_list.append((sentence, sent))
+            sentence = ""
+        else:
+            sentence += sent
+
+    if sentence:
+        final_list.append((sentence, ""))
+
+    return final_list
+
+
+def old_divide_sentence_into_words(text, special_words_regex):
+
+    words_of_sent = re.split(r"\s|(" + special_words_regex + ")", text)
+    return [word for word in words_of_sent if word and not word.isspace()]
+
+
+def measure(function, argument):
+
+    size = sum(len(text.encode("utf-8")) for text in argument)
+    start = time.perf_counter()
+    function(argument)
+    elapsed = time.perf_counter() - start
+
+    return elapsed, size / elapsed / 2 ** 20
+
+
+if __name__ == "__main__":
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    sentences = generate_sentences(n)
+    # Lines of a few sentences each, with special words between some of the words
+    texts = [' '.join(s + t for (s, t) in sentences[i:i + 5]).replace(' ', ' - ', 1) for i in range(0, n, 5)]
+    sentence_texts = [s for (s, t) in sentences]
+    p = Preprocessor()
+    tokenizer = p.get_tokenizer()
+    terminators = p.get_ar_sent_terminator_regex()
+    special_words = p.get_special_words_regex()
+
+    # Every function keeps the results, as the callers do
+    def old_sentences(lines):
+        return [old_chop_off_text_into_sentences(line, terminators) for line in lines]
+
+    def old_words(lines):
+        return [old_divide_sentence_into_words(line, special_words) for line in lines]
+
+    def old_both(lines):
+        return [[(sent, terminator, old_divide_sentence_into_words(sent, special_words))
+                 for (sent, terminator) in old_chop_off_text_into_sentences(line, terminators)] for line in lines]
+
+    def new_sentences(lines):
+        return [tokenizer.split_sentences(line) for line in lines]
+
+    def new_words(lines):
+        return [tokenizer.split_words(line) for line in lines]
+
+    def new_both(lines):
+        return [tokenizer.split_text(line) for line in lines]
+
+    cases = (
+        ('sentences', 'regex built per call', old_sentences, texts),
+        ('sentences', 'Tokenizer.split_sentences', new_sentences, texts),
+        ('words', 'regex built per call', old_words, sentence_texts),
+        ('words', 'Tokenizer.split_words', new_words, sentence_texts),
+        ('words', 'Tokenizer.split_words_batch', tokenizer.split_words_batch, sentence_texts),
+        ('sentences+words', 'regex built per call', old_both, texts),
+        ('sentences+words', 'Tokenizer.split_text', new_both, texts),
+        )
+    print('{0:20}{1:32}{2:<16}{3}'.format('SPLITTING', 'METHOD', 'TIME (s)', 'THROUGHPUT (MB/s)'))
+    print('{:_<86}'.format(''))
+    for (what, method, function, argument) in cases:
+        (t, throughput) = measure(function, argument)
+        print('{0:20}{1:32}{2:<16.2f}{3:.2f}'.format(what, method, t, throughput))
@@ -0,0 +1,57 @@
+"""
+This script compares the memory used and the time taken to build the vocabulary of a corpus as a python dictionary
+and as a compact vocabulary. It is run from the main directory as follows:
+
+    python3 -m benchmarks.vocabulary_benchmark [number_of_sentences]
+
+The corpus is generated randomly from Arabic letters, so no corpus file is needed.
+"""
+
+import sys
+import itertools
+import time
+import random
+import tracemalloc
+from context_sensitive_spell_chk.preprocessing import Preprocessor
+
+
+def generate_sentences(number_of_sentences, number_of_distinct_words=50000, seed=10):
+
+    rnd = random.Random(seed)
+    letters = [chr(c) for c in range(0x0627, 0x064b)]
+    words = [''.join(rnd.choice(letters) for _ in range(rnd.randint(2, 9))) for _ in range(number_of_distinct_words)]
+    # Zipf-like choice of words so that frequent words appear in many sentences as in a real corpus
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(number_of_distinct_words)))
+    sentences = list()
+    for _ in range(number_of_sentences):
+        sentences.append((' '.join(rnd.choices(words, cum_weights=cum_weights, k=rnd.randint(5, 30))), '.'))
+
+    return sentences
+
+
+def measure(sentences, compact):
+
+    p = Preprocessor(sentences)
+    p.set_compact_vocabulary(compact)
+    start = time.perf_counter()
+    p.build_vocabulary()
+    elapsed = time.perf_counter() - start
+    # Build again with memory tracing switched on, as tracing slows down the building
+    p.clear_vocabulary()
+    tracemalloc.start()
+    p.build_vocabulary()
+    (current, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, current, peak
+
+
+if __name__ == "__main__":
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    corpus = generate_sentences(n)
+    print('{0:20}{1:<20}{2:<20}{3}'.format('VOCABULARY', 'BUILD TIME (s)', 'MEMORY (MB)', 'PEAK MEMORY (MB)'))
+    print('{:_<80}'.format(''))
+    for (name, is_compact) in (('dictionary', False), ('compact', True)):
+        (t, mem, peak_mem) = measure(corpus, is_compact)
+        print('{0:20}{1:<20.2f}{2:<20.1f}{3:.1f}'.format(name, t, mem / 2 ** 20, peak_mem / 2 ** 20))
@@ -0,0 +1,126 @@
+"""
+Created in 2016
+
+@authors: Atheer Alkhalifa, Lamia Alkwai, Waleed Alsanie and Mohamed Alkanhal
+         The National Center for Computation Technology & Applied Mathematics
+         {aalkhalifa,lalkwai,walsanie, alkanhal} [at] kacst [dot] edu [dot] sa
+
+This class is part of a context sensitive spell checking module. It is aimed to look up the words of a vocabulary
+which are within some editing distance from a given word without generating all the possible edits of the word.
+"""
+
+
+class CandidateIndex:
+
+    def __init__(self, vocabulary):
+        """
+        This is a constructor of a symmetric delete index (as in SymSpell) of the words of the given vocabulary.
+        Every vocabulary word is indexed under itself and under each string resulting from deleting one of its
+        characters. Two words which are one edit (deletion, insertion, replacement or transposition of two adjacent
+        characters) apart always share one of these keys, so the words one edit from a word are found by looking up
+        its own keys and checking the words found there.
+
+        The vocabulary is kept, and a word is only returned while it is in the vocabulary. So words deleted from the
+        vocabulary after the index has been built will not be returned, but words added to it will not be
+        returned either.
+        :param vocabulary: A vocabulary (a python dictionary or any object that supports iterating over its words
+        and checking the membership of a word).
+        :return:
+        """
+
+        self.__vocabulary = vocabulary
+        self.__index = dict()
+        # The words one edit from the vocabulary words, computed when first needed: {word: (word1, word2, ...)}
+        self.__neighbours = dict()
+        for word in vocabulary:
+            for key in CandidateIndex.__keys(word):
+                if key in self.__index:
+                    self.__index[key].append(word)
+                else:
+                    self.__index[key] = [word]
+
+    @staticmethod
+    def __keys(word):
+        """
+        This is a private method which returns the keys under which 'word' is indexed: the word itself and every
+        string resulting from deleting one of its characters.
+        """
+
+        keys = {word[:i] + word[i + 1:] for i in range(len(word))}
+        keys.add(word)
+        return keys
+
+    @staticmethod
+    def is_one_edit(s, t):
+        """
+        This method checks if 't' can be made from 's' by one deletion, insertion, replacement, or transposition of
+        two adjacent characters. These are the edits done by 'Preprocessor.edits1_in_vocabulary'.
+        :param s: First string
+        :param t: Second string
+        :return: True if 's' and 't' are one edit apart, False otherwise (including when they are equal).
+        """
+
+        len_s = len(s)
+        len_t = len(t)
+        if len_s < len_t:
+            (s, t, len_s, len_t) = (t, s, len_t, len_s)
+        if len_s - len_t > 1:
+            return False
+
+        i = 0                                           # find the first mismatching character
+        while i < len_t and s[i] == t[i]:
+            i += 1
+
+        if len_s != len_t:                              # one character of 's' is deleted
+            return s[i + 1:] == t[i:]
+        if i == len_s:                                  # equal strings
+            return False
+        if s[i + 1:] == t[i + 1:]:                      # one character is replaced
+            return True
+
+        return i + 1 < len_s and s[i] == t[i + 1] and s[i + 1] == t[i] and s[i + 2:] == t[i + 2:]
+
+    def __one_edit(self, word):
+        """
+        This is a private method which returns the indexed words which are one edit from 'word', whether they are
+        still in the vocabulary or not.
+        """
+
+        if word in self.__neighbours:
+            return self.__neighbours[word]
+
+        found = set()
+        for key in CandidateIndex.__keys(word):
+            for candidate in self.__index.get(key, ()):
+                if candidate not in found and CandidateIndex.is_one_edit(word, candidate):
+                    found.add(candidate)
+        found = tuple(found)
+        if word in self.__vocabulary:                   # only the edits of vocabulary words are kept
+            self.__neighbours[word] = found
+
+        return found
+
+    def candidates(self, word, d=1):
+        """
+        This method returns the vocabulary words reachable from 'word' by making 'd' edits, one after another, where
+        every intermediate word is in the vocabulary. For d=1 and d=2 the results are the same as those of
+        'Preprocessor.edits1_in_vocabulary' and 'Preprocessor.edits2_in_vocabulary'.
+        :param word: A word to find the vocabulary words which are 'd' edits from it.
+        :param d: The number of edits. Default is 1.
+        :return: A set of vocabulary words.
+        """
+
+        if d < 1:
+            print("ERROR: Cannot return words with edit distance! The distance has to be greater than 0!")
+            return
+
+        vocabulary = self.__vocabulary
+        found = {candidate for candidate in self.__one_edit(word) if candidate in vocabulary}
+        for _ in range(d - 1):
+            found = {
+                candidate
+                for previous in found
+                for candidate in self.__one_edit(previous) if candidate in vocabulary
+                    }
+
+        return found
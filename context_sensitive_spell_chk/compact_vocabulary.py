@@ -0,0 +1,264 @@
+"""
+Created in 2016
+
+@authors: Atheer Alkhalifa, Lamia Alkwai, Waleed Alsanie and Mohamed Alkanhal
+         The National Center for Computation Technology & Applied Mathematics
+         {aalkhalifa,lalkwai,walsanie, alkanhal} [at] kacst [dot] edu [dot] sa
+
+This class is part of a context sensitive spell checking module. It is aimed to provide a memory compact
+representation of the vocabulary built by the preprocessor.
+"""
+
+
+from array import array
+
+
+class Lexicon:
+
+    def __init__(self):
+        """
+        This is a constructor of a lexicon which interns words into consecutive integer identifiers. The first word
+        interned is given the identifier 0, the second 1 and so on.
+        :return:
+        """
+
+        self.__ids = dict()
+        self.__words = list()
+
+    def intern(self, word):
+        """
+        Returns the identifier of 'word'. If the word has not been seen before it is given a new identifier.
+        :param word: The word to intern.
+        :return: The identifier of the word.
+        """
+
+        word_id = self.__ids.get(word)
+        if word_id is None:
+            word_id = len(self.__words)
+            self.__ids[word] = word_id
+            self.__words.append(word)
+
+        return word_id
+
+    def get_id(self, word):
+        """
+        Returns the identifier of 'word' without interning it.
+        :param word: The word to look up.
+        :return: The identifier of the word, or None if the word has never been interned.
+        """
+
+        return self.__ids.get(word)
+
+    def get_word(self, word_id):
+        """
+        Returns the word whose identifier is 'word_id'.
+        :param word_id: An identifier returned by 'Lexicon.intern'.
+        :return: The word.
+        """
+
+        return self.__words[word_id]
+
+    def __len__(self):
+        return len(self.__words)
+
+
+class CompactVocabulary:
+
+    def __init__(self):
+        """
+        This is a constructor of an empty compact vocabulary. The vocabulary behaves like the python dictionary
+        built by 'Preprocessor.build_vocabulary':
+                           {word1:{sentence_num:[position1,position2,.... etc]},
+                            word2: .....
+                           }
+        but the words are interned into integer identifiers and the postings (sentence numbers and positions) of all
+        the words are kept in flat arrays indexed by an offsets array (CSR layout):
+                  postings of word i = __sentence_numbers[__offsets[i]:__offsets[i + 1]]
+                                       __positions[__offsets[i]:__offsets[i + 1]]
+        The entry of a word is converted into a python dictionary only when it is accessed through 'vocabulary[word]'.
+        That dictionary is kept, so that it can be updated in place the same way the dictionary vocabulary is updated.
+        :return:
+        """
+
+        self.__lexicon = Lexicon()
+        self.__offsets = array('Q', [0])
+        self.__sentence_numbers = array('I')
+        self.__positions = array('I')
+        # Number of words whose postings are kept in the arrays.
+        self.__number_of_frozen_words = 0
+        # Entries that have been accessed or added after the arrays were built: {word_id: {sentence_num: [positions]}}
+        self.__thawed = dict()
+        # Identifiers of words stored in the arrays which have been deleted from the vocabulary.
+        self.__deleted = set()
+        self.__size = 0
+
+    def build(self, sentences_words):
+        """
+        This method builds the vocabulary from the words of the sentences. Any previous content is wiped off.
+        :param sentences_words: An iterable whose elements are the lists of words of the sentences, in the order
+        of the sentences.
+        :return: The total number of words (tokens) found in the sentences.
+        """
+
+        self.__init__()
+        word_ids = array('I')
+        sentence_numbers = array('I')
+        positions = array('I')
+        intern = self.__lexicon.intern
+        for (sent_num, words) in enumerate(sentences_words):
+            for (position, word) in enumerate(words):
+                word_ids.append(intern(word))
+                sentence_numbers.append(sent_num)
+                positions.append(position)
+
+        # Counting sort of the postings by word identifier. The sort is stable, so the postings of each word stay
+        # ordered by sentence number and position.
+        number_of_words = len(self.__lexicon)
+        offsets = array('Q', bytes(8 * (number_of_words + 1)))
+        for word_id in word_ids:
+            offsets[word_id + 1] += 1
+        for i in range(number_of_words):
+            offsets[i + 1] += offsets[i]
+
+        cursor = offsets[:-1]
+        self.__sentence_numbers = array('I', bytes(4 * len(word_ids)))
+        self.__positions = array('I', bytes(4 * len(word_ids)))
+        for (i, word_id) in enumerate(word_ids):
+            k = cursor[word_id]
+            self.__sentence_numbers[k] = sentence_numbers[i]
+            self.__positions[k] = positions[i]
+            cursor[word_id] = k + 1
+
+        self.__offsets = offsets
+        self.__number_of_frozen_words = number_of_words
+        self.__size = number_of_words
+
+        return len(word_ids)
+
+    def __postings(self, word_id):
+        """
+        This is a private method which converts the postings of a word kept in the arrays to a python dictionary.
+        :param word_id: The identifier of the word.
+        :return: {sentence_num: [positions]}
+        """
+
+        postings = dict()
+        for k in range(self.__offsets[word_id], self.__offsets[word_id + 1]):
+            sent_num = self.__sentence_numbers[k]
+            if sent_num in postings:
+                postings[sent_num].append(self.__positions[k])
+            else:
+                postings[sent_num] = [self.__positions[k]]
+
+        return postings
+
+    def __present_id(self, word):
+        """
+        This is a private method which returns the identifier of 'word' if it is in the vocabulary, None otherwise.
+        """
+
+        word_id = self.__lexicon.get_id(word)
+        if word_id is None:
+            return None
+        if word_id in self.__thawed:
+            return word_id
+        if word_id < self.__number_of_frozen_words and word_id not in self.__deleted:
+            return word_id
+
+        return None
+
+    def __contains__(self, word):
+        return self.__present_id(word) is not None
+
+    def __getitem__(self, word):
+        word_id = self.__present_id(word)
+        if word_id is None:
+            raise KeyError(word)
+        if word_id not in self.__thawed:
+            self.__thawed[word_id] = self.__postings(word_id)
+
+        return self.__thawed[word_id]
+
+    def __setitem__(self, word, postings):
+        if self.__present_id(word) is None:
+            self.__size += 1
+        word_id = self.__lexicon.intern(word)
+        self.__deleted.discard(word_id)
+        self.__thawed[word_id] = postings
+
+    def __delitem__(self, word):
+        word_id = self.__present_id(word)
+        if word_id is None:
+            raise KeyError(word)
+        self.__thawed.pop(word_id, None)
+        if word_id < self.__number_of_frozen_words:
+            self.__deleted.add(word_id)
+        self.__size -= 1
+
+    def __len__(self):
+        return self.__size
+
+    def __iter__(self):
+        for word_id in range(len(self.__lexicon)):
+            if word_id in self.__thawed or \
+                    (word_id < self.__number_of_frozen_words and word_id not in self.__deleted):
+                yield self.__lexicon.get_word(word_id)
+
+    def keys(self):
+        return iter(self)
+
+    def items(self):
+        """
+        Returns (word, {sentence_num: [positions]}) pairs. Unlike 'vocabulary[word]', the dictionaries of the words
+        which have not been accessed before are not kept, so iterating over the items does not grow the memory used.
+        """
+
+        for word in self:
+            word_id = self.__lexicon.get_id(word)
+            if word_id in self.__thawed:
+                yield (word, self.__thawed[word_id])
+            else:
+                yield (word, self.__postings(word_id))
+
+    def get(self, word, default=None):
+        return self[word] if word in self else default
+
+    def remove_sentence(self, sent_num):
+        """
+        This method deletes the postings of sentence number 'sent_num' and reduces by one the sentence number of
+        every posting whose sentence number is greater than 'sent_num'. Words which do not appear in any other
+        sentence are deleted from the vocabulary.
+        :param sent_num: The number of the sentence that has been removed from the corpus.
+        :return: None
+        """
+
+        offsets = array('Q', [0])
+        sentence_numbers = array('I')
+        positions = array('I')
+        for word_id in range(self.__number_of_frozen_words):
+            for k in range(self.__offsets[word_id], self.__offsets[word_id + 1]):
+                s = self.__sentence_numbers[k]
+                if s != sent_num:
+                    sentence_numbers.append(s - 1 if s > sent_num else s)
+                    positions.append(self.__positions[k])
+            offsets.append(len(sentence_numbers))
+            if offsets[-1] == offsets[-2] and word_id not in self.__thawed and word_id not in self.__deleted:
+                self.__deleted.add(word_id)
+                self.__size -= 1
+
+        self.__offsets = offsets
+        self.__sentence_numbers = sentence_numbers
+        self.__positions = positions
+
+        for word_id in list(self.__thawed):
+            postings = self.__thawed[word_id]
+            postings.pop(sent_num, None)
+            if not postings:
+                del self.__thawed[word_id]
+                if word_id < self.__number_of_frozen_words:
+                    self.__deleted.add(word_id)
+                self.__size -= 1
+            else:
+                self.__thawed[word_id] = {
+                    (s - 1 if s > sent_num else s): pos for (s, pos) in postings.items()
+                }
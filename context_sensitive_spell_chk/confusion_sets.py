@@ -0,0 +1,145 @@
+"""
+Created in 2016
+
+@authors: Atheer Alkhalifa, Lamia Alkwai, Waleed Alsanie and Mohamed Alkanhal
+         The National Center for Computation Technology & Applied Mathematics
+         {aalkhalifa,lalkwai,walsanie, alkanhal} [at] kacst [dot] edu [dot] sa
+
+This class is part of a context sensitive spell checking module. It is aimed to keep the confusion sets of the words
+list, i.e. the vocabulary words with which each word of the list can be replaced to make an error, between runs.
+"""
+
+
+import os
+import hashlib
+from .candidate_index import CandidateIndex
+
+
+class ConfusionSetCatalog:
+
+    # The confusion sets are kept for the distances from 1 to MAX_DISTANCE
+    MAX_DISTANCE = 2
+
+    def __init__(self, vocabulary, words_list, cache_file=None):
+        """
+        This is a constructor of a catalog of the confusion sets of the words of a words list. The confusion set of
+        a word with distance d is the sorted list of the vocabulary words which are 'd' edits from it (see
+        'CandidateIndex.candidates'). The sets for the distances up to MAX_DISTANCE are computed here for the words
+        which do not have them yet.
+
+        If a cache file is given, the sets in it are loaded, provided that they have been computed from the same
+        vocabulary (the file is keyed by a hash of the vocabulary words, see 'get_vocabulary_key'), and the file is
+        rewritten if some sets had to be computed. The vocabulary is only indexed if a set is missing.
+        :param vocabulary: The vocabulary from which the confusion sets are looked up.
+        :param words_list: An iterable of the words whose confusion sets are kept.
+        :param cache_file: The file where the confusion sets are kept between runs. Default is None (no file).
+        :return:
+        """
+
+        self.__vocabulary = frozenset(vocabulary)
+        self.__key = ConfusionSetCatalog.get_vocabulary_key(self.__vocabulary)
+        self.__cache_file = cache_file
+        self.__candidate_index = None
+        # The confusion sets as follows: {word: (set with distance 1, set with distance 2, ...)}
+        self.__sets = dict()
+        if cache_file is not None:
+            self.__load()
+
+        missing = sorted(set(word for word in words_list if word not in self.__sets))
+        for word in missing:
+            self.__sets[word] = tuple(self.__compute(word, d) for d in range(1, ConfusionSetCatalog.MAX_DISTANCE + 1))
+        if missing and cache_file is not None:
+            self.save()
+
+    @staticmethod
+    def get_vocabulary_key(vocabulary):
+        """
+        Returns the key of a vocabulary: the SHA-256 digest of its sorted words, so it does not depend on the order
+        in which the words are kept.
+        :param vocabulary: An iterable of the vocabulary words.
+        :return: The key as a string of hexadecimal digits.
+        """
+
+        digest = hashlib.sha256()
+        for word in sorted(vocabulary):
+            digest.update(word.encode("utf-8") + b"\n")
+
+        return digest.hexdigest()
+
+    def get_key(self):
+        """
+        :return: The key of the vocabulary of the catalog.
+        """
+
+        return self.__key
+
+    def __compute(self, word, d):
+        """
+        This is a private method which computes the confusion set of 'word' with distance 'd'.
+        """
+
+        if self.__candidate_index is None:
+            self.__candidate_index = CandidateIndex(self.__vocabulary)
+
+        return tuple(sorted(self.__candidate_index.candidates(word, d)))
+
+    def __load(self):
+        """
+        This is a private method which loads the confusion sets from the cache file.
+        """
+
+        if not os.path.isfile(self.__cache_file):
+            return
+
+        in_f = open(self.__cache_file, 'rt', encoding="utf-8")
+        if in_f.readline().rstrip("\n") == "# " + self.__key:
+            for line in in_f:
+                fields = line.rstrip("\n").split("\t")
+                if len(fields) == ConfusionSetCatalog.MAX_DISTANCE + 1:
+                    self.__sets[fields[0]] = tuple(tuple(field.split()) for field in fields[1:])
+        else:
+            print("The confusion sets in " + self.__cache_file + " have been computed from another vocabulary. "
+                  "They will be computed again.")
+        in_f.close()
+
+    def save(self):
+        """
+        This method writes the confusion sets to the cache file given to the constructor. The first line of the file
+        is the key of the vocabulary, and each other line has a word followed by its confusion sets with the
+        distances from 1 to MAX_DISTANCE, separated by tabs. The words of a set are separated by spaces.
+        :return: None
+        """
+
+        if self.__cache_file is None:
+            print("ERROR: Cannot save the confusion sets! No cache file has been given.")
+            return
+
+        out_f = open(self.__cache_file, 'wt', encoding="utf-8")
+        out_f.write("# " + self.__key + "\n")
+        for word in sorted(self.__sets):
+            out_f.write(word + "\t" + "\t".join(" ".join(words) for words in self.__sets[word]) + "\n")
+        out_f.close()
+
+    def __len__(self):
+        return len(self.__sets)
+
+    def __contains__(self, word):
+        return word in self.__sets
+
+    def get_confusion_set(self, word, d=1):
+        """
+        Returns the confusion set of a word. Sets which are not in the catalog (of other words or with distances
+        greater than MAX_DISTANCE) are computed, but not kept.
+        :param word: The word.
+        :param d: The number of edits between the word and the words of the set. Default is 1.
+        :return: A sorted tuple of vocabulary words.
+        """
+
+        if d < 1:
+            print("ERROR: Cannot return the confusion set! The distance has to be greater than 0!")
+            return
+
+        if word in self.__sets and d <= ConfusionSetCatalog.MAX_DISTANCE:
+            return self.__sets[word][d - 1]
+
+        return self.__compute(word, d)
@@ -0,0 +1,325 @@
+"""
+Created in 2016
+
+@authors: Atheer Alkhalifa, Lamia Alkwai, Waleed Alsanie and Mohamed Alkanhal
+         The National Center for Computation Technology & Applied Mathematics
+         {aalkhalifa,lalkwai,walsanie, alkanhal} [at] kacst [dot] edu [dot] sa
+
+This class is part of a context sensitive spell checking module. It is aimed to label sentences with a CRF++ model
+in this process, as 'crf_test' does, without running 'crf_test' for every test.
+"""
+
+
+import re
+import numpy as np
+
+
+class CRFDecoder:
+
+    # The values of the positions before and after a sentence, as CRF++ names them
+    BOS = ["_B-" + str(i) for i in range(1, 9)]
+    EOS = ["_B+" + str(i) for i in range(1, 9)]
+    # A macro of a template, e.g. %x[-1,0] for the first column of the previous token
+    MACRO = re.compile(r"%x\[(-?[0-9]+),([0-9]+)\]")
+
+    def __init__(self, model_file):
+        """
+        This is a constructor of a decoder of a CRF++ model. The model has to be the text model written by
+        'crf_learn -t' (the file with '.txt' added to the name of the model file). The model is loaded once, and
+        it can be used to label any number of sentences.
+
+        The sentences are labelled as 'crf_test' labels them: the features of each token are made by expanding the
+        templates of the model, the costs of the labels and of the transitions between them are summed from the
+        weights of the features, and the labels with the best total cost are found by the Viterbi algorithm. The
+        probabilities are the marginal probabilities computed by the forward-backward algorithm.
+
+        A ValueError is raised if the number of the weights in the file is not that in its header, as a model which
+        has been cut off would label the sentences wrongly.
+        :param model_file: The text model file.
+        :return:
+        """
+
+        f = open(model_file, 'rt', encoding="utf-8")
+        header = dict()
+        for line in f:
+            if line.isspace():
+                break
+            (name, _, value) = line.partition(":")
+            header[name.strip()] = value.strip()
+        self.__cost_factor = float(header["cost-factor"])
+        self.__xsize = int(header["xsize"])
+        max_id = int(header["maxid"])
+
+        self.__labels = list()
+        for line in f:
+            if line.isspace():
+                break
+            self.__labels.append(line.rstrip("\n"))
+
+        self.__unigram_templates = list()
+        self.__bigram_templates = list()
+        for line in f:
+            if line.isspace():
+                break
+            template = line.rstrip("\n")
+            if template.startswith("U"):
+                self.__unigram_templates.append(CRFDecoder.compile_template(template, self.__xsize))
+            elif template.startswith("B"):
+                self.__bigram_templates.append(CRFDecoder.compile_template(template, self.__xsize))
+
+        # The features as follows: {feature: the id of its first weight}
+        self.__features = dict()
+        for line in f:
+            if line.isspace():
+                break
+            (feature_id, _, feature) = line.rstrip("\n").partition(" ")
+            self.__features[feature] = int(feature_id)
+
+        self.__weights = np.array([float(line) for line in f if not line.isspace()], dtype=np.float64)
+        f.close()
+
+        if len(self.__weights) != max_id:
+            raise ValueError("The model file " + model_file + " has " + str(len(self.__weights)) +
+                             " weights instead of " + str(max_id) + "!")
+
+    @staticmethod
+    def compile_template(template, xsize):
+        """
+        This method divides a template into its literal parts and its macros. As CRF++ does, a template with a macro
+        which cannot be expanded (a '%' which is not a valid macro, a row farther than 8 tokens or a column out of
+        range) never gives a feature.
+        :param template: The template, e.g. 'U02:%x[-1,0]/%x[0,0]'.
+        :param xsize: The number of the columns of the tokens.
+        :return: A list of the literal parts (strings) and macros (2-tuple (row, column)), or None.
+        """
+
+        parts = list()
+        start = 0
+        for match in CRFDecoder.MACRO.finditer(template):
+            parts.append(template[start:match.start()])
+            (row, column) = (int(match.group(1)), int(match.group(2)))
+            if not -8 <= row <= 8 or column >= xsize:
+                return
+            parts.append((row, column))
+            start = match.end()
+        parts.append(template[start:])
+
+        if any('%' in part for part in parts if isinstance(part, str)):
+            return
+
+        return parts
+
+    def get_labels(self):
+        """
+        :return: The list of the labels of the model.
+        """
+
+        return self.__labels
+
+    def get_xsize(self):
+        """
+        :return: The number of the columns of the tokens which the templates of the model use.
+        """
+
+        return self.__xsize
+
+    @staticmethod
+    def expand_templates(templates, tokens, position):
+        """
+        This method expands the given templates at a position of a sentence into features, as CRF++ does.
+        :param templates: A list of templates compiled by 'compile_template'.
+        :param tokens: The tokens of the sentence. Each token is a list of its columns.
+        :param position: The position of the token in the sentence.
+        :return: A list of the features (strings).
+        """
+
+        size = len(tokens)
+        features = list()
+        for parts in templates:
+            if parts is None:
+                continue
+            values = list()
+            for part in parts:
+                if isinstance(part, str):
+                    values.append(part)
+                    continue
+                index = position + part[0]
+                if index < 0:
+                    values.append(CRFDecoder.BOS[-index - 1])
+                elif index >= size:
+                    values.append(CRFDecoder.EOS[index - size])
+                else:
+                    values.append(tokens[index][part[1]])
+            features.append(''.join(values))
+
+        return features
+
+    def __feature_ids(self, templates, tokens, position):
+        """
+        This is a private method which expands the given templates at a position of a sentence.
+        :return: The ids of the features which are in the model.
+        """
+
+        features = self.__features
+        return [features[feature] for feature in CRFDecoder.expand_templates(templates, tokens, position)
+                if feature in features]
+
+    def compute_costs(self, tokens):
+        """
+        This method computes the costs of the labels of the tokens of a sentence and of the transitions between the
+        labels of adjacent tokens, as CRF++ does.
+        :param tokens: The tokens of the sentence. Each token is a list of its columns.
+        :return: A 2-tuple of numpy arrays (costs of the labels with shape (tokens, labels), costs of the transitions
+        with shape (tokens, labels, labels)). The transition cost [i, a, b] is that of label 'a' at token i - 1
+        followed by label 'b' at token i, and it is 0 for the first token.
+        """
+
+        size = len(tokens)
+        ysize = len(self.__labels)
+        weights = self.__weights
+        unigram_costs = np.zeros((size, ysize))
+        bigram_costs = np.zeros((size, ysize, ysize))
+        for position in range(size):
+            for feature_id in self.__feature_ids(self.__unigram_templates, tokens, position):
+                unigram_costs[position] += weights[feature_id:feature_id + ysize]
+            if position > 0:
+                for feature_id in self.__feature_ids(self.__bigram_templates, tokens, position):
+                    bigram_costs[position] += weights[feature_id:feature_id + ysize * ysize].reshape(ysize, ysize)
+
+        return self.__cost_factor * unigram_costs, self.__cost_factor * bigram_costs
+
+    @staticmethod
+    def viterbi(unigram_costs, bigram_costs):
+        """
+        This method finds the labels with the best total cost. Ties are broken towards the first label, as in CRF++.
+        :param unigram_costs: The costs of the labels (see 'compute_costs').
+        :param bigram_costs: The costs of the transitions (see 'compute_costs').
+        :return: A 2-tuple (list of the indexes of the labels, best total cost).
+        """
+
+        size = len(unigram_costs)
+        best = unigram_costs[0].copy()
+        back = np.zeros(unigram_costs.shape, dtype=np.intp)
+        for position in range(1, size):
+            scores = best[:, np.newaxis] + bigram_costs[position] + unigram_costs[position][np.newaxis, :]
+            back[position] = np.argmax(scores, axis=0)
+            best = scores[back[position], np.arange(scores.shape[1])]
+
+        label = int(np.argmax(best))
+        best_cost = float(best[label])
+        path = [label]
+        for position in range(size - 1, 0, -1):
+            label = int(back[position, label])
+            path.append(label)
+        path.reverse()
+
+        return path, best_cost
+
+    @staticmethod
+    def forward_backward(unigram_costs, bigram_costs):
+        """
+        This method computes the marginal probabilities of the labels of each token.
+        :param unigram_costs: The costs of the labels (see 'compute_costs').
+        :param bigram_costs: The costs of the transitions (see 'compute_costs').
+        :return: A 2-tuple (numpy array of the probabilities with shape (tokens, labels), the logarithm of the
+        normalisation factor).
+        """
+
+        size = len(unigram_costs)
+        alpha = np.empty(unigram_costs.shape)
+        beta = np.empty(unigram_costs.shape)
+        alpha[0] = unigram_costs[0]
+        for position in range(1, size):
+            alpha[position] = (np.logaddexp.reduce(alpha[position - 1][:, np.newaxis] + bigram_costs[position],
+                                                   axis=0) + unigram_costs[position])
+        beta[size - 1] = unigram_costs[size - 1]
+        for position in range(size - 2, -1, -1):
+            beta[position] = (np.logaddexp.reduce(bigram_costs[position + 1] + beta[position + 1][np.newaxis, :],
+                                                  axis=1) + unigram_costs[position])
+        log_z = float(np.logaddexp.reduce(beta[0]))
+
+        return np.exp(alpha + beta - unigram_costs - log_z), log_z
+
+    def tag(self, tokens, probabilities=False):
+        """
+        This method labels the tokens of a sentence.
+        :param tokens: The tokens of the sentence. Each token is a list of its columns, of which the first
+        'get_xsize()' columns are used.
+        :param probabilities: If True, the probabilities are computed as well. Default is False.
+        :return: A 3-tuple (list of the labels, list of the probabilities of the labels, probability of the whole
+        labelling). The probabilities are None if they have not been asked for.
+        """
+
+        if not tokens:
+            return list(), (list() if probabilities else None), (1.0 if probabilities else None)
+
+        (unigram_costs, bigram_costs) = self.compute_costs(tokens)
+        (path, best_cost) = CRFDecoder.viterbi(unigram_costs, bigram_costs)
+        all_labels = self.get_labels()
+        labels = [all_labels[label] for label in path]
+        if not probabilities:
+            return labels, None, None
+
+        (marginals, log_z) = CRFDecoder.forward_backward(unigram_costs, bigram_costs)
+        label_probabilities = [float(marginals[position, label]) for (position, label) in enumerate(path)]
+
+        return labels, label_probabilities, float(np.exp(best_cost - log_z))
+
+    @staticmethod
+    def read_sentences(test_file):
+        """
+        This method reads the sentences of a CRF++ file. The tokens of a sentence are in consecutive lines, with
+        their columns separated by spaces or tabs, and the sentences are separated by empty lines.
+        :param test_file: The CRF++ file.
+        :return: A generator of sentences. Each sentence is a list of tokens, and each token is a list of its columns.
+        """
+
+        f = open(test_file, 'rt', encoding="utf-8")
+        tokens = list()
+        for line in f:
+            columns = line.split()
+            if columns:
+                tokens.append(columns)
+            elif tokens:
+                yield tokens
+                tokens = list()
+        if tokens:
+            yield tokens
+        f.close()
+
+    def test(self, test_file, result_file, probabilities=False):
+        """
+        This method labels the sentences of a CRF++ file and writes them to the result file in the format of
+        'crf_test' ('crf_test -v1' if 'probabilities' is True): each line has the columns of a token followed by
+        its label (and the probability of the label after a '/'), and each sentence is followed by an empty line.
+        With probabilities, each sentence is preceded by a line with the probability of its labelling after a '#'.
+        :param test_file: The CRF++ file to label.
+        :param result_file: The file to which the labelled sentences will be written.
+        :param probabilities: If True, the probabilities are written as well. Default is False.
+        :return: A list of 4-tuple (line number in the result file, columns of the token, label, probability of the
+        label as written), one for each token. The probability is None if it has not been asked for.
+        """
+
+        tokens_list = list()
+        line_number = 1
+        out_f = open(result_file, 'wt', encoding="utf-8")
+        for tokens in CRFDecoder.read_sentences(test_file):
+            (labels, label_probabilities, probability) = self.tag(tokens, probabilities)
+            if probabilities:
+                out_f.write("# " + "%g" % probability + "\n")
+                line_number += 1
+                for (columns, label, label_probability) in zip(tokens, labels, label_probabilities):
+                    label_probability = "%g" % label_probability
+                    out_f.write("\t".join(columns) + "\t" + label + "/" + label_probability + "\n")
+                    tokens_list.append((line_number, columns, label, float(label_probability)))
+                    line_number += 1
+            else:
+                for (columns, label) in zip(tokens, labels):
+                    out_f.write("\t".join(columns) + "\t" + label + "\n")
+                    tokens_list.append((line_number, columns, label, None))
+                    line_number += 1
+            out_f.write("\n")
+            line_number += 1
+        out_f.close()
+
+        return tokens_list
@@ -0,0 +1,246 @@
+"""
+Created in 2016
+
+@authors: Atheer Alkhalifa, Lamia Alkwai, Waleed Alsanie and Mohamed Alkanhal
+         The National Center for Computation Technology & Applied Mathematics
+         {aalkhalifa,lalkwai,walsanie, alkanhal} [at] kacst [dot] edu [dot] sa
+
+This class is part of a context sensitive spell checking module. It is aimed to write the sentences of a corpus to
+CRF++ training and test files, with one column for each feature of the words followed by the label column.
+"""
+
+
+import os
+from abc import ABC, abstractmethod
+from multiprocessing import Pool
+from .pos_tagger import POSTagger
+from .stemming import get_default_stemming_service
+from .semantic_categories import SemanticCategoryTable
+
+
+class FeatureColumn(ABC):
+
+    def prepare(self, preprocessing_obj, words):
+        """
+        This method is called once in the main process before the sentences are written. It is where a column
+        computes whatever it needs (e.g. a table of the values of the words), so that 'get_values' only has to look
+        them up. A column is copied to the worker processes after it has been prepared.
+        :param preprocessing_obj: The Preprocessor object whose sentences will be written.
+        :param words: The set of the distinct words of the sentences.
+        :return: None
+        """
+
+        pass
+
+    @abstractmethod
+    def get_values(self, sent_num, words):
+        """
+        Returns the values of the column for the words of a sentence. Every column has to define this method.
+        :param sent_num: The number of the sentence.
+        :param words: The list of the words of the sentence.
+        :return: A list of the values (strings) with the same length as 'words'.
+        """
+
+    def get_terminator_value(self, terminator):
+        """
+        Returns the value of the column in the row of the terminator of a sentence.
+        :param terminator: The terminator of the sentence.
+        :return: A string. Default is the terminator itself.
+        """
+
+        return terminator
+
+
+class WordColumn(FeatureColumn):
+
+    def get_values(self, sent_num, words):
+        return words
+
+
+class StemColumn(FeatureColumn):
+
+    def __init__(self, stemming=None):
+        """
+        This is a constructor of the column of the ISRI stems of the words.
+        :param stemming: The StemmingService object which stems the words. Default is the service shared by the
+        feature writers.
+        :return:
+        """
+
+        self._stemming = stemming
+        self._stems = dict()                                                # protected member
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_stemming'] = None                                           # only needed by 'prepare'
+        return state
+
+    def prepare(self, preprocessing_obj, words):
+        stemming = self._stemming if self._stemming is not None else get_default_stemming_service()
+        stemming.stem_words(words)
+        self._stems = {word: stemming.stem(word) for word in words}
+
+    def get_values(self, sent_num, words):
+        stems = self._stems
+        return [stems[word] for word in words]
+
+
+class POSColumn(FeatureColumn):
+
+    def __init__(self, tagger=None):
+        """
+        This is a constructor of the column of the POS tags of the words. The words of each sentence are joined with
+        a space and tagged, and the tags are aligned with the words by 'POSTagger.align_tags'. The words which
+        cannot be aligned get POSTagger.UNKNOWN_TAG.
+        :param tagger: The POSTagger object which tags the sentences. Default is the tagger of the preprocessing
+        object.
+        :return:
+        """
+
+        self._tagger = tagger
+        self._tagged_sentences = list()                                     # protected member
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_tagger'] = None                                             # only needed by 'prepare'
+        return state
+
+    def prepare(self, preprocessing_obj, words):
+        tagger = self._tagger if self._tagger is not None else preprocessing_obj.get_pos_tagger()
+        self._tagged_sentences = tagger.tag_sentences(' '.join(preprocessing_obj.get_sentence_words(sent_num))
+                                                      for sent_num in range(len(preprocessing_obj.get_sentences())))
+
+    def get_values(self, sent_num, words):
+        return POSTagger.align_tags(words, self._tagged_sentences[sent_num])
+
+    def get_terminator_value(self, terminator):
+        return "null"
+
+
+class SemanticColumn(FeatureColumn):
+
+    def __init__(self, table=None):
+        """
+        This is a constructor of the column of the semantic categories of the words.
+        :param table: The SemanticCategoryTable object which gives the categories. Default is a new table built
+        from the words of the sentences.
+        :return:
+        """
+
+        self._table = table
+        self._categories = dict()                                           # protected member
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_table'] = None                                              # only needed by 'prepare'
+        return state
+
+    def prepare(self, preprocessing_obj, words):
+        table = self._table if self._table is not None else SemanticCategoryTable()
+        table.build(words)
+        self._categories = {word: table.get_category(word) for word in words}
+
+    def get_values(self, sent_num, words):
+        categories = self._categories
+        return [categories[word] for word in words]
+
+    def get_terminator_value(self, terminator):
+        return "###############################"
+
+
+def _format_sentences(columns, sentences, error_marker, correct_marker):
+    """
+    Returns the rows of the given sentences as a string.
+    :param columns: The list of FeatureColumn objects.
+    :param sentences: A list of 4-tuple (sent_num, words, terminator, positions of the errors in the sentence).
+    :param error_marker: The label of the erroneous words.
+    :param correct_marker: The label of the correct words.
+    :return: The rows of the sentences, each sentence followed by the row of its terminator and an empty line.
+    """
+
+    rows = list()
+    for (sent_num, words, terminator, error_positions) in sentences:
+        values = [column.get_values(sent_num, words) for column in columns]
+        for (pos, row) in enumerate(zip(*values)):
+            rows.append('\t'.join(row) + '\t' + (error_marker if pos in error_positions else correct_marker) + '\n')
+
+        rows.append('\t'.join(column.get_terminator_value(terminator) for column in columns) + '\t' +
+                    correct_marker + '\n\n')
+
+    return ''.join(rows)
+
+
+# The columns and labels of a worker process of 'CRFFileBuilder.write'
+_worker_args = None
+
+
+def _init_worker(columns, error_marker, correct_marker):
+    global _worker_args
+    _worker_args = (columns, error_marker, correct_marker)
+
+
+def _format_shard(shard):
+    (columns, error_marker, correct_marker) = _worker_args
+    return _format_sentences(columns, shard, error_marker, correct_marker)
+
+
+class CRFFileBuilder:
+
+    # The number of sentences given at once to a worker process
+    SHARD_SIZE = 1000
+
+    def __init__(self, columns, workers=1):
+        """
+        This is a constructor of a writer of CRF++ files. Each word of a sentence is written in a row which has the
+        values of the given columns, in order, followed by its label, all separated by tabs. Each sentence is
+        followed by a row of its terminator and an empty line.
+        :param columns: A list of FeatureColumn objects, e.g. [WordColumn(), StemColumn(), POSColumn()].
+        :param workers: The number of worker processes which format the rows. If it is None, the number of CPUs
+        is used. Default is 1 (the rows are formatted in this process).
+        :return:
+        """
+
+        self.__columns = columns
+        self.__workers = workers if workers is not None else os.cpu_count()
+
+    def write(self, file_name, preprocessing_obj, error_marker, correct_marker):
+        """
+        This method writes the sentences of a preprocessing object to a CRF++ file. The sentences are divided
+        into shards which are formatted by the worker processes, and the shards are written in the order of the
+        sentences.
+        :param file_name: The CRF++ file.
+        :param preprocessing_obj: The Preprocessor object whose sentences will be written.
+        :param error_marker: The label of the erroneous words.
+        :param correct_marker: The label of the correct words.
+        :return: None
+        """
+
+        num_sentences = len(preprocessing_obj.get_sentences())
+        error_positions = dict()
+        for (sent_num, pos) in preprocessing_obj.get_errors():
+            error_positions.setdefault(sent_num, set()).add(pos)
+
+        words = set()
+        for sent_num in range(num_sentences):
+            words.update(preprocessing_obj.get_sentence_words(sent_num))
+        for column in self.__columns:
+            column.prepare(preprocessing_obj, words)
+
+        shards = (
+            [
+                (sent_num, preprocessing_obj.get_sentence_words(sent_num),
+                 preprocessing_obj.get_sentences().get_terminator(sent_num), error_positions.get(sent_num, ()))
+                for sent_num in range(start, min(start + CRFFileBuilder.SHARD_SIZE, num_sentences))
+                ]
+            for start in range(0, num_sentences, CRFFileBuilder.SHARD_SIZE)
+            )
+
+        f_out = open(file_name, 'wt', encoding="utf-8")
+        if self.__workers is None or self.__workers <= 1 or num_sentences <= CRFFileBuilder.SHARD_SIZE:
+            for shard in shards:
+                f_out.write(_format_sentences(self.__columns, shard, error_marker, correct_marker))
+        else:
+            with Pool(self.__workers, _init_worker, (self.__columns, error_marker, correct_marker)) as pool:
+                for text in pool.imap(_format_shard, shards):
+                    f_out.write(text)
+        f_out.close()
@@ -166,7 +166,8 @@ class CRFPlusPlusInterface(BaseLearner):
 
         return self.compute_f_measure(precision, recall, beta)
 
-    def train(self, template, training, model, a='CRF-L2', c=1, f=1):
+    def train(self, template, training, model, a='CRF-L2', c=1, f=1, threads=1, max_iterations=None,
+              text_model=False):
         """
         This method trains CRF++ with the template file 'template and the training file 'training'. The generated
         model file will be 'model'. The training will be done with respect to the parameters specified by a, c and f.
@@ -178,29 +179,41 @@ class CRFPlusPlusInterface(BaseLearner):
         :param a:Default is 'CRF-L2'
         :param c: Default is 1.
         :param f:Default is 1
+        :param threads: The number of threads of CRF++ (its parameter 'p'). Default is 1.
+        :param max_iterations: The maximum number of iterations of CRF++ (its parameter 'm'). Default is None, which
+        means the default of CRF++.
+        :param text_model: If True, CRF++ writes the model as text as well (its parameter 't'), to the file 'model'
+        + '.txt', from which a CRFDecoder can be loaded. Default is False.
         :return: None
         """
 
         self.__training_file = training
         self.__template = template
         self.__model_file = model
+        options = ""
+        if threads > 1:
+            options += " -p " + str(threads)
+        if max_iterations is not None:
+            options += " -m " + str(max_iterations)
+        if text_model:
+            options += " -t"
         if re.match("[cC][rR][fF][-][Ll]1$", a):
             a = 'CRF-L1'
             print("Training with a = 'CRF-L1, c = " + str(c) + " and f = " + str(f))
-            os.system(r"crf_learn -a " + a + " -c " + str(c) + " -f " + str(f) + " " + template + " " + training +
-                      " " + model)
+            os.system(r"crf_learn -a " + a + " -c " + str(c) + " -f " + str(f) + options + " " + template + " " +
+                      training + " " + model)
         elif re.match("[cC][rR][fF][-][Ll]2$", a):
             print("Training with a = 'CRF-L2, c = " + str(c) + " and f = " + str(f))
-            os.system(r"crf_learn -a " + a + " -c " + str(c) + " -f " + str(f) + " " + template + " " + training +
-                      " " + model)
+            os.system(r"crf_learn -a " + a + " -c " + str(c) + " -f " + str(f) + options + " " + template + " " +
+                      training + " " + model)
         else:
             a = 'CRF-L2'
             print("Unknown option for a! Training with the default option")
             print("Training with a = 'CRF-L2, c = " + str(c) + " and f = " + str(f))
-            os.system(r"crf_learn -a " + a + " -c " + str(c) + " -f " + str(f) + " " + template + " " + training +
-                      " " + model)
+            os.system(r"crf_learn -a " + a + " -c " + str(c) + " -f " + str(f) + options + " " + template + " " +
+                      training + " " + model)
 
-    def test(self, test_file, result_file, model_file=None, probabilities=False):
+    def test(self, test_file, result_file, model_file=None, probabilities=False, decoder=None):
         """
         This method performs the testing on 'testing_file'. If 'model_file' is given it uses it for the testing,
         otherwise, it will use any model file set previous by the method 'CRFPlusPlusInterface.train'. The
@@ -211,6 +224,9 @@ class CRFPlusPlusInterface(BaseLearner):
         :param model_file: Model file. Default is None, which means it will use the model generated from the training
         phase.
         :param probabilities: Test with probabilities of assigned label printing switched on.
+        :param decoder: A CRFDecoder object. If it is given, the test file is labelled by it in this process instead
+        of by 'crf_test', and 'model_file' is not used. The result file is written in the same format. Default is
+        None.
         :return: None
         """
 
@@ -226,6 +242,9 @@ class CRFPlusPlusInterface(BaseLearner):
         t_file.close()
         #
 
+        if decoder is not None:                                         # if the decoder has been passed
+            self.__test_with_decoder(test_file, result_file, probabilities, decoder)
+            return
         if model_file:                                                  # if model file has been passed
             self.__model_file = model_file
         # Id not model file passed and it has not set before, perhaps through train.
@@ -248,6 +267,33 @@ class CRFPlusPlusInterface(BaseLearner):
         self.__compute_correct_incorrect_detections()
         self.__count_number_of_spelling_errors()
 
+    def __test_with_decoder(self, test_file, result_file, probabilities, decoder):
+        """
+        This is a private method which performs the testing with a CRFDecoder. The lists of labels are filled from
+        the labels returned by the decoder instead of being read back from the result file.
+        :param test_file: Test file.
+        :param result_file: The file to which the label of the test set will be written.
+        :param probabilities: Test with probabilities of assigned label printing switched on.
+        :param decoder: The CRFDecoder object.
+        :return: None
+        """
+
+        self.__with_probabilities_mode = probabilities
+        field_no = self.__correct_label_field_no
+        tokens = decoder.test(test_file, result_file, probabilities)
+        if self.__with_probabilities_mode:
+            self.__list_of_labels_with_probabilities = [
+                (line_number, columns[field_no], assigned, prob) for (line_number, columns, assigned, prob) in tokens
+                ]
+            print("Finished testing with probability mode switched on.")
+        else:
+            self.__list_of_labels = [(columns[field_no], assigned) for (_, columns, assigned, _) in tokens]
+            print("Finished testing")
+
+        # Set the number of detections and the number of total errors.
+        self.__compute_correct_incorrect_detections()
+        self._total_errors += sum(1 for (_, columns, _, _) in tokens if columns[field_no] == self.__error_identifier)
+
     def write_lines_for_tokens_with_assignment_less_than(self, certainty_less_than, not_certain_file):
         """
         This method prints the line number, the token and the correct label, the assigned label and the probability
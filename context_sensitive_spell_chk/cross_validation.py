@@ -0,0 +1,123 @@
+"""
+Created in 2016
+
+@authors: Atheer Alkhalifa, Lamia Alkwai, Waleed Alsanie and Mohamed Alkanhal
+         The National Center for Computation Technology & Applied Mathematics
+         {aalkhalifa,lalkwai,walsanie, alkanhal} [at] kacst [dot] edu [dot] sa
+
+This class is part of a context sensitive spell checking module. It is aimed to train and test CRF++ on the folds of
+a cross-validation at the same time, and to aggregate the results of the folds.
+"""
+
+
+import os
+import math
+from multiprocessing import Pool
+from .crf_pp_interface import CRFPlusPlusInterface
+
+
+def _run_fold(task):
+    """
+    Trains and tests CRF++ on one fold. This is run in the worker processes of 'CrossValidation.run'.
+    :param task: A 2-tuple (fold, arguments), where the fold is a 3-tuple (training file, test file, directory)
+    and the arguments are a 7-tuple (template, error marker, a, c, f, threads, beta).
+    :return: A dictionary of the metrics of the fold, or None if no model has been trained.
+    """
+
+    ((training, test, directory), (template, error_marker, a, c, f, threads, beta)) = task
+    model = os.path.join(directory, "model")
+    result = os.path.join(directory, "result")
+
+    crf = CRFPlusPlusInterface(error_marker)
+    crf.train(template, training, model, a, c, f, threads)
+    if not os.path.isfile(model):
+        return
+
+    crf.test(test, result, model)
+    precision = crf.compute_precision()
+    recall = crf.compute_recall()
+
+    return {
+        "precision": precision,
+        "recall": recall,
+        "f_measure": crf.compute_f_measure(precision, recall, beta),
+        "correct_detections": crf.get_correct_detections(),
+        "incorrect_detections": crf.get_incorrect_detections(),
+        "total_errors": crf.get_total_errors()
+        }
+
+
+class CrossValidation:
+
+    # The metrics of a fold, in the order they are reported
+    METRICS = ("precision", "recall", "f_measure", "correct_detections", "incorrect_detections", "total_errors")
+
+    def __init__(self, template, error_marker, a='CRF-L2', c=1, f=1, jobs=None, cpu_budget=None, beta=1):
+        """
+        This is a constructor of a cross-validation of CRF++ with the given template and parameters. The folds are
+        trained and tested by separate CRF++ processes, up to 'jobs' folds at the same time, and the CPUs of the
+        budget are divided between them as CRF++ threads.
+        :param template: The CRF++ template file.
+        :param error_marker: The label of the spelling errors.
+        :param a: The parameter 'a' of CRF++. Default is 'CRF-L2'.
+        :param c: The parameter 'c' of CRF++. Default is 1.
+        :param f: The parameter 'f' of CRF++. Default is 1.
+        :param jobs: The number of folds trained at the same time. Default is None, which means all the folds.
+        :param cpu_budget: The number of CPUs used. Default is None, which means the number of CPUs.
+        :param beta: The beta of the F-measure. Default is 1.
+        :return:
+        """
+
+        self.__template = template
+        self.__error_marker = error_marker
+        self.__a = a
+        self.__c = c
+        self.__f = f
+        self.__jobs = jobs
+        self.__cpu_budget = cpu_budget if cpu_budget is not None else os.cpu_count() or 1
+        self.__beta = beta
+
+    def run(self, folds):
+        """
+        This method trains and tests CRF++ on each fold. The model and result files of a fold are written to its
+        directory.
+        :param folds: A list of 3-tuple (training file, test file, directory), one for each fold.
+        :return: A list of the metrics of the folds in their order. The metrics of a fold are a dictionary whose keys
+        are METRICS, or None if no model has been trained for the fold.
+        """
+
+        jobs = min(self.__jobs if self.__jobs is not None else len(folds), len(folds))
+        threads = max(1, self.__cpu_budget // max(1, jobs))
+        arguments = (self.__template, self.__error_marker, self.__a, self.__c, self.__f, threads, self.__beta)
+        tasks = [(fold, arguments) for fold in folds]
+
+        print("Cross-validating CRF++ on " + str(len(folds)) + " folds with " + str(jobs) + " jobs of " +
+              str(threads) + " threads ....")
+        if jobs <= 1:
+            return [_run_fold(task) for task in tasks]
+
+        with Pool(jobs) as pool:
+            return pool.map(_run_fold, tasks)
+
+    @staticmethod
+    def aggregate(results):
+        """
+        This method computes the mean and the standard deviation of each metric over the folds. The standard
+        deviation is that of a sample (divided by the number of folds minus one), and it is 0 for one fold. Folds
+        without metrics are left out.
+        :param results: A list of the metrics of the folds, as returned by 'run'.
+        :return: A dictionary as follows: {metric: (mean, standard deviation)}, or None if no fold has metrics.
+        """
+
+        results = [metrics for metrics in results if metrics is not None]
+        if not results:
+            return
+
+        aggregate = dict()
+        for metric in CrossValidation.METRICS:
+            values = [metrics[metric] for metrics in results]
+            mean = sum(values) / len(values)
+            variance = sum((value - mean) ** 2 for value in values) / (len(values) - 1) if len(values) > 1 else 0
+            aggregate[metric] = (mean, math.sqrt(variance))
+
+        return aggregate
@@ -0,0 +1,129 @@
+"""
+Created in 2016
+
+@authors: Atheer Alkhalifa, Lamia Alkwai, Waleed Alsanie and Mohamed Alkanhal
+         The National Center for Computation Technology & Applied Mathematics
+         {aalkhalifa,lalkwai,walsanie, alkanhal} [at] kacst [dot] edu [dot] sa
+
+This class is part of a context sensitive spell checking module. It is aimed to choose the errors to be put in the
+corpus, in parallel, such that the same errors are chosen whatever the number of processes is.
+"""
+
+
+import os
+import random
+import hashlib
+from multiprocessing import Pool
+
+
+def _find_error(group, confusion_sets, seed, first_only):
+    """
+    Returns the error chosen for a group of sentences as a 4-tuple (sent_num, position, correct, replacement), or
+    None if no word of the group can be replaced. The words of the group which are in 'confusion_sets' are tried in
+    order, and the replacement is drawn with a generator seeded with the seed of the first sentence of the group.
+    """
+
+    for (sent_num, words) in group:
+        for (position, word) in enumerate(words):
+            if word not in confusion_sets:
+                continue
+            possible_replacements = confusion_sets[word]
+            if possible_replacements:
+                generator = random.Random(ErrorInjector.get_group_seed(seed, group[0][0]))
+                return sent_num, position, word, possible_replacements[generator.randrange(len(possible_replacements))]
+            if first_only:
+                return
+
+    return
+
+
+# The confusion sets and parameters of a worker process of 'ErrorInjector.find_errors'
+_worker_args = None
+
+
+def _init_worker(confusion_sets, seed, first_only):
+    global _worker_args
+    _worker_args = (confusion_sets, seed, first_only)
+
+
+def _find_shard_errors(shard):
+    (confusion_sets, seed, first_only) = _worker_args
+    return [_find_error(group, confusion_sets, seed, first_only) for group in shard]
+
+
+class ErrorInjector:
+
+    # The number of groups of sentences given at once to a worker process
+    SHARD_SIZE = 1000
+
+    def __init__(self, catalog, words_list, d=1, seed=None, workers=1):
+        """
+        This is a constructor of an engine which chooses the errors to be put in groups of sentences. In each group,
+        a word from the words list is replaced with a word drawn randomly from its confusion set with distance 'd'
+        (the vocabulary words 'd' edits from it, see 'ConfusionSetCatalog.get_confusion_set').
+
+        Each group draws its replacement with its own generator, seeded with a seed derived from the master seed
+        and the number of the first sentence of the group (see 'get_group_seed'). The choices do not depend on the
+        order in which the groups are processed, so the same errors are chosen by any number of worker processes.
+        For the same reason, the confusion sets are taken from the catalog here: putting the errors in the corpus
+        afterwards does not change the replacements of the following groups.
+        :param catalog: The ConfusionSetCatalog of the vocabulary from which the replacements will be drawn.
+        :param words_list: The list of words which can be replaced.
+        :param d: The number of edits between a word and its replacement. Default is 1.
+        :param seed: The master seed. If it is None, it is drawn from the 'random' module, so it depends on its
+        seed. Default is None.
+        :param workers: The number of worker processes. If it is None, the number of CPUs is used. Default is 1
+        (the errors are chosen in this process).
+        :return:
+        """
+
+        self.__confusion_sets = {word: catalog.get_confusion_set(word, d) for word in set(words_list)}
+        self.__seed = seed if seed is not None else random.getrandbits(64)
+        self.__workers = workers if workers is not None else os.cpu_count()
+
+    def get_seed(self):
+        """
+        :return: The master seed. Giving it to another engine with the same confusion sets makes it choose the
+        same errors.
+        """
+
+        return self.__seed
+
+    @staticmethod
+    def get_group_seed(seed, sent_num):
+        """
+        This method derives the seed of a group of sentences from the master seed. The seed is taken from a SHA-256
+        digest, so it is the same in every process and every run (unlike python's 'hash' of strings).
+        :param seed: The master seed.
+        :param sent_num: The number of the first sentence of the group.
+        :return: A 64-bit integer.
+        """
+
+        digest = hashlib.sha256((str(seed) + ":" + str(sent_num)).encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big")
+
+    def find_errors(self, groups, first_only=False):
+        """
+        This method chooses an error for each of the given groups of sentences. The groups are divided into shards
+        which are processed by the worker processes, and the errors are returned in the order of the groups.
+        :param groups: An iterable of groups. A group is a non-empty list of 2-tuple (sent_num, words of the
+        sentence).
+        :param first_only: If True, only the first word of a group which is in the words list is tried. Otherwise,
+        the following ones are tried in order until one has a replacement. Default is False.
+        :return: A list of the errors of the groups in their order. An error is a 4-tuple (sent_num, position,
+        correct, replacement), or None if no word of the group could be replaced.
+        """
+
+        groups = list(groups)
+        if self.__workers is None or self.__workers <= 1 or len(groups) <= ErrorInjector.SHARD_SIZE:
+            return [_find_error(group, self.__confusion_sets, self.__seed, first_only) for group in groups]
+
+        shards = [groups[start:start + ErrorInjector.SHARD_SIZE]
+                  for start in range(0, len(groups), ErrorInjector.SHARD_SIZE)]
+        errors = list()
+        args = (self.__confusion_sets, self.__seed, first_only)
+        with Pool(min(self.__workers, len(shards)), _init_worker, args) as pool:
+            for shard_errors in pool.imap(_find_shard_errors, shards):
+                errors.extend(shard_errors)
+
+        return errors
@@ -0,0 +1,268 @@
+"""
+Created in 2016
+
+@authors: Atheer Alkhalifa, Lamia Alkwai, Waleed Alsanie and Mohamed Alkanhal
+         The National Center for Computation Technology & Applied Mathematics
+         {aalkhalifa,lalkwai,walsanie, alkanhal} [at] kacst [dot] edu [dot] sa
+
+This class is part of a context sensitive spell checking module. It is aimed to search for the parameters a, c and f
+of CRF++ which give the best value of the objective function on a validation set, training and testing several
+settings at the same time.
+"""
+
+
+import os
+import json
+import time
+import hashlib
+import itertools
+from multiprocessing import Pool
+from .crf_pp_interface import CRFPlusPlusInterface
+
+
+def _run_trial(task):
+    """
+    Trains and tests CRF++ with one setting of the parameters. This is run in the worker processes of
+    'HyperparameterSearch'.
+    :param task: A 2-tuple (trial, arguments), where the trial is a dictionary of the setting and the arguments are
+    a 7-tuple (template, training, validation, directory, error marker, objective, beta).
+    :return: The trial with the results added to it, or with an 'error' if no model has been trained.
+    """
+
+    (trial, (template, training, validation, directory, error_marker, objective, beta)) = task
+    name = "_".join(str(trial[key]) for key in ("a", "c", "f", "iterations"))
+    model = os.path.join(directory, "model_" + name)
+    result = os.path.join(directory, "result_" + name)
+
+    start = time.time()
+    crf = CRFPlusPlusInterface(error_marker)
+    crf.train(template, training, model, trial["a"], trial["c"], trial["f"], trial["threads"], trial["iterations"])
+    if not os.path.isfile(model):
+        trial["error"] = "No model has been trained"
+        return trial
+
+    try:
+        crf.test(validation, result, model)
+    except (IndexError, ValueError) as err:                     # crf_test has not written the labels
+        trial["error"] = "The result file cannot be read: " + format(err)
+        return trial
+
+    trial["objective"] = crf.call_objective_for_finding_c(objective, beta)
+    trial["precision"] = crf.compute_precision()
+    trial["recall"] = crf.compute_recall()
+    trial["correct_detections"] = crf.get_correct_detections()
+    trial["incorrect_detections"] = crf.get_incorrect_detections()
+    trial["total_errors"] = crf.get_total_errors()
+    trial["seconds"] = round(time.time() - start, 3)
+
+    return trial
+
+
+class HyperparameterSearch:
+
+    def __init__(self, template, training, validation, directory, error_marker, jobs=1, cpu_budget=None,
+                 log_file=None, objective="F-measure", beta=1):
+        """
+        This is a constructor of a search for the parameters of CRF++. Each setting (a, c, f) is trained on the
+        training file and tested on the validation file, and the settings are ranked by the value of
+        'CRFPlusPlusInterface.call_objective_for_finding_c'. Up to 'jobs' settings are trained at the same time in
+        a pool of worker processes, and the CPUs of the budget are divided between them as CRF++ threads.
+
+        If a log file is given, each trial is appended to it as a line of JSON as soon as it finishes. Trials already
+        in the log are not run again, so a search which has been interrupted can be resumed by running it again.
+        Only the trials made with the same template, training and validation files (see 'get_data_key') and the same
+        objective function are taken from the log.
+        :param template: The CRF++ template file.
+        :param training: The CRF++ training file.
+        :param validation: The CRF++ file on which the settings are tested.
+        :param directory: The directory of the model and result files of the trials. It is made if it does not exist.
+        :param error_marker: The label of the spelling errors.
+        :param jobs: The number of settings trained at the same time. Default is 1.
+        :param cpu_budget: The number of CPUs used by the search. Default is None, which means the number of CPUs.
+        :param log_file: The file of the trials. Default is None (no log).
+        :param objective: The objective function (see 'CRFPlusPlusInterface.call_objective_for_finding_c'). Default
+        is 'F-measure'.
+        :param beta: The beta of the F-measure. Default is 1.
+        :return:
+        """
+
+        self.__template = template
+        self.__training = training
+        self.__validation = validation
+        self.__directory = directory
+        self.__error_marker = error_marker
+        self.__jobs = max(1, jobs)
+        cpu_budget = cpu_budget if cpu_budget is not None else os.cpu_count() or 1
+        # The CRF++ threads of each job
+        self.__threads = max(1, cpu_budget // self.__jobs)
+        self.__log_file = log_file
+        self.__objective = objective
+        self.__beta = beta
+        self.__data_key = HyperparameterSearch.get_data_key(template, training, validation)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    @staticmethod
+    def get_data_key(*files):
+        """
+        Returns the key of the data of a search: the SHA-256 digest of the contents of the given files.
+        :param files: The names of the files.
+        :return: The key as a string of hexadecimal digits.
+        """
+
+        digest = hashlib.sha256()
+        for file in files:
+            f = open(file, 'rb')
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+            f.close()
+            digest.update(b"\0")
+
+        return digest.hexdigest()
+
+    @staticmethod
+    def get_settings(a_values, c_values, f_values):
+        """
+        Returns the settings of the grid of the given values.
+        :param a_values: A list of values of 'a'.
+        :param c_values: A list of values of 'c'.
+        :param f_values: A list of values of 'f'.
+        :return: A list of 3-tuple (a, c, f).
+        """
+
+        return [(a, float(c), int(f)) for (a, c, f) in itertools.product(a_values, c_values, f_values)]
+
+    def __load_log(self):
+        """
+        This is a private method which returns the trials in the log which have been made with the same data and
+        objective function.
+        :return: A dictionary as follows: {(a, c, f, iterations): trial}
+        """
+
+        trials = dict()
+        if self.__log_file is None or not os.path.isfile(self.__log_file):
+            return trials
+
+        f = open(self.__log_file, 'rt', encoding="utf-8")
+        cut_off = False
+        for line in f:
+            cut_off = not line.endswith("\n")
+            try:
+                trial = json.loads(line)
+            except ValueError:                                  # a line cut off by an interruption
+                continue
+            if (trial.get("data") == self.__data_key and trial.get("function") == self.__objective and
+                    trial.get("beta") == self.__beta):
+                trials[(trial["a"], trial["c"], trial["f"], trial["iterations"])] = trial
+        f.close()
+
+        # The last line has been cut off, so it is ended for the next trials to be logged on lines of their own
+        if cut_off:
+            f = open(self.__log_file, 'at', encoding="utf-8")
+            f.write("\n")
+            f.close()
+
+        return trials
+
+    def __run(self, settings, iterations):
+        """
+        This is a private method which runs the trials of the given settings with the given number of iterations
+        which are not in the log, and logs them as they finish.
+        :param settings: A list of 3-tuple (a, c, f).
+        :param iterations: The maximum number of iterations of CRF++, or None for its default.
+        :return: The trials of the settings in their order. Failed trials are left out.
+        """
+
+        done = self.__load_log()
+        arguments = (self.__template, self.__training, self.__validation, self.__directory, self.__error_marker,
+                     self.__objective, self.__beta)
+        tasks = [
+            ({"data": self.__data_key, "function": self.__objective, "beta": self.__beta, "a": a, "c": c, "f": f,
+              "iterations": iterations, "threads": self.__threads}, arguments)
+            for (a, c, f) in settings if (a, c, f, iterations) not in done
+            ]
+        if len(done) and len(tasks) < len(settings):
+            print("Resuming the search: " + str(len(settings) - len(tasks)) + " of " + str(len(settings)) +
+                  " settings have been found in the log.")
+
+        log = open(self.__log_file, 'at', encoding="utf-8") if self.__log_file is not None else None
+        if self.__jobs <= 1 or len(tasks) <= 1:
+            results = map(_run_trial, tasks)
+            pool = None
+        else:
+            pool = Pool(min(self.__jobs, len(tasks)))
+            results = pool.imap_unordered(_run_trial, tasks)
+        for trial in results:
+            if "error" in trial:
+                print("ERROR: The setting a = " + trial["a"] + ", c = " + str(trial["c"]) + " and f = " +
+                      str(trial["f"]) + " has failed: " + trial["error"])
+                continue
+            done[(trial["a"], trial["c"], trial["f"], trial["iterations"])] = trial
+            if log is not None:
+                log.write(json.dumps(trial, sort_keys=True) + "\n")
+                log.flush()
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if log is not None:
+            log.close()
+
+        return [done[(a, c, f, iterations)] for (a, c, f) in settings if (a, c, f, iterations) in done]
+
+    @staticmethod
+    def rank(trials):
+        """
+        This method ranks trials by the value of the objective function, the best first. Trials with equal values
+        keep their order.
+        :param trials: A list of trials.
+        :return: The ranked list of trials.
+        """
+
+        return sorted(trials, key=lambda trial: -trial["objective"])
+
+    def grid(self, a_values, c_values, f_values, iterations=None):
+        """
+        This method tries every setting of the grid of the given values.
+        :param a_values: A list of values of 'a'.
+        :param c_values: A list of values of 'c'.
+        :param f_values: A list of values of 'f'.
+        :param iterations: The maximum number of iterations of CRF++. Default is None, which means its default.
+        :return: The ranked list of trials. Each trial is a dictionary of the setting and its results.
+        """
+
+        settings = HyperparameterSearch.get_settings(a_values, c_values, f_values)
+        print("Searching " + str(len(settings)) + " settings of CRF++ with " + str(self.__jobs) + " jobs of " +
+              str(self.__threads) + " threads ....")
+
+        return HyperparameterSearch.rank(self.__run(settings, iterations))
+
+    def successive_halving(self, a_values, c_values, f_values, min_iterations=10, max_iterations=1000, eta=3):
+        """
+        This method searches the grid of the given values by successive halving. All the settings are trained with
+        'min_iterations' iterations of CRF++, then the best 1/eta of them are trained with eta times as many
+        iterations, and so on, until one setting is left or 'max_iterations' is reached.
+        :param a_values: A list of values of 'a'.
+        :param c_values: A list of values of 'c'.
+        :param f_values: A list of values of 'f'.
+        :param min_iterations: The iterations of the first round. Default is 10.
+        :param max_iterations: The greatest number of iterations of a round. Default is 1000.
+        :param eta: The factor by which the settings are reduced and the iterations are increased. Default is 3.
+        :return: The ranked list of trials of the last round.
+        """
+
+        if eta < 2:
+            print("ERROR: Cannot search by successive halving! The value of eta has to be greater than 1.")
+            return
+
+        settings = HyperparameterSearch.get_settings(a_values, c_values, f_values)
+        iterations = min(min_iterations, max_iterations)
+        while True:
+            print("Searching " + str(len(settings)) + " settings of CRF++ with " + str(iterations) + " iterations, " +
+                  str(self.__jobs) + " jobs of " + str(self.__threads) + " threads ....")
+            ranked = HyperparameterSearch.rank(self.__run(settings, iterations))
+            if len(ranked) <= 1 or iterations >= max_iterations:
+                return ranked
+            settings = [(trial["a"], trial["c"], trial["f"]) for trial in ranked[:max(1, len(ranked) // eta)]]
+            if len(settings) == 1:
+                return ranked
+            iterations = min(iterations * eta, max_iterations)
@@ -0,0 +1,68 @@
+/*
+ * Created in 2016
+ *
+ * @authors: Atheer Alkhalifa, Lamia Alkwai, Waleed Alsanie and Mohamed Alkanhal
+ *          The National Center for Computation Technology & Applied Mathematics
+ *          {aalkhalifa,lalkwai,walsanie, alkanhal} [at] kacst [dot] edu [dot] sa
+ *
+ * This class is part of a context sensitive spell checking module. It is aimed to answer the queries of
+ * 'OntologyQuery' with 'queryAWOntology.jar' in a single JVM, instead of starting a JVM for each word.
+ *
+ * It reads the queries from its standard input, one per line, with the arguments of 'queryAWOntology.jar' separated
+ * by tabs (word<TAB>stem<TAB><TAB>0). For each query the main class of the jar is called with these arguments, and
+ * the first line it prints is written as one line to the standard output (an empty line if it has printed nothing
+ * or has failed). It is run with Java 11 or higher, without compiling it, as follows:
+ *
+ *     java context_sensitive_spell_chk/lib/QueryAWOntologyLoop.java [queryAWOntology.jar]
+ */
+
+import java.io.BufferedReader;
+import java.io.ByteArrayOutputStream;
+import java.io.File;
+import java.io.FileDescriptor;
+import java.io.FileOutputStream;
+import java.io.InputStreamReader;
+import java.io.PrintStream;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.net.URL;
+import java.net.URLClassLoader;
+import java.nio.charset.StandardCharsets;
+import java.util.jar.JarFile;
+
+public class QueryAWOntologyLoop {
+
+    public static void main(String[] args) throws Exception {
+
+        String jar = args.length > 0 ? args[0] : "queryAWOntology.jar";
+        String mainClass;
+        try (JarFile jarFile = new JarFile(jar)) {
+            mainClass = jarFile.getManifest().getMainAttributes().getValue("Main-Class");
+        }
+        // The jar is loaded once, and its main method is called for every query
+        URLClassLoader loader = new URLClassLoader(new URL[]{new File(jar).toURI().toURL()},
+                                                   QueryAWOntologyLoop.class.getClassLoader());
+        Method query = Class.forName(mainClass, true, loader).getMethod("main", String[].class);
+
+        PrintStream out = new PrintStream(new FileOutputStream(FileDescriptor.out), true, "UTF-8");
+        ByteArrayOutputStream answer = new ByteArrayOutputStream();
+        PrintStream capture = new PrintStream(answer, true, "UTF-8");
+        BufferedReader in = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+        String line;
+        while ((line = in.readLine()) != null) {
+            answer.reset();
+            System.setOut(capture);
+            try {
+                query.invoke(null, (Object) line.split("\t", -1));
+            } catch (InvocationTargetException e) {             // the word is not in the ontology
+                answer.reset();
+            } finally {
+                System.setOut(out);
+            }
+            capture.flush();
+            String text = answer.toString("UTF-8");
+            int end = text.indexOf('\n');
+            out.println((end >= 0 ? text.substring(0, end) : text).trim());
+        }
+    }
+}
@@ -0,0 +1,562 @@
+"""
+Created in 2016
+
+@authors: Atheer Alkhalifa, Lamia Alkwai, Waleed Alsanie and Mohamed Alkanhal
+         The National Center for Computation Technology & Applied Mathematics
+         {aalkhalifa,lalkwai,walsanie, alkanhal} [at] kacst [dot] edu [dot] sa
+
+This class is part of a context sensitive spell checking module. It is aimed to train and test a linear-chain CRF in
+this process with numpy, as a learner which does not need the CRF++ binaries.
+"""
+
+
+import os
+import re
+import sys
+import zlib
+import numpy as np
+from multiprocessing import Pool
+from .any_learner import BaseLearner
+from .crf_decoder import CRFDecoder
+
+
+def _logsumexp(values, axis):
+    """
+    Returns the logarithm of the sum of the exponentials of the values along an axis, without overflowing.
+    """
+
+    highest = values.max(axis=axis)
+    return highest + np.log(np.exp(values - np.expand_dims(highest, axis)).sum(axis=axis))
+
+
+def _compute_shard(weights, shard, ysize, unigram_buckets):
+    """
+    Returns the negative log-likelihood of the sentences of a shard and its gradient with respect to the weights, as
+    a 2-tuple (float, numpy array). The sentences of the shard are padded to the same length, so the forward-backward
+    algorithm is run on all of them at once, one position at a time (see 'NumpyCRFLearner.make_shards').
+    """
+
+    (lengths, unigram_cells, unigram_ids, bigram_cells, bigram_ids, gold) = shard
+    (sentences, size) = gold.shape
+    cells = sentences * size
+    unigram_weights = weights[:unigram_buckets * ysize].reshape(unigram_buckets, ysize)
+    bigram_weights = weights[unigram_buckets * ysize:].reshape(-1, ysize * ysize)
+
+    # The costs of the labels and of the transitions are summed from the weights of the features of each cell
+    unigram_values = unigram_weights[unigram_ids]
+    bigram_values = bigram_weights[bigram_ids]
+    unigram_costs = np.empty((cells, ysize))
+    for y in range(ysize):
+        unigram_costs[:, y] = np.bincount(unigram_cells, unigram_values[:, y], cells)
+    bigram_costs = np.empty((cells, ysize * ysize))
+    for y in range(ysize * ysize):
+        bigram_costs[:, y] = np.bincount(bigram_cells, bigram_values[:, y], cells)
+    unigram_costs = unigram_costs.reshape(sentences, size, ysize)
+    bigram_costs = bigram_costs.reshape(sentences, size, ysize, ysize)
+
+    last = lengths - 1
+    alpha = np.empty(unigram_costs.shape)
+    beta = np.empty(unigram_costs.shape)
+    alpha[:, 0] = unigram_costs[:, 0]
+    for position in range(1, size):
+        alpha[:, position] = (_logsumexp(alpha[:, position - 1, :, np.newaxis] + bigram_costs[:, position], 1) +
+                              unigram_costs[:, position])
+    beta[:, size - 1] = unigram_costs[:, size - 1]
+    for position in range(size - 2, -1, -1):
+        inner = (_logsumexp(bigram_costs[:, position + 1] + beta[:, position + 1, np.newaxis, :], 2) +
+                 unigram_costs[:, position])
+        beta[:, position] = np.where((last == position)[:, np.newaxis], unigram_costs[:, position], inner)
+    log_z = _logsumexp(alpha[np.arange(sentences), last], 1)
+
+    # The expected counts of the labels and of the transitions, and the counts of the correct ones. The padding is
+    # masked before the exponentials are taken, as its forward and backward values are meaningless.
+    mask = np.arange(size)[np.newaxis, :] < lengths[:, np.newaxis]
+    edge_mask = mask[:, 1:, np.newaxis, np.newaxis]
+    node_marginals = np.exp(np.where(mask[:, :, np.newaxis],
+                                     alpha + beta - unigram_costs - log_z[:, np.newaxis, np.newaxis], -np.inf))
+    edge_marginals = np.exp(np.where(edge_mask, alpha[:, :-1, :, np.newaxis] + bigram_costs[:, 1:] +
+                                     beta[:, 1:, np.newaxis, :] - log_z[:, np.newaxis, np.newaxis, np.newaxis],
+                                     -np.inf))
+    node_gold = (gold[:, :, np.newaxis] == np.arange(ysize)) & mask[:, :, np.newaxis]
+    edge_gold = (gold[:, :-1] * ysize + gold[:, 1:])[:, :, np.newaxis] == np.arange(ysize * ysize)
+    edge_gold = (edge_gold & mask[:, 1:, np.newaxis]).reshape(edge_marginals.shape)
+
+    loss = float(log_z.sum() - (unigram_costs * node_gold).sum() - (bigram_costs[:, 1:] * edge_gold).sum())
+
+    node_differences = (node_marginals - node_gold).reshape(cells, ysize)[unigram_cells]
+    edge_differences = np.zeros((sentences, size, ysize * ysize))
+    edge_differences[:, 1:] = (edge_marginals - edge_gold).reshape(sentences, size - 1, ysize * ysize)
+    edge_differences = edge_differences.reshape(cells, ysize * ysize)[bigram_cells]
+    unigram_gradient = np.empty((unigram_buckets, ysize))
+    for y in range(ysize):
+        unigram_gradient[:, y] = np.bincount(unigram_ids, node_differences[:, y], unigram_buckets)
+    bigram_gradient = np.empty(bigram_weights.shape)
+    for y in range(ysize * ysize):
+        bigram_gradient[:, y] = np.bincount(bigram_ids, edge_differences[:, y], len(bigram_weights))
+
+    return loss, np.concatenate((unigram_gradient.ravel(), bigram_gradient.ravel()))
+
+
+# The shards and parameters of a worker process of 'NumpyCRFLearner.train'
+_worker_args = None
+
+
+def _init_worker(shards, ysize, unigram_buckets):
+    global _worker_args
+    _worker_args = (shards, ysize, unigram_buckets)
+
+
+def _compute_shards(task):
+    (indexes, weights) = task
+    (shards, ysize, unigram_buckets) = _worker_args
+    loss = 0.0
+    gradient = np.zeros(len(weights))
+    for index in indexes:
+        (shard_loss, shard_gradient) = _compute_shard(weights, shards[index], ysize, unigram_buckets)
+        loss += shard_loss
+        gradient += shard_gradient
+
+    return loss, gradient
+
+
+class HashedCRFModel(CRFDecoder):
+
+    def __init__(self, templates, labels, xsize, hash_bits=18, bigram_hash_bits=12, weights=None):
+        """
+        This is a constructor of a linear-chain CRF model whose features are hashed. The features are made from the
+        templates as CRF++ makes them, but instead of being numbered in a dictionary, each feature is hashed (CRC-32)
+        into one of 2 ** hash_bits buckets (2 ** bigram_hash_bits for the bigram templates), and the features of a
+        bucket share its weights. So the model has a fixed size and no dictionary of features is kept.
+
+        The sentences are labelled as by a CRFDecoder (see 'CRFDecoder.tag' and 'CRFDecoder.test'), whose text
+        model is not used.
+        :param templates: A list of the lines of a CRF++ template file.
+        :param labels: A list of the labels.
+        :param xsize: The number of the columns of the tokens, without the label.
+        :param hash_bits: The number of bits of the hashes of the unigram features. Default is 18.
+        :param bigram_hash_bits: The number of bits of the hashes of the bigram features. Default is 12.
+        :param weights: A numpy array of the weights as returned by 'get_weights'. Default is None, which means
+        that all the weights are 0.
+        :return:
+        """
+
+        # The text model of CRFDecoder is not loaded, only its methods of decoding are used
+        self.__templates = [template for template in templates if re.match("[UB]", template)]
+        self.__labels = list(labels)
+        self.__xsize = xsize
+        self.__hash_bits = hash_bits
+        self.__bigram_hash_bits = bigram_hash_bits
+        self.__unigram_templates = [CRFDecoder.compile_template(template, xsize)
+                                    for template in self.__templates if template.startswith("U")]
+        self.__bigram_templates = [CRFDecoder.compile_template(template, xsize)
+                                   for template in self.__templates if template.startswith("B")]
+        self.__weights = np.zeros(self.get_number_of_weights()) if weights is None else weights
+
+    @staticmethod
+    def load(model_file):
+        """
+        This method loads a model written by 'save'.
+        :param model_file: The model file.
+        :return: A HashedCRFModel object.
+        """
+
+        f = open(model_file, 'rb')
+        arrays = np.load(f, allow_pickle=False)
+        model = HashedCRFModel(list(arrays["templates"]), list(arrays["labels"]), int(arrays["xsize"]),
+                               int(arrays["hash_bits"]), int(arrays["bigram_hash_bits"]), arrays["weights"])
+        f.close()
+
+        return model
+
+    def save(self, model_file):
+        """
+        This method writes the model to a file in the numpy format.
+        :param model_file: The model file.
+        :return: None
+        """
+
+        f = open(model_file, 'wb')
+        np.savez(f, templates=np.array(self.__templates, dtype=str), labels=np.array(self.__labels, dtype=str),
+                 xsize=self.__xsize, hash_bits=self.__hash_bits, bigram_hash_bits=self.__bigram_hash_bits,
+                 weights=self.__weights)
+        f.close()
+
+    def get_labels(self):
+        """
+        :return: The list of the labels of the model.
+        """
+
+        return self.__labels
+
+    def get_xsize(self):
+        """
+        :return: The number of the columns of the tokens which the templates of the model use.
+        """
+
+        return self.__xsize
+
+    def get_buckets(self):
+        """
+        :return: A 2-tuple (number of the buckets of the unigram features, number of the buckets of the bigram
+        features).
+        """
+
+        return 2 ** self.__hash_bits, 2 ** self.__bigram_hash_bits
+
+    def get_number_of_weights(self):
+        """
+        :return: The number of the weights of the model: a weight for each label of each unigram bucket, then a
+        weight for each pair of labels of each bigram bucket.
+        """
+
+        (unigram_buckets, bigram_buckets) = self.get_buckets()
+        ysize = len(self.__labels)
+
+        return unigram_buckets * ysize + bigram_buckets * ysize * ysize
+
+    def get_weights(self):
+        """
+        :return: The numpy array of the weights of the model.
+        """
+
+        return self.__weights
+
+    def set_weights(self, weights):
+        """
+        This method sets the weights of the model.
+        :param weights: A numpy array of 'get_number_of_weights()' weights.
+        :return: None
+        """
+
+        self.__weights = weights
+
+    def extract_features(self, tokens):
+        """
+        This method expands the templates at every position of a sentence and hashes the features.
+        :param tokens: The tokens of the sentence. Each token is a list of its columns.
+        :return: A 2-tuple (list of lists of the unigram buckets, list of lists of the bigram buckets), with a list
+        for each position. The list of the bigram buckets of the first position is empty.
+        """
+
+        unigram_mask = 2 ** self.__hash_bits - 1
+        bigram_mask = 2 ** self.__bigram_hash_bits - 1
+        unigrams = list()
+        bigrams = list()
+        for position in range(len(tokens)):
+            unigrams.append([zlib.crc32(feature.encode("utf-8")) & unigram_mask
+                             for feature in CRFDecoder.expand_templates(self.__unigram_templates, tokens, position)])
+            if position == 0:
+                bigrams.append(list())
+                continue
+            bigrams.append([zlib.crc32(feature.encode("utf-8")) & bigram_mask
+                            for feature in CRFDecoder.expand_templates(self.__bigram_templates, tokens, position)])
+
+        return unigrams, bigrams
+
+    def compute_costs(self, tokens):
+        """
+        This method computes the costs of the labels of the tokens of a sentence and of the transitions between the
+        labels of adjacent tokens (see 'CRFDecoder.compute_costs').
+        :param tokens: The tokens of the sentence. Each token is a list of its columns.
+        :return: A 2-tuple of numpy arrays (costs of the labels with shape (tokens, labels), costs of the transitions
+        with shape (tokens, labels, labels)).
+        """
+
+        (unigram_buckets, _) = self.get_buckets()
+        ysize = len(self.__labels)
+        unigram_weights = self.__weights[:unigram_buckets * ysize].reshape(unigram_buckets, ysize)
+        bigram_weights = self.__weights[unigram_buckets * ysize:].reshape(-1, ysize, ysize)
+        (unigrams, bigrams) = self.extract_features(tokens)
+        unigram_costs = np.array([unigram_weights[buckets].sum(axis=0) for buckets in unigrams])
+        bigram_costs = np.array([bigram_weights[buckets].sum(axis=0) for buckets in bigrams])
+
+        return unigram_costs, bigram_costs
+
+
+class NumpyCRFLearner(BaseLearner):
+
+    # The number of sentences of a shard, on which the gradient is computed at once
+    SHARD_SIZE = 500
+    # The number of the last updates kept by L-BFGS
+    MEMORY = 5
+    # The greatest number of times the step of an iteration is halved before the training stops
+    MAX_LINE_SEARCH = 30
+
+    def __init__(self, error_marker, hash_bits=18, bigram_hash_bits=12, workers=1):
+        """
+        This is a constructor of a learner which trains a linear-chain CRF with numpy (see 'HashedCRFModel'). It
+        reads the same template, training and test files as CRF++, and it is trained with the same objective
+        function: the negative log-likelihood of the training sentences plus ||w||^2 / (2c) for 'CRF-L2' or
+        ||w||_1 / c for 'CRF-L1'. The function is minimised by L-BFGS for 'CRF-L2' and by its orthant-wise variant
+        (OWL-QN) for 'CRF-L1', and the training stops as CRF++ stops.
+
+        The gradient is computed on shards of sentences. If there are more workers than one, the shards are divided
+        between worker processes, which are given the shards once and the weights at every iteration.
+        :param error_marker: The label of the spelling errors.
+        :param hash_bits: The number of bits of the hashes of the unigram features. Default is 18.
+        :param bigram_hash_bits: The number of bits of the hashes of the bigram features. Default is 12.
+        :param workers: The number of worker processes. If it is None, the number of CPUs is used. Default is 1
+        (the gradient is computed in this process).
+        :return:
+        """
+
+        super().__init__()
+        self.__error_identifier = str(error_marker)
+        self.__hash_bits = hash_bits
+        self.__bigram_hash_bits = bigram_hash_bits
+        self.__workers = workers if workers is not None else os.cpu_count()
+        self.__model = None
+        # This is a list of the line number in the result file, correct label, assigned label and the probability
+        # of the assigned label (None if the probabilities have not been asked for) of each token as follows:
+        # [ (line_n, correct, assigned, prob_assigned), .... ]
+        self.__list_of_labels = list()
+
+    def get_model(self):
+        """
+        :return: The HashedCRFModel which has been trained or loaded for the test, or None.
+        """
+
+        return self.__model
+
+    @staticmethod
+    def make_shards(sentences, size):
+        """
+        This method divides sentences into shards and pads the sentences of each shard to the same length. The
+        sentences are sorted by their lengths first, so that little padding is needed.
+        :param sentences: A list of 3-tuple (list of lists of the unigram buckets, list of lists of the bigram
+        buckets, list of the indexes of the labels), one for each sentence (see 'HashedCRFModel.extract_features').
+        :param size: The number of sentences of a shard.
+        :return: A list of shards. A shard is a 6-tuple of numpy arrays (lengths of the sentences, cells of the
+        unigram buckets, unigram buckets, cells of the bigram buckets, bigram buckets, labels with shape
+        (sentences, length)), where a cell is the index of a position in the padded sentences taken as one array.
+        """
+
+        order = sorted(range(len(sentences)), key=lambda i: len(sentences[i][2]))
+        shards = list()
+        for start in range(0, len(order), size):
+            batch = [sentences[i] for i in order[start:start + size]]
+            length = len(batch[-1][2])
+            lengths = np.array([len(labels) for (_, _, labels) in batch], dtype=np.intp)
+            gold = np.zeros((len(batch), length), dtype=np.intp)
+            (unigram_cells, unigram_ids, bigram_cells, bigram_ids) = (list(), list(), list(), list())
+            for (row, (unigrams, bigrams, labels)) in enumerate(batch):
+                gold[row, :len(labels)] = labels
+                for (position, buckets) in enumerate(unigrams):
+                    unigram_cells.extend([row * length + position] * len(buckets))
+                    unigram_ids.extend(buckets)
+                for (position, buckets) in enumerate(bigrams):
+                    bigram_cells.extend([row * length + position] * len(buckets))
+                    bigram_ids.extend(buckets)
+            shards.append((lengths, np.array(unigram_cells, dtype=np.intp), np.array(unigram_ids, dtype=np.intp),
+                           np.array(bigram_cells, dtype=np.intp), np.array(bigram_ids, dtype=np.intp), gold))
+
+        return shards
+
+    @staticmethod
+    def __cut_off(sentences, unigram_buckets, bigram_buckets, f):
+        """
+        This is a private method which removes the buckets which occur fewer than 'f' times in the training
+        sentences, as CRF++ removes the features.
+        :return: The sentences without those buckets.
+        """
+
+        if f <= 1:
+            return sentences
+
+        unigram_counts = np.bincount(np.array([b for (unigrams, _, _) in sentences for buckets in unigrams
+                                               for b in buckets], dtype=np.intp), minlength=unigram_buckets)
+        bigram_counts = np.bincount(np.array([b for (_, bigrams, _) in sentences for buckets in bigrams
+                                              for b in buckets], dtype=np.intp), minlength=bigram_buckets)
+
+        return [([[b for b in buckets if unigram_counts[b] >= f] for buckets in unigrams],
+                 [[b for b in buckets if bigram_counts[b] >= f] for buckets in bigrams], labels)
+                for (unigrams, bigrams, labels) in sentences]
+
+    @staticmethod
+    def __two_loop(gradient, updates):
+        """
+        This is a private method which multiplies the gradient by the L-BFGS approximation of the inverse Hessian.
+        :return: The product as a numpy array.
+        """
+
+        direction = gradient.copy()
+        factors = list()
+        for (s, y, rho) in reversed(updates):
+            factor = rho * s.dot(direction)
+            direction -= factor * y
+            factors.append(factor)
+        if updates:
+            (s, y, _) = updates[-1]
+            direction *= s.dot(y) / y.dot(y)
+        for ((s, y, rho), factor) in zip(updates, reversed(factors)):
+            direction += (factor - rho * y.dot(direction)) * s
+
+        return direction
+
+    def __minimise(self, compute, weights, l1, max_iterations, eta):
+        """
+        This is a private method which minimises compute(weights) + l1 * ||weights||_1 by OWL-QN, which is L-BFGS
+        if l1 is 0. The iterations stop when the relative change of the objective function has been less than 'eta'
+        three times in a row, as in CRF++, or after 'max_iterations' iterations.
+        :return: The weights.
+        """
+
+        (loss, gradient) = compute(weights)
+        value = loss + l1 * np.abs(weights).sum()
+        updates = list()
+        converge = 0
+        for iteration in range(max_iterations):
+            # The pseudo-gradient of the objective function: the L1 term is differentiated away from 0, and its
+            # subgradient closest to 0 is taken at 0
+            pseudo_gradient = gradient
+            if l1:
+                pseudo_gradient = np.where(weights > 0, gradient + l1, np.where(weights < 0, gradient - l1, 0))
+                pseudo_gradient = np.where((weights == 0) & (gradient + l1 < 0), gradient + l1, pseudo_gradient)
+                pseudo_gradient = np.where((weights == 0) & (gradient - l1 > 0), gradient - l1, pseudo_gradient)
+            direction = -NumpyCRFLearner.__two_loop(pseudo_gradient, updates)
+            if l1:
+                direction[direction * pseudo_gradient >= 0] = 0
+                orthant = np.where(weights != 0, np.sign(weights), -np.sign(pseudo_gradient))
+
+            step = 1.0 if updates else 1.0 / max(np.sqrt(pseudo_gradient.dot(pseudo_gradient)), 1.0)
+            for _ in range(NumpyCRFLearner.MAX_LINE_SEARCH):
+                new_weights = weights + step * direction
+                if l1:
+                    new_weights[np.sign(new_weights) != orthant] = 0
+                (new_loss, new_gradient) = compute(new_weights)
+                new_value = new_loss + l1 * np.abs(new_weights).sum()
+                if new_value <= value + 1e-4 * pseudo_gradient.dot(new_weights - weights):
+                    break
+                step /= 2
+            else:
+                print("The line search has failed at iteration " + str(iteration) + ". Stopping the training.")
+                break
+
+            s = new_weights - weights
+            y = new_gradient - gradient
+            if s.dot(y) > 1e-10:
+                updates.append((s, y, 1.0 / s.dot(y)))
+                del updates[:-NumpyCRFLearner.MEMORY]
+            diff = 1.0 if iteration == 0 else abs(value - new_value) / value
+            (weights, gradient, value) = (new_weights, new_gradient, new_value)
+            print("iter=" + str(iteration) + " act=" + str(int(np.count_nonzero(weights))) + " obj=" + "%g" % value +
+                  " diff=" + "%g" % diff)
+            converge = converge + 1 if diff < eta else 0
+            if converge == 3:
+                break
+
+        return weights
+
+    def train(self, template, training, model, a='CRF-L2', c=1, f=1, max_iterations=10000, eta=0.0001):
+        """
+        This method trains the CRF with the template file 'template' and the training file 'training', and writes
+        the model to the file 'model' (see 'HashedCRFModel.save'). The parameters a, c and f are those of CRF++.
+        :param template: Template file
+        :param training: Training file
+        :param model: Model file
+        :param a: 'CRF-L2' or 'CRF-L1'. Default is 'CRF-L2'.
+        :param c: The trade-off between fitting the training sentences and the regularisation. Default is 1.
+        :param f: The buckets which occur fewer than 'f' times in the training file are not used. Default is 1.
+        :param max_iterations: The maximum number of iterations. Default is 10000, as in CRF++.
+        :param eta: The tolerance of the relative change of the objective function. Default is 0.0001, as in CRF++.
+        :return: None
+        """
+
+        if not os.path.isfile(template) or not os.path.isfile(training):
+            print("ERROR: Cannot train! The template or the training file does not exist.")
+            return
+        if re.match("[cC][rR][fF][-][Ll]1$", a):
+            a = 'CRF-L1'
+        elif not re.match("[cC][rR][fF][-][Ll]2$", a):
+            a = 'CRF-L2'
+            print("Unknown option for a! Training with the default option")
+        print("Training with a = '" + a + "', c = " + str(c) + " and f = " + str(f))
+
+        t_file = open(template, 'rt', encoding="utf-8")
+        templates = [line.strip() for line in t_file if line.strip()]
+        t_file.close()
+        sentences = list(CRFDecoder.read_sentences(training))
+        if not sentences:
+            print("ERROR: Cannot train! The training file has no sentences.")
+            return
+        labels = sorted(set(columns[-1] for tokens in sentences for columns in tokens))
+        self.__model = HashedCRFModel(templates, labels, len(sentences[0][0]) - 1, self.__hash_bits,
+                                      self.__bigram_hash_bits)
+        (unigram_buckets, bigram_buckets) = self.__model.get_buckets()
+
+        label_indexes = {label: i for (i, label) in enumerate(labels)}
+        sentences = [self.__model.extract_features(tokens) + ([label_indexes[columns[-1]] for columns in tokens],)
+                     for tokens in sentences]
+        sentences = NumpyCRFLearner.__cut_off(sentences, unigram_buckets, bigram_buckets, f)
+        shards = NumpyCRFLearner.make_shards(sentences, NumpyCRFLearner.SHARD_SIZE)
+        print("Number of sentences: " + str(len(sentences)) + ", labels: " + str(len(labels)) + ", weights: " +
+              str(self.__model.get_number_of_weights()) + ", shards: " + str(len(shards)))
+
+        c = float(c)
+        workers = min(self.__workers or 1, len(shards))
+        tasks = [list(range(start, len(shards), workers)) for start in range(workers)]
+        if workers > 1:
+            pool = Pool(workers, _init_worker, (shards, len(labels), unigram_buckets))
+        else:
+            pool = None
+            _init_worker(shards, len(labels), unigram_buckets)
+
+        def compute(weights):
+            if pool is None:
+                results = [_compute_shards((tasks[0], weights))]
+            else:
+                results = pool.map(_compute_shards, [(indexes, weights) for indexes in tasks])
+            loss = sum(result[0] for result in results)
+            gradient = np.sum([result[1] for result in results], axis=0)
+            if a == 'CRF-L2':
+                loss += weights.dot(weights) / (2 * c)
+                gradient += weights / c
+            return loss, gradient
+
+        weights = self.__minimise(compute, self.__model.get_weights(), 1 / c if a == 'CRF-L1' else 0,
+                                  max_iterations, eta)
+        if pool is not None:
+            pool.close()
+            pool.join()
+        self.__model.set_weights(weights)
+        self.__model.save(model)
+
+    def test(self, test_file, result_file, model_file=None, probabilities=False):
+        """
+        This method labels the test file with the model and writes the result file in the format of 'crf_test' (see
+        'CRFDecoder.test'). If 'model_file' is given, the model is loaded from it, otherwise the model trained by
+        'NumpyCRFLearner.train' is used. The numbers of detections and errors are set from the labels.
+        :param test_file: Test file.
+        :param result_file: The file to which the label of the test set will be written.
+        :param model_file: Model file. Default is None, which means the trained model.
+        :param probabilities: Test with probabilities of assigned label printing switched on.
+        :return: None
+        """
+
+        if not os.path.isfile(test_file):
+            print("ERROR: Test file does not exist! Exiting the system.")
+            sys.exit(1)
+
+        if model_file:
+            self.__model = HashedCRFModel.load(model_file)
+        elif self.__model is None:
+            print("ERROR: Cannot test! Model file has not been specified. You either need to pass it, or train "
+                  "a model to generate it.")
+            return
+
+        t_file = open(test_file, 'rt', encoding="utf-8")
+        field_no = len(t_file.readline().split()) - 1
+        t_file.close()
+
+        tokens = self.__model.test(test_file, result_file, probabilities)
+        self.__list_of_labels = [(line_number, columns[field_no], assigned, prob)
+                                 for (line_number, columns, assigned, prob) in tokens]
+        for (_, correct, assigned, _) in self.__list_of_labels:
+            if assigned == self.__error_identifier:
+                if correct == self.__error_identifier:
+                    self._correct_detections += 1
+                else:
+                    self._incorrect_detections += 1
+            if correct == self.__error_identifier:
+                self._total_errors += 1
+        print("Finished testing" + (" with probability mode switched on." if probabilities else ""))
@@ -0,0 +1,200 @@
+"""
+Created in 2016
+
+@authors: Atheer Alkhalifa, Lamia Alkwai, Waleed Alsanie and Mohamed Alkanhal
+         The National Center for Computation Technology & Applied Mathematics
+         {aalkhalifa,lalkwai,walsanie, alkanhal} [at] kacst [dot] edu [dot] sa
+
+This class is part of a context sensitive spell checking module. It is aimed to tag sentences with the Stanford POS
+tagger running in a single long-lived process.
+"""
+
+
+import atexit
+import hashlib
+from subprocess import Popen, PIPE, DEVNULL
+
+
+class POSTagger:
+
+    # The Stanford POS tagger reading one sentence per line from the standard input and writing the tagged sentence,
+    # as word/TAG tokens separated by spaces, on one line of the standard output.
+    DEFAULT_COMMAND = ['java', '-mx1g', '-cp', 'stanford-postagger.jar:context_sensitive_spell_chk/lib/*',
+                       'edu.stanford.nlp.tagger.maxent.MaxentTagger',
+                       '-model', 'context_sensitive_spell_chk/lib/arabic.tagger',
+                       '-sentenceDelimiter', 'newline', '-tokenize', 'false']
+    # The tag given to the words which cannot be aligned with the output of the tagger
+    UNKNOWN_TAG = "UNK"
+    # The number of tagged tokens which may be skipped when looking for the token of a word
+    ALIGNMENT_LOOKAHEAD = 3
+
+    def __init__(self, command=None):
+        """
+        This is a constructor of a tagger. The tagger process is started when the first sentence is tagged, and it
+        is kept running until 'close' is called, so the JVM is started and the model is loaded only once.
+        Tagged sentences are cached by the hash of their content, so a sentence is only sent to the process once.
+        :param command: The command which starts the tagger as a list of arguments. The process has to read
+        sentences from its standard input, one per line, and write for each one line of word/TAG tokens to its
+        standard output. Default is POSTagger.DEFAULT_COMMAND. A local script can be given instead for testing.
+        :return:
+        """
+
+        self.__command = command if command is not None else POSTagger.DEFAULT_COMMAND
+        self.__process = None
+        # {sha1 of the sentence: tagged sentence}
+        self.__cache = dict()
+
+    def __start(self):
+        """
+        This is a private method which starts the tagger process.
+        """
+
+        self.__process = Popen(self.__command, stdin=PIPE, stdout=PIPE, stderr=DEVNULL, encoding="utf-8",
+                               bufsize=1)
+
+    def tag(self, sentence):
+        """
+        This method tags a sentence.
+        :param sentence: The sentence to tag. Any new line in it is replaced by a space.
+        :return: The tagged sentence as word/TAG tokens separated by spaces.
+        """
+
+        sentence = sentence.replace('\n', ' ').replace('\r', ' ')
+        if not sentence.strip():                        # nothing to tag, and the tagger would not answer
+            return ""
+
+        key = hashlib.sha1(sentence.encode("utf-8")).hexdigest()
+        if key in self.__cache:
+            return self.__cache[key]
+
+        if self.__process is None or self.__process.poll() is not None:
+            self.__start()
+        self.__process.stdin.write(sentence + '\n')
+        self.__process.stdin.flush()
+        tagged = self.__process.stdout.readline()
+        if not tagged:
+            raise IOError("The POS tagger has stopped: " + ' '.join(self.__command))
+        tagged = tagged.strip()
+        self.__cache[key] = tagged
+
+        return tagged
+
+    def tag_sentences(self, sentences):
+        """
+        This method tags the given sentences.
+        :param sentences: An iterable of sentences.
+        :return: A list of the tagged sentences, in the order of the given sentences.
+        """
+
+        return [self.tag(sentence) for sentence in sentences]
+
+    @staticmethod
+    def align_tags(words, tagged_sentence, fallback=None, lookahead=None):
+        """
+        This method gives a tag to each word of a sentence from the output of the tagger for that sentence. The
+        words and the word/TAG tokens are walked together once, so the time is linear in the length of the
+        sentence, and a repeated word gets the tag of its own occurrence. A word is aligned with:
+            - the first of the next 'lookahead' + 1 tokens which has the same word, skipping the tokens before it
+              (e.g. tokens added by the tagger), or
+            - the next tokens if their words joined give the word (the tagger has split the word), in which case the
+              word gets the tag of the first of them, or
+            - the next token if its word starts with the word (the tagger has joined the word with the following
+              ones), in which case the following words get the same tag while they match the rest of the token.
+        A word which cannot be aligned gets the fallback tag, and no token is consumed for it.
+        :param words: The list of the words of the sentence.
+        :param tagged_sentence: The output of the tagger: word/TAG tokens separated by spaces.
+        :param fallback: The tag of the words which cannot be aligned. Default is POSTagger.UNKNOWN_TAG.
+        :param lookahead: The number of tokens which may be skipped. Default is POSTagger.ALIGNMENT_LOOKAHEAD.
+        :return: A list of tags with the same length as 'words'.
+        """
+
+        fallback = fallback if fallback is not None else POSTagger.UNKNOWN_TAG
+        lookahead = lookahead if lookahead is not None else POSTagger.ALIGNMENT_LOOKAHEAD
+
+        tokens = list()
+        for token in tagged_sentence.split():
+            (word, separator, tag) = token.rpartition("/")
+            tokens.append((word, tag) if separator and word else (token, fallback))
+
+        tags = list()
+        num_tokens = len(tokens)
+        j = 0                                           # the next token to align
+        rest = ""                                       # the unaligned part of a token joining several words
+        rest_tag = fallback
+        for word in words:
+            if rest:
+                if rest.startswith(word):
+                    tags.append(rest_tag)
+                    rest = rest[len(word):]
+                    continue
+                rest = ""
+
+            tag = None
+            for k in range(j, min(j + lookahead + 1, num_tokens)):
+                if tokens[k][0] == word:
+                    (tag, j) = (tokens[k][1], k + 1)
+                    break
+
+            if tag is None and j < num_tokens:
+                (token_word, token_tag) = tokens[j]
+                if len(token_word) < len(word) and word.startswith(token_word):
+                    joined = token_word
+                    k = j + 1
+                    while k < num_tokens and len(joined) < len(word) and word.startswith(joined + tokens[k][0]):
+                        joined += tokens[k][0]
+                        k += 1
+                    if joined == word:
+                        (tag, j) = (token_tag, k)
+                elif len(token_word) > len(word) and token_word.startswith(word):
+                    (tag, j) = (token_tag, j + 1)
+                    (rest, rest_tag) = (token_word[len(word):], token_tag)
+
+            tags.append(tag if tag is not None else fallback)
+
+        return tags
+
+    def clear_cache(self):
+        """
+        This method clears the cache of tagged sentences.
+        :return: None
+        """
+
+        self.__cache = dict()
+
+    def close(self):
+        """
+        This method stops the tagger process. If another sentence is tagged after this method has been called,
+        the process will be started again.
+        :return: None
+        """
+
+        if self.__process is not None:
+            self.__process.stdin.close()
+            self.__process.wait()
+            self.__process.stdout.close()
+            self.__process = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# The tagger shared by all the objects which have not been given a tagger of their own
+_default_tagger = None
+
+
+def get_default_tagger():
+    """
+    Returns the POS tagger shared by the whole program. It runs POSTagger.DEFAULT_COMMAND and it is closed when the
+    program exits.
+    :return: A POSTagger object.
+    """
+
+    global _default_tagger
+    if _default_tagger is None:
+        _default_tagger = POSTagger()
+        atexit.register(_default_tagger.close)
+
+    return _default_tagger
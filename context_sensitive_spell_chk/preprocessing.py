@@ -13,17 +13,141 @@ to preprocess the corpus and make it ready for learning.
 
 import os
 import sys
+import codecs
 import re
+import math
 import random
+import bisect
+import itertools
 import xml.etree.ElementTree as Et
 from subprocess import *
+from multiprocessing import Pool
 from nltk.stem.isri import ISRIStemmer
+from .compact_vocabulary import CompactVocabulary
+from .sentence_store import SentenceStore
+from .pos_tagger import get_default_tagger
+from .tokenizer import Tokenizer
+from .sentence_filter import SentenceFilter
+from .verb_lexicon import VerbLexicon
+from .error_injection import ErrorInjector
+from .confusion_sets import ConfusionSetCatalog
+
+
+# The regular expression of the sentence terminators and the words filter of a worker process of
+# 'Preprocessor.load_corpus_sentences'
+_worker_args = None
+
+
+def _init_worker(ar_sent_terminator_regex, words_filter):
+    global _worker_args
+    _worker_args = (ar_sent_terminator_regex, words_filter)
+
+
+def _load_file_sentences(file):
+    """
+    Returns the sentences of a corpus file which have at least one of the words of the words filter. This is run in
+    the worker processes of 'Preprocessor.load_corpus_sentences'.
+    :param file: The corpus file.
+    :return: The result of 'SentenceFilter.select', or None if the file is not a readable text file.
+    """
+
+    (ar_sent_terminator_regex, words_filter) = _worker_args
+    preprocessor = Preprocessor()
+    preprocessor.set_ar_sent_terminator_regex(ar_sent_terminator_regex)
+    try:                                        # Catch errors resulting from reading non-text files
+        return words_filter.select(preprocessor.iter_file_sentences(file))
+    except UnicodeDecodeError:
+        return None
+
+
+def _read_xml_lines(xml_file, start, end, block_size=1024 * 1024):
+    """
+    Yields the lines of a chunk of an xml file one by one, as they would be read from the file opened as text:
+    the lines are decoded as UTF-8, and a carriage return, with or without a line feed after it, ends a line as
+    well and is turned into a line feed. The chunk is read and decoded in blocks, so a block which cannot be decoded
+    stops the reading before its lines are yielded.
+    :param xml_file: The xml file.
+    :param start: The offset of the chunk in the file.
+    :param end: The offset of the end of the chunk.
+    :param block_size: The number of bytes read at once. Default is 1 MB.
+    :return: A generator of the lines. It raises UnicodeDecodeError if the chunk cannot be decoded.
+    """
+
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    input_f = open(xml_file, 'rb')
+    try:
+        input_f.seek(start)
+        position = start
+        pending = ""                                    # the last line of the previous block, which may go on
+        while position < end:
+            data = input_f.read(min(block_size, end - position))
+            position = position + len(data) if data else end
+            text = pending + decoder.decode(data, final=position >= end)
+            cut = len(text) if position >= end else text.rfind("\n") + 1
+            pending = text[cut:]
+            lines = text[:cut].replace("\r\n", "\n").replace("\r", "\n").split("\n")
+            for line in lines[:-1]:
+                yield line + "\n"
+            if lines[-1]:                               # the last line of the chunk has no line feed
+                yield lines[-1]
+    finally:
+        input_f.close()
 
 
+def _iter_xml_documents(lines, regex_end_xml):
+    """
+    Yields the text of the xml documents in the given lines one by one. The lines are fed to a parser until a line
+    matches the regular expression of the last tag, then the text of the document is yielded and the document is
+    cleared, so only one document is kept in memory at a time. As when the documents were parsed as whole blocks of
+    lines, an error of parsing is only raised if its document ends with such a line: the lines after the last such
+    line (e.g. a text after the last document, or a file which is not an xml file) are ignored.
+    :param lines: An iterable of lines.
+    :param regex_end_xml: The regular expression of the last tag of a document.
+    :return: A generator of the text of the documents. It raises Et.ParseError if a document cannot be parsed.
+    """
+
+    end_xml = re.compile(regex_end_xml)
+    parser = None
+    error = None                                        # the error of the current document, if any
+    for line in lines:
+        if error is None:
+            if parser is None:
+                parser = Et.XMLParser()
+            try:
+                parser.feed(line)                       # the document is parsed incrementally, line by line
+            except Et.ParseError as err:
+                (parser, error) = (None, err)           # the rest of the document is not fed
+        if end_xml.search(line) is not None:
+            if error is not None:
+                raise error
+            root = parser.close()
+            parser = None
+            yield Et.tostring(root, encoding='unicode', method='text')
+            root.clear()
+
+
+def _remove_xml_tags_chunk(chunk):
+    """
+    Returns the text of the xml documents in a chunk of an xml file. This is run in the worker processes of
+    'Preprocessor.remove_xml_tags', so the text is bounded by the size of the chunk.
+    :param chunk: A 4-tuple (xml file, start, end, regular expression of the last tag) where start and end are the
+    offsets of the chunk in the file.
+    :return: A 2-tuple (texts, error) where texts is a list with the text of the chunk, and error is None, or the
+    Et.ParseError or UnicodeDecodeError which has stopped the processing of the chunk.
+    """
+
+    (xml_file, start, end, regex_end_xml) = chunk
+    try:                                        # Catch errors resulting from reading non-text (xml) files
+        return [''.join(_iter_xml_documents(_read_xml_lines(xml_file, start, end), regex_end_xml))], None
+    except (Et.ParseError, UnicodeDecodeError) as err:
+        return [], err
 
 
 class Preprocessor:
 
+    # The size in bytes above which an xml file is divided into chunks processed concurrently by 'remove_xml_tags'
+    XML_CHUNK_SIZE = 32 * 1024 * 1024
+
     def __init__(self, sentences=None):
         """
         This is a constructor of any object of this class. Object will be constructed with the list of sentences given
@@ -39,18 +163,20 @@ class Preprocessor:
         # This is the regular expression of special words which might appear in the corpus and needed to be treated
         # as standalone words
         self.__special_words_regex = "[\\-:_~/><\"\[\]\{\}\(\)\+\*\|\'\=\&\^%\$#@`]"
+        # The regular expressions above compiled once. It is made again whenever any of them changes.
+        self.__tokenizer = Tokenizer(self.__ar_sent_terminator_regex, self.__special_words_regex)
         self.__regex_end_xml = "</DOC>"
         self.__xml_dir = None
         self.__corpus_dir = None
         self.__xml_file = None
         self.__corpus_file = None
-        # This is a list of 2-tuple where each tuple represents a corpus sentence and its terminator
+        # This is a sequence of 2-tuple where each tuple represents a corpus sentence and its terminator
         #               [(sent1, terminator1), .... ]
-        # If the parameter sentences, this attribute will be set to it. Otherwise, it will b constructed.
+        # The sentences are stored as arrays of word identifiers (see SentenceStore). If the parameter sentences is
+        # given, they will be added to it.
+        self.__sentences = SentenceStore(self.divide_sentence_into_words)
         if sentences:
-            self.__sentences = sentences
-        else:
-            self.__sentences = list()
+            self.__sentences.extend(sentences)
 
         self.__number_of_distinct_words = 0
         self.__number_of_words = 0
@@ -61,13 +187,24 @@ class Preprocessor:
         # where sentences_num is the number of the sentence where the word appears, and position is the position
         # in the sentence where the word appears (a word may appear more than once in a sentence).
         self.__vocabulary = dict()
+        # If this is True, the vocabulary will be built as a CompactVocabulary instead of a python dictionary.
+        self.__compact_vocabulary = False
         # Errors are stored in self.__errors as follows:
         #           self._errors = {(sentence_num, position): (correct, incorrect),
         #                           .....
         #                          }
         self.__errors = dict()
-        self.__words_list = list()
         # This holds the list of words that the model will learn to detect their contextual errors.
+        self.__words_list = list()
+        # This is the words list compiled into a set of words for fast lookups. It is compiled again whenever the
+        # words list is set.
+        self.__words_filter = SentenceFilter(self.__words_list)
+        # How the sentences are sampled to build the words list when it is not set (see 'set_verbs_sampling')
+        self.__verbs_sample_size = 1000
+        self.__verbs_from_whole_corpus = False
+        # This is the POS tagger used to tag the sentences. If it is None, the tagger shared by the whole program
+        # will be used.
+        self.__pos_tagger = None
         self.__number_of_sentences = 0
 
     def clear_sentences(self):
@@ -76,8 +213,7 @@ class Preprocessor:
         :return: None
         """
 
-        del self.__sentences
-        self.__sentences = list()
+        self.__sentences.clear()
 
     def clear_vocabulary(self):
         """
@@ -87,20 +223,50 @@ class Preprocessor:
         """
 
         del self.__vocabulary
-        self.__vocabulary = dict()
+        self.__vocabulary = CompactVocabulary() if self.__compact_vocabulary else dict()
         self.__number_of_distinct_words = 0
         self.__number_of_words = 0
 
     def get_sentences(self):
         """
-        Returns the sentences of the corpus. The elements of this list are 2-tuple where each tuple represents a
+        Returns the sentences of the corpus. The elements of this sequence are 2-tuple where each tuple represents a
         sentence and its terminator as follows:
                  [(sent1, terminator1), .... ]
-        :return: a list of sentences
+        The text of a sentence is built when it is accessed, so it is more efficient to use
+        'Preprocessor.get_sentence_words' if you need the words of the sentence.
+        :return: a sequence of sentences (SentenceStore)
         """
 
         return self.__sentences
 
+    def get_sentence_words(self, sent_num):
+        """
+        Returns the list of words of sentence number 'sent_num' as they are divided by
+        'Preprocessor.divide_sentence_into_words'. The sentence is only divided the first time its words are needed.
+        :param sent_num: The number of the sentence.
+        :return: A list of words.
+        """
+
+        return self.__sentences.get_words(sent_num)
+
+    def get_token_cache_statistics(self):
+        """
+        Returns the statistics of the tokens kept for the sentences: the number of times the words of a sentence have
+        been found already divided (hits), and the number of times a sentence has had to be divided (misses).
+        :return: A 2-tuple (hits, misses).
+        """
+
+        return self.__sentences.get_cache_statistics()
+
+    def reset_token_cache_statistics(self):
+        """
+        This method sets the numbers of hits and misses of the tokens kept for the sentences to zero (see
+        'get_token_cache_statistics').
+        :return: None
+        """
+
+        self.__sentences.reset_cache_statistics()
+
     def get_errors(self):
         """
         Returns the errors added in the corpus.
@@ -134,6 +300,26 @@ class Preprocessor:
 
         return self.__vocabulary
 
+    def set_compact_vocabulary(self, compact):
+        """
+        This method sets whether the vocabulary is built as a compact vocabulary (see 'CompactVocabulary') or as a
+        python dictionary. A compact vocabulary interns the words into integer identifiers and keeps their sentence
+        numbers and positions in flat arrays, which takes a fraction of the memory taken by the dictionary. Both
+        can be used the same way. The setting takes effect the next time the vocabulary is built or cleared.
+        Default is False.
+        :param compact: True to build a compact vocabulary, False to build a python dictionary.
+        :return: None
+        """
+
+        self.__compact_vocabulary = compact
+
+    def is_compact_vocabulary(self):
+        """
+        :return: True if the vocabulary is built as a compact vocabulary, False otherwise.
+        """
+
+        return self.__compact_vocabulary
+
     def get_number_of_words_in_vocabulary(self):
         """
         Returns the number of words in the vocabulary built from the corpus. These are the number of distinct words.
@@ -174,6 +360,7 @@ class Preprocessor:
         """
 
         self.__ar_sent_terminator_regex = regex
+        self.__tokenizer = Tokenizer(self.__ar_sent_terminator_regex, self.__special_words_regex)
 
     def is_sent_terminator(self, string):
         """
@@ -183,7 +370,7 @@ class Preprocessor:
         :return: True if sentence terminator, False otherwise.
         """
 
-        return True if re.match(self.__ar_sent_terminator_regex + "$", string) else False
+        return self.__tokenizer.is_terminator(string)
 
     def get_ar_sent_terminator_regex(self):
         """
@@ -201,6 +388,8 @@ class Preprocessor:
         """
 
         self.__special_words_regex = regex
+        self.__tokenizer = Tokenizer(self.__ar_sent_terminator_regex, self.__special_words_regex)
+        self.__sentences.invalidate_tokens()                # sentences need to be divided again with the new regex
 
     def get_special_words_regex(self):
         """
@@ -210,6 +399,15 @@ class Preprocessor:
 
         return self.__special_words_regex
 
+    def get_tokenizer(self):
+        """
+        Returns the tokenizer which divides texts into sentences and sentences into words with the current regular
+        expressions. A new tokenizer is made when any of the regular expressions changes.
+        :return: A Tokenizer object.
+        """
+
+        return self.__tokenizer
+
     def delete_word_from_corpus(self, word, sent_num, position):
         """
         This method deletes word 'word' in sentence number 'sent_num' at position 'position' from the corpus.
@@ -230,24 +428,18 @@ class Preprocessor:
             print("Cannot delete word! word position < 0: unacceptable position!")
             return
 
-        sent = list_of_sentences.pop(sent_num)
-        sent_string = sent[0]
-        sent_terminator = sent[1]
-        split_into_words = self.divide_sentence_into_words(sent_string)
+        split_into_words = list_of_sentences.get_words(sent_num)
         if len(split_into_words) - 1 < position:
             print("Cannot delete word! word position out of range: unacceptable position!")
             return
 
-        joint = ' '.join(split_into_words)
         if split_into_words[position] != word:
             print("Cannot delete word '" + word + "'! It does not exist in sentence number " + str(sent_num) +
-                  ". This sentence has been found instead:\n" + joint)
-            list_of_sentences.insert(sent_num, sent)
+                  ". This sentence has been found instead:\n" + ' '.join(split_into_words))
             return
 
         del split_into_words[position]
-        joint = ' '.join(split_into_words)
-        list_of_sentences.insert(sent_num, (joint, sent_terminator))
+        list_of_sentences.delete_word(sent_num, position)
 
         # If a vocabulary list for this object has not been built, then do not update the vocabulary list
         if not self.__vocabulary:
@@ -293,17 +485,13 @@ class Preprocessor:
             print("Cannot add word! word position < 0: unacceptable position!")
             return
 
-        sent = list_of_sentences.pop(sent_num)
-        sent_string = sent[0]
-        sent_terminator = sent[1]
-        split_into_words = self.divide_sentence_into_words(sent_string)
+        split_into_words = list_of_sentences.get_words(sent_num)
         if len(split_into_words) < position:
             print("Cannot add word! word position out of range: unacceptable position!")
-            list_of_sentences.insert(sent_num, sent)
             return
 
         split_into_words.insert(position, word)
-        list_of_sentences.insert(sent_num, (' '.join(split_into_words), sent_terminator))
+        list_of_sentences.insert_word(sent_num, position, word)
 
         # If a vocabulary list for this object has not been built, then do not update the vocabulary list
         if not self.__vocabulary:
@@ -332,6 +520,63 @@ class Preprocessor:
 
         self.__number_of_words += 1
 
+    def replace_word_in_corpus(self, word, replacement, sent_num, position):
+        """
+        This method replaces word 'word' in sentence number 'sent_num' at position 'position' with 'replacement'.
+        It has the same effect as deleting the word with 'delete_word_from_corpus' and adding the replacement with
+        'add_word_to_corpus' at the same position, but the replacement is done in place, so the positions of the
+        other words in the sentence and in the vocabulary do not change.
+        :param word: word to be replaced.
+        :param replacement: the word which will replace it.
+        :param sent_num: the sentence number where the word exists.
+        :param position: the position in the sentence where the word exists.
+        :return: None.
+        """
+
+        list_of_sentences = self.get_sentences()
+        if sent_num < 0:
+            print("Cannot replace word! Sentence index < 0: unacceptable sentence index!")
+            return
+        if len(list_of_sentences) - 1 < sent_num:
+            print("Cannot replace word! Sentence index out of range: unacceptable sentence index!")
+            return
+        if position < 0:
+            print("Cannot replace word! word position < 0: unacceptable position!")
+            return
+
+        word_ids = list_of_sentences.get_word_ids(sent_num)
+        if len(word_ids) - 1 < position:
+            print("Cannot replace word! word position out of range: unacceptable position!")
+            return
+
+        if list_of_sentences.get_lexicon().get_word(word_ids[position]) != word:
+            print("Cannot replace word '" + word + "'! It does not exist in sentence number " + str(sent_num) +
+                  ". This sentence has been found instead:\n" + ' '.join(list_of_sentences.get_words(sent_num)))
+            return
+
+        list_of_sentences.replace_word(sent_num, position, replacement)
+
+        # If a vocabulary list for this object has not been built, then do not update the vocabulary list
+        if not self.__vocabulary:
+            return
+
+        # Otherwise, move the position from the vocabulary entry of the word to the entry of the replacement
+        self.__vocabulary[word][sent_num].remove(position)
+        if not self.__vocabulary[word][sent_num]:
+            del self.__vocabulary[word][sent_num]
+            if not self.__vocabulary[word]:
+                del self.__vocabulary[word]
+                self.__number_of_distinct_words -= 1
+
+        if replacement in self.__vocabulary:
+            if sent_num in self.__vocabulary[replacement]:
+                bisect.insort(self.__vocabulary[replacement][sent_num], position)
+            else:
+                self.__vocabulary[replacement][sent_num] = [position]
+        else:
+            self.__vocabulary[replacement] = {sent_num: [position]}
+            self.__number_of_distinct_words += 1
+
     def set_xml_path_and_corpus_path(self, xml_source, corpus=None):
         """
         This method sets the path of the xml file(s) which will processed to remove the tags and generate the corpus
@@ -421,11 +666,17 @@ class Preprocessor:
             print("ERROR: Cannot set corpus path! Directory or file does not exist!")
             sys.exit(1)
 
-    def remove_xml_tags(self):
+    def remove_xml_tags(self, workers=1):
         """
         This method is passed either a file or a directory. If it is passed a directory, it removes the xml tags
         in the files in that directory, otherwise, it removes the xml tags in the file. If the destination is
         given the resulting file(s) are written in the destination.
+        The files are processed in chunks by a pool of worker processes: each file is a chunk, and a file larger than
+        Preprocessor.XML_CHUNK_SIZE bytes is divided after lines matching the regular expression of the last tag
+        (see 'set_regex_end_xml'), so that its chunks are processed concurrently. The text of the chunks is written
+        in the order of the files and the order of the chunks in each file.
+        :param workers: The number of worker processes. If it is None, the number of CPUs is used. Default is 1
+        (the files are processed in this process).
         :return: None
         """
 
@@ -435,7 +686,7 @@ class Preprocessor:
             sys.exit(1)
 
         if self.__xml_dir is None:
-            self.__remove_xml_tags_file(self.__xml_file, self.__corpus_file)
+            files = [(self.__xml_file, self.__corpus_file)]
         else:
             corpus_dir = self.__corpus_dir
             xml_dir = self.__xml_dir
@@ -443,58 +694,116 @@ class Preprocessor:
                 corpus_dir += os.sep
             if not self.__xml_dir.endswith(os.sep):         # if the directory path does not end with slash
                 xml_dir += os.sep
-            for file in os.listdir(xml_dir):         # remove xml tags in all the files in the directory
+            files = list()
+            for file in sorted(os.listdir(xml_dir)):       # remove xml tags in all the files in the directory
                 xml_file_name = xml_dir + file
                 corpus_file_name = corpus_dir + os.path.splitext(os.path.basename(xml_file_name))[0] + ".txt"
-                self.__remove_xml_tags_file(xml_file_name, corpus_file_name)
+                files.append((xml_file_name, corpus_file_name))
+
+        workers = workers if workers is not None else os.cpu_count()
+        chunks = [
+            (xml_file, start, end, self.__regex_end_xml)
+            for (xml_file, corpus_file) in files
+            for (start, end) in self.__divide_xml_file(xml_file, workers is not None and workers > 1)
+            ]
+        if workers is None or workers <= 1 or len(chunks) <= 1:
+            # The documents are written one by one as soon as they are parsed
+            results = (
+                (_iter_xml_documents(_read_xml_lines(xml_file, start, end), regex_end_xml), None)
+                for (xml_file, start, end, regex_end_xml) in chunks
+                )
+            self.__write_xml_chunks(files, chunks, results)
+        else:
+            with Pool(workers) as pool:
+                self.__write_xml_chunks(files, chunks, pool.imap(_remove_xml_tags_chunk, chunks))
 
         print("Finished removing XML tags successfully.")
 
-    def __remove_xml_tags_file(self, xml_file, corpus_file):
+    def __divide_xml_file(self, xml_file, divide):
         """
-        This is a private method and should not be called from outside the class. If you want to remove
-        the xml tags, please use the public method 'remove_xml_tags'
-        :param xml_file: a file containing xml documents
-        :param corpus_file: a file to which the corpus will be written after the xml tags have been removed
-        :return: None
+        This is a private method which divides an xml file into chunks of about Preprocessor.XML_CHUNK_SIZE bytes.
+        Each chunk, except the last one, ends with a line matching the regular expression of the last tag.
+        :param xml_file: The xml file.
+        :param divide: If False, the file is one chunk.
+        :return: A list of 2-tuple (start, end) of the offsets of the chunks in the file.
         """
 
-        print("Processing file " + xml_file + " to remove XML tags ....")
-        input_f = open(xml_file, 'rt', encoding="utf-8")
-        txt = ""
-        final_text = ""
+        size = os.path.getsize(xml_file)
+        if not divide or size <= Preprocessor.XML_CHUNK_SIZE:
+            return [(0, size)]
+
         end_xml = re.compile(self.__regex_end_xml)
-        try:                                        # Catch errors resulting from reading non-text (xml) files
+        chunks = list()
+        start = 0
+        input_f = open(xml_file, 'rb')
+        while start < size:
+            input_f.seek(start + Preprocessor.XML_CHUNK_SIZE)
+            input_f.readline()                              # skip the rest of the line
             for line in input_f:
-                if end_xml.search(line) is None:
-                    txt += line
-                else:
-                    try:
-                        txt += line
-                        tree = Et.fromstring(txt)
-                        final_text += Et.tostring(tree, encoding='unicode', method='text')
-                    except Et.ParseError as p_err:
-                        print(format(p_err), file=sys.stderr)
-                        print("ERROR: In parsing XML file " + xml_file, file=sys.stderr)
-                        input_f.close()
-                        sys.exit(1)
-                    else:
-                        txt = ""
-        except UnicodeDecodeError:
-            print("ERROR: Cannot read file: " + xml_file + ". It is not a readable text file!")
-            input_f.close()
-            return
-
+                # The last of the lines in 'line' when it is read as text (\r is a line separator as well)
+                line = line.decode("utf-8", errors="replace").replace("\r\n", "\n").rstrip("\n")
+                if end_xml.search(line.split("\r")[-1]) is not None:
+                    break
+            end = min(input_f.tell(), size)
+            chunks.append((start, end))
+            start = end
         input_f.close()
-        out_f = open(corpus_file, 'wt', encoding="utf-8")
-        out_f.write(final_text)
-        out_f.close()
 
-    def load_corpus_sentences(self):
+        return chunks
+
+    def __write_xml_chunks(self, files, chunks, results):
+        """
+        This is a private method which writes the text of the chunks of the xml files to the corpus files. The
+        results are in the order of the chunks, and the chunks are in the order of the files.
+        :param files: A list of 2-tuple (xml file, corpus file).
+        :param chunks: A list of 4-tuple (xml file, start, end, regular expression of the last tag).
+        :param results: An iterable of the results of the chunks as returned by '_remove_xml_tags_chunk', except
+        that the texts may be a generator which raises the error instead.
+        :return: None
+        """
+
+        results = iter(results)
+        chunk_num = 0
+        for (xml_file, corpus_file) in files:
+            print("Processing file " + xml_file + " to remove XML tags ....")
+            out_f = open(corpus_file, 'wt', encoding="utf-8")
+            while chunk_num < len(chunks) and chunks[chunk_num][0] == xml_file:
+                (texts, error) = next(results)
+                chunk_num += 1
+                if out_f is None:                           # the file is not readable
+                    continue
+                try:
+                    for text in texts:
+                        out_f.write(text)
+                    if error is not None:
+                        raise error
+                except Et.ParseError as p_err:
+                    print(format(p_err), file=sys.stderr)
+                    print("ERROR: In parsing XML file " + xml_file, file=sys.stderr)
+                    out_f.close()
+                    os.remove(corpus_file)
+                    sys.exit(1)
+                except UnicodeDecodeError:
+                    print("ERROR: Cannot read file: " + xml_file + ". It is not a readable text file!")
+                    out_f.close()
+                    os.remove(corpus_file)
+                    out_f = None
+
+            if out_f is not None:
+                out_f.close()
+
+    def load_corpus_sentences(self, workers=1):
         """
         This method loads the sentences of the corpus from the source. If the source is a directory, it processes all
-        readable files in this directory. If the source is a file, it process the corpus in this file.
-        Any previous loaded sentences will be cleared, and the sentences of the corpus will be the loaded ones.
+        readable files in this directory in the order of their names. If the source is a file, it process the corpus
+        in this file. Any previous loaded sentences will be cleared, and the sentences of the corpus will be the
+        loaded ones.
+        If the words list has not been set, it is built from the verbs in a sample of sentences (see
+        'set_verbs_sampling'): by default the first sentences of the first readable file, which is loaded before the
+        other files. The other files can be loaded concurrently by a pool of worker processes, and their sentences
+        are added in the order of the files.
+        :param workers: The number of worker processes. If it is None, the number of CPUs is used. Default is 1
+        (the files are loaded in this process).
         :return: None
         """
 
@@ -506,12 +815,42 @@ class Preprocessor:
             sys.exit(1)
 
         if self.__corpus_dir is None:
-            self.__load_file(self.__corpus_file)
+            files = [self.__corpus_file]
         else:
             if not self.__corpus_dir.endswith(os.sep):
                 self.__corpus_dir += os.sep
-            for file in os.listdir(self.__corpus_dir):
-                self.__load_file(self.__corpus_dir + file)
+            files = [self.__corpus_dir + file for file in sorted(os.listdir(self.__corpus_dir))]
+
+        if not self.__words_list and self.__verbs_from_whole_corpus:
+            print("Sampling " + str(self.__verbs_sample_size) +
+                  " sentences from the corpus to build the words list ....")
+            self.set_words_list(self.__draw_words_list(
+                VerbLexicon.sample_sentences(self.__iter_corpus_sentences(files), self.__verbs_sample_size)))
+
+        loaded = False
+        file_num = 0
+        while not self.__words_list and file_num < len(files):     # the words list is built from the first file
+            loaded = self.__load_file(files[file_num]) or loaded
+            file_num += 1
+
+        remaining_files = files[file_num:]
+        workers = workers if workers is not None else os.cpu_count()
+        if workers is None or workers <= 1 or len(remaining_files) <= 1:
+            for file in remaining_files:
+                loaded = self.__load_file(file) or loaded
+        else:
+            # The filter compiled from the words list is shipped once to each worker process
+            with Pool(workers, _init_worker, (self.__ar_sent_terminator_regex, self.__words_filter)) as pool:
+                for (file, result) in zip(remaining_files, pool.imap(_load_file_sentences, remaining_files)):
+                    print("Loading file " + file + " ....")
+                    loaded = self.__add_file_sentences(file, result) or loaded
+
+        if loaded:
+            #write the words in a text file
+            f_out = open("words_list.txt", 'wt', encoding="utf-8")
+            for w in self.__words_list:
+                f_out.write(w + "\n")
+            f_out.close()
 
         print("Finished loading the corpus successfully.")
 
@@ -520,72 +859,116 @@ class Preprocessor:
         This is a private method and should not be called from outside the Preprocessor class. If you want to load
         your corpus, use 'load_corpus(source)'.
         :param file: The file to load text from
-        :return: None
+        :return: True if the file has been loaded, False if it is not a readable text file.
         """
 
         print("Loading file " + file + " ....")
-        input_f = open(file, 'rt', encoding="utf-8")
-        final_text = ""
-        arabicL = re.compile('[\u0627-\u064a]')
-        numbers = re.compile('\d')
+        words_list = self.__words_list
+        words_filter = self.__words_filter
         try:                                        # Catch errors resulting from reading non-text files
-            for line in input_f:
-                # remove any alphanumeric characters and single letters
-                line = re.sub(r'[a-zA-Z\d\:\(\)\/\"]', ' ', line)
-                line = ' '.join([w for w in line.split() if len(w) > 1])
-                line = ' ' + line
-                final_text += line
+            sentences = self.iter_file_sentences(file)
+            # load sentences that have only the words in the words list
+            if not words_list:
+                first_sentences = list(itertools.islice(sentences, self.__verbs_sample_size))
+                words_list = self.__draw_words_list(first_sentences)
+                words_filter = SentenceFilter(words_list)
+                sentences = itertools.chain(first_sentences, sentences)
+
+            result = words_filter.select(sentences)
         except UnicodeDecodeError:
+            result = None
+
+        if result is not None:
+            (self.__words_list, self.__words_filter) = (words_list, words_filter)
+        return self.__add_file_sentences(file, result)
+
+    def __draw_words_list(self, sentences):
+        """
+        This is a private method which tags the given sentences, builds a lexicon of the verbs found in them and
+        draws a words list of 100 verbs from it randomly.
+        :param sentences: A list of 2-tuple (sent, terminator).
+        :return: The words list.
+        """
+
+        lexicon = VerbLexicon()
+        lexicon.add_tagged_sentences(self.get_pos_tagger().tag_sentences(s[0] for s in sentences))
+
+        return lexicon.sample(100)
+
+    def __iter_corpus_sentences(self, files):
+        """
+        This is a private method which yields the sentences of the given files one by one. Files which are not
+        readable text files are skipped from the point they cannot be read.
+        """
+
+        for file in files:
+            try:
+                yield from self.iter_file_sentences(file)
+            except UnicodeDecodeError:
+                continue
+
+    def __add_file_sentences(self, file, result):
+        """
+        This is a private method which adds the sentences selected from a corpus file to the sentences of this
+        object and reports the numbers of sentences.
+        :param file: The file the sentences have been loaded from.
+        :param result: A 2-tuple (selected sentences, number of sentences in the file) as returned by
+        'SentenceFilter.select', or None if the file is not a readable text file.
+        :return: True if the sentences have been added, False if the file is not readable.
+        """
+
+        if result is None:
             print("ERROR: Cannot read file: " + file + ". It is not a readable text file!")
-            input_f.close()
-            return
+            return False
 
-        input_f.close()
-        sentences = self.chop_off_text_into_sentences(final_text)
-        # load sentences that have only the words in the words list
-        if not self.__words_list:
-
-            file = open("temp.txt", 'w', encoding="utf-8")
-            for s in sentences[:1000]:
-                print(s[0] + '/n', file=file)
-            
-            file.close()
-            temp = check_output(
-            'java    -mx1g   -cp   stanford-postagger.jar:context_sensitive_spell_chk/lib/* edu.stanford.nlp.tagger.maxent.MaxentTagger    -model    context_sensitive_spell_chk/lib/arabic.tagger    -textFile temp.txt',
-            shell=True, stderr=PIPE)
-            tagged_subset = temp.decode("utf-8")
-            all_verbs_list = list()
-            for s in tagged_subset.split(" "):
-                if ("VB" in s.split("/")[1]) and len(s.split("/")[0]) > 4 and s.split("/")[0].isalpha() and not any(s.split("/")[0] in w for w in all_verbs_list):
-                    if  s.split("/")[0] in [all_verbs_list]:
-                        print("Duplicate $$$$$$$$$$$$$")
-                    all_verbs_list.append(s.split("/")[0])
-
-            self.__words_list = [all_verbs_list[random.randrange(len(all_verbs_list))] for item in range(100)]
-        new_sentences = list()
-        for (s, terminator) in sentences:
-            for w in s.split(" "):
-                if w in self.__words_list:
-                    new_sentences.append((s, terminator))
-                    break
+        (new_sentences, number_of_sentences) = result
         self.__number_of_sentences += len(new_sentences)
         print("Number of words: " + str(len(self.__words_list)))
-        print ("Number of sentences " + str(len(sentences)))
+        print ("Number of sentences " + str(number_of_sentences))
         print ("Number of new sentences " + str(self.__number_of_sentences))
 
-
-        #write the words in a text file
-        f_out = open("words_list.txt", 'wt', encoding="utf-8")
-        for w in self.__words_list:
-            f_out.write(w + "\n")
-        f_out.close()
-
         if new_sentences:
             # some list has been returned
             #self.clear_sentences()
             self.get_sentences().extend(new_sentences)
 
+        return True
 
+    def iter_file_sentences(self, file):
+        """
+        This method reads the corpus file 'file' line by line and yields its sentences one by one as 2-tuple of a
+        sentence and its terminator, (sent, terminator). Each line is cleaned from alphanumeric characters and
+        single letters, and the sentences are divided with respect to the terminators set in
+        'Preprocessor.set_ar_sent_terminator_regex', also when a sentence spans more than one line. The sentences are
+        the same as those returned by 'Preprocessor.chop_off_text_into_sentences' for the whole cleaned text of the
+        file, but only the text of the current sentence is kept in memory.
+        :param file: The file to read the sentences from.
+        :return: A generator of 2-tuple (sent, terminator).
+        """
+
+        terminators = re.compile("(" + self.__ar_sent_terminator_regex + ")")
+        # The pieces of text read since the last terminator
+        pending = list()
+        input_f = open(file, 'rt', encoding="utf-8")
+        try:
+            for line in input_f:
+                # remove any alphanumeric characters and single letters
+                line = re.sub(r'[a-zA-Z\d\:\(\)\/\"]', ' ', line)
+                line = ' ' + ' '.join([w for w in line.split() if len(w) > 1])
+                # Every line starts with a space, so a terminator never continues from one line to the next. The
+                # split list is [text, terminator, text, ...., terminator, text]
+                pieces = terminators.split(line)
+                for i in range(1, len(pieces), 2):
+                    pending.append(pieces[i - 1])
+                    yield ''.join(pending).strip(), pieces[i].strip()
+                    pending = list()
+                pending.append(pieces[-1])
+        finally:
+            input_f.close()
+
+        sentence = ''.join(pending).strip()
+        if sentence:                                                    # If the last sentence is not terminated
+            yield sentence, ""                                          # by a terminator
 
     def set_words_list(self, words_list):
         """
@@ -594,23 +977,193 @@ class Preprocessor:
                 :return:
                 """
         self.__words_list = words_list
+        self.__words_filter = SentenceFilter(words_list)
 
 
     def get_words_list(self):
         """
-                This method returns the words list.
+                This method returns the words list. The list itself is returned, not a copy, so it must not be
+                changed in place; the words list is changed with 'set_words_list', otherwise the filter compiled
+                from it (see 'get_sentence_filter') would not match it anymore.
                 :param:
                 :return: words_list: A list of words to build the model upon.
                 """
         return self.__words_list
 
+    def set_verbs_sampling(self, sample_size=1000, whole_corpus=False):
+        """
+        This method sets how the sentences are sampled when the words list is built from the verbs found in them by
+        the POS tagger. The words list is built by 'load_corpus_sentences' when it has not been set.
+        :param sample_size: The number of sentences to tag. Default is 1000.
+        :param whole_corpus: If True, the sentences are drawn uniformly from all the corpus files in one pass before
+        the corpus is loaded. Otherwise, the first sentences of the first readable file are taken. Default is False.
+        :return: None
+        """
+
+        self.__verbs_sample_size = sample_size
+        self.__verbs_from_whole_corpus = whole_corpus
+
+    def get_sentence_filter(self):
+        """
+        Returns the filter compiled from the words list. It is compiled again whenever the words list is set.
+        :return: A SentenceFilter object.
+        """
+
+        return self.__words_filter
+
+    def set_pos_tagger(self, tagger):
+        """
+        This method sets the POS tagger used to tag the sentences of this object.
+        :param tagger: A POSTagger object. If it is None, the tagger shared by the whole program will be used.
+        :return: None
+        """
+
+        self.__pos_tagger = tagger
+
+    def get_pos_tagger(self):
+        """
+        Returns the POS tagger used to tag the sentences of this object.
+        :return: The POSTagger object set by 'set_pos_tagger', or the tagger shared by the whole program.
+        """
+
+        return self.__pos_tagger if self.__pos_tagger is not None else get_default_tagger()
+
+
+    def split(self, fraction, seed=10):
+        """
+        This method partitions the sentences of this object into two new Preprocessor objects. The second object
+        takes ceil(fraction * number of sentences) sentences drawn randomly, and the first object takes the rest of
+        the sentences in their original order. The sentences are drawn exactly as they would be drawn by calling
+        'random.seed(seed)' and then popping 'random.randint(0, length - 1)' repeatedly with 'pop_sentence', so the
+        partitions and the state of the 'random' module afterwards are the same as with the repeated popping. However,
+        the partitioning is done in one pass, and this object is left unchanged.
+
+        If a vocabulary has been built for this object, a vocabulary is built for each of the new objects. Errors are
+        carried over to the object which has taken their sentence with the sentence numbers updated. The regular
+        expressions, the words list and the vocabulary settings are copied to both objects.
+        :param fraction: The fraction of the sentences which will be drawn. It has to be in the interval [0-1].
+        :param seed: The seed of the 'random' module. Default is 10.
+        :return: A 2-tuple of Preprocessor objects (rest of the sentences, drawn sentences).
+        """
+
+        if not 0 <= fraction <= 1:
+            print("The value of test set percentage is invalid! Exiting the system")
+            sys.exit(1)
+
+        length = len(self.__sentences)
+        drawn_size = math.ceil(length * fraction)
+
+        # A Fenwick tree over the sentences which have not been drawn yet. It finds the original index of the k-th
+        # remaining sentence in O(log n), which is the sentence 'pop_sentence(k)' would pop.
+        tree = [0] + [1] * length
+        for i in range(1, length + 1):
+            parent = i + (i & -i)
+            if parent <= length:
+                tree[parent] += tree[i]
+        top_bit = 1 << (length.bit_length() - 1) if length else 0
+
+        random.seed(seed)
+        drawn = list()
+        remaining = length
+        for _ in range(drawn_size):
+            k = random.randint(0, remaining - 1) + 1            # draw the same way as with popping sentences
+            index = 0
+            bit = top_bit
+            while bit:
+                if index + bit <= length and tree[index + bit] < k:
+                    index += bit
+                    k -= tree[index]
+                bit >>= 1
+            drawn.append(index)                                 # index + 1 is the 1-based position in the tree
+            i = index + 1
+            while i <= length:
+                tree[i] -= 1
+                i += i & -i
+            remaining -= 1
+
+        is_drawn = bytearray(length)
+        for index in drawn:
+            is_drawn[index] = 1
+        rest = [index for index in range(length) if not is_drawn[index]]
+
+        return self.__partition(rest), self.__partition(drawn)
+
+    def k_fold_split(self, k, seed=10):
+        """
+        This method partitions the sentences of this object into 'k' folds for cross-validation. The sentences are
+        shuffled once after calling 'random.seed(seed)' and dealt into 'k' folds of nearly equal sizes. For each
+        fold, a pair of new Preprocessor objects is made as with 'split': the first object takes the sentences of
+        the other folds and the second object takes the sentences of the fold, both in their original order. The
+        pairs are made one at a time as they are iterated over, so only one pair has to be kept at a time. This
+        object is left unchanged.
+        :param k: The number of folds. It has to be at least 2 and not more than the number of sentences.
+        :param seed: The seed of the 'random' module. Default is 10.
+        :return: An iterator over 'k' 2-tuple of Preprocessor objects (training sentences, test sentences).
+        """
+
+        length = len(self.__sentences)
+        if not 2 <= k <= length:
+            print("The number of folds is invalid! It has to be at least 2 and not more than the number of "
+                  "sentences. Exiting the system")
+            sys.exit(1)
+
+        random.seed(seed)
+        order = list(range(length))
+        random.shuffle(order)
+        folds = [sorted(order[i::k]) for i in range(k)]
+
+        return self.__iterate_folds(folds)
+
+    def __iterate_folds(self, folds):
+        """
+        This is a private method which makes the pairs of Preprocessor objects of the given folds (see
+        'k_fold_split').
+        """
+
+        for fold in folds:
+            in_fold = bytearray(len(self.__sentences))
+            for index in fold:
+                in_fold[index] = 1
+            rest = [index for index in range(len(self.__sentences)) if not in_fold[index]]
+            yield self.__partition(rest), self.__partition(fold)
+
+    def __partition(self, sent_nums):
+        """
+        This is a private method which builds a new Preprocessor object from sentences of this object. If you want
+        to partition the sentences, use the public method 'split'.
+        :param sent_nums: The numbers of the sentences, in the order they will have in the new object.
+        :return: The new Preprocessor object.
+        """
+
+        partition = Preprocessor()
+        partition.set_ar_sent_terminator_regex(self.__ar_sent_terminator_regex)
+        partition.set_special_words_regex(self.__special_words_regex)
+        partition.__sentences = self.__sentences.subset(sent_nums, partition.divide_sentence_into_words)
+        partition.set_regex_end_xml(self.__regex_end_xml)
+        partition.set_words_list(self.__words_list)
+        partition.set_pos_tagger(self.__pos_tagger)
+        partition.set_compact_vocabulary(self.__compact_vocabulary)
+        partition.__number_of_sentences = len(sent_nums)
+
+        if self.__errors:
+            new_sent_num = {old: new for (new, old) in enumerate(sent_nums)}
+            partition.__errors = {
+                (new_sent_num[sent_n], pos): error
+                for (sent_n, pos), error in self.__errors.items() if sent_n in new_sent_num
+                                 }
+
+        if self.__vocabulary:
+            partition.build_vocabulary()
+
+        return partition
 
     def pop_sentence(self, sent_num):
         """
         This method pops and returns sentence number 'sent_num' from the sentences in this object.
 
         NOTE: It is always more efficient to use this method before you build the vocabulary. As popping a sentence,
-        after building a vocabulary causes deleting all the words constituting it from the vocabulary.
+        after building a vocabulary causes deleting all the words constituting it from the vocabulary. If you want
+        to draw many sentences, use 'split' instead, which partitions the sentences in one pass.
         :param sent_num: The number of sentence to be popped.
         :return:
         """
@@ -618,12 +1171,14 @@ class Preprocessor:
         if not self.__sentences:
             return
 
+        words = self.__sentences.get_words(sent_num) if self.__vocabulary else None
         sentence_tuple = self.__sentences.pop(sent_num)                               # pop the sentence
         sentence = sentence_tuple[0]
 
         # If the vocabulary has been built, delete the words of the sentence from the vocabulary.
-        if self.__vocabulary:
-            words = self.divide_sentence_into_words(sentence)                       # get a list of its words
+        if self.__vocabulary and isinstance(self.__vocabulary, CompactVocabulary):
+            self.__vocabulary.remove_sentence(sent_num)
+        elif self.__vocabulary:
             # Put them in a set to delete them from the vocabulary. Putting them in a set,
             # is aimed to delete word which exists twice in the sentence only once
             set_words = set(words)
@@ -672,27 +1227,7 @@ class Preprocessor:
         :return: a list of tuples of sentences and their respected terminators.
         """
 
-        if text.isspace() or not text:                                          # if the text is just spaces or empty
-            return
-
-        # Split sentence with respect to the terminators and keep the terminators as elements of the list
-        s = re.split("(" + self.get_ar_sent_terminator_regex() + ")", text)
-        # Remove empty string and spaces resulting from the splitting
-        s = [word.strip() for word in s if word and not word.isspace()]
-
-        sentence = ""
-        final_list = list()
-        for sent in s:
-            if self.is_sent_terminator(sent):
-                final_list.append((sentence, sent))
-                sentence = ""
-            else:
-                sentence += sent
-
-        if sentence:                                                        # If the last sentence is not terminated
-            final_list.append((sentence, ""))                               # by a terminator
-
-        return final_list
+        return self.__tokenizer.split_sentences(text)
 
     @staticmethod
     def levenshtein(s, t):
@@ -727,6 +1262,68 @@ class Preprocessor:
 
         return v1[len(t)]
 
+    @staticmethod
+    def levenshtein_many(query, candidates, max_d=None):
+        """
+        This method computes the Levenshtein distance between the string 'query' and each of the strings in
+        'candidates'. The distances are the same as those computed by 'Preprocessor.levenshtein', but they are
+        computed with the bit-parallel algorithm of Myers (1999), in the form given by Hyyro (2001) for the distance
+        between two whole strings: one column of the dynamic programming table is updated with a few operations on
+        python integers whose bits stand for the characters of 'query'. The bit masks of 'query' are built once and
+        used for all the candidates.
+
+        If 'max_d' is given, the computation for a candidate is cut off as soon as its distance is known to be
+        greater than 'max_d', and 'max_d + 1' is returned as its distance.
+        :param query: The string to compare the candidates with.
+        :param candidates: An iterable of strings.
+        :param max_d: The greatest distance of interest. Default is None, which means no cut-off.
+        :return: A list of the distances between 'query' and the candidates, in the order of the candidates.
+        """
+
+        m = len(query)
+        # For each character, a bit mask of the positions where it appears in 'query'
+        peq = dict()
+        for (i, c) in enumerate(query):
+            peq[c] = peq.get(c, 0) | (1 << i)
+        mask = (1 << m) - 1
+        last = 1 << (m - 1) if m else 0
+
+        distances = list()
+        for t in candidates:
+            n = len(t)
+            if max_d is not None and abs(n - m) > max_d:    # the distance is at least the difference in length
+                distances.append(max_d + 1)
+                continue
+            if m == 0:
+                distances.append(n)
+                continue
+
+            pv = mask                                       # vertical positive deltas of the current column
+            mv = 0                                          # vertical negative deltas of the current column
+            score = m                                       # the distance between 'query' and the prefix of 't'
+            for (j, c) in enumerate(t):
+                eq = peq.get(c, 0)
+                xv = eq | mv
+                xh = (((eq & pv) + pv) ^ pv) | eq
+                ph = mv | (~(xh | pv) & mask)
+                mh = pv & xh
+                if ph & last:
+                    score += 1
+                elif mh & last:
+                    score -= 1
+                # The first row of the table is 0, 1, 2, ... so its horizontal deltas are all positive
+                ph = ((ph << 1) | 1) & mask
+                mh = (mh << 1) & mask
+                pv = mh | (~(xv | ph) & mask)
+                mv = ph & xv
+                # The score can drop by at most one for each of the remaining characters of 't'
+                if max_d is not None and score - (n - j - 1) > max_d:
+                    break
+
+            distances.append(score if max_d is None or score <= max_d else max_d + 1)
+
+        return distances
+
     def divide_sentence_into_words(self, text):
         """
         This method divides a sentences into a list of its constituting words. Special words set by
@@ -735,11 +1332,9 @@ class Preprocessor:
         :return: A list of words constituting the sentence.
         """
 
-        # Split each sentence into its constituting words. Keep the special characters (e.g. '{', '[', '-', ... etc)
-        # As they will also be considered separate words in the vocabulary list.
-        words_of_sent = re.split("\s|(" + self.__special_words_regex + ")", text)
-        # do not add sentence terminators in the vocabulary
-        return [word for word in words_of_sent if word and not word.isspace()]
+        # Special characters (e.g. '{', '[', '-', ... etc) are kept as they will also be considered separate words in
+        # the vocabulary list.
+        return self.__tokenizer.split_words(text)
 
     def build_vocabulary(self):
         """
@@ -758,10 +1353,17 @@ class Preprocessor:
             print("There is an empty list of sentences! No vocabulary list has been built.")
             return
 
-        for (sent_num, sent) in enumerate(list_sentences):
+        if self.__compact_vocabulary:
+            self.__number_of_words = self.__vocabulary.build(
+                list_sentences.get_words(sent_num) for sent_num in range(len(list_sentences)))
+            self.__number_of_distinct_words = len(self.__vocabulary)
+            print("Finished building vocabulary list.")
+            return
+
+        for sent_num in range(len(list_sentences)):
             # Split each sentence into its constituting words. Keep the special characters (e.g. '{', '[', '-', ... etc)
             # do not add sentence terminators in the vocabulary
-            words_of_sent = self.divide_sentence_into_words(sent[0])
+            words_of_sent = list_sentences.get_words(sent_num)
             for (position, word) in enumerate(words_of_sent):
                 if word not in self.__vocabulary:
                     self.__vocabulary[word] = {sent_num: [position]}
@@ -857,13 +1459,22 @@ class Preprocessor:
 
 
 
-    def put_errors_in_n_words_from_list(self, vocabulary, d=1):
+    def put_errors_in_n_words_from_list(self, vocabulary, d=1, seed=None, workers=1, catalog=None):
         """
         This method inserts an error in every sentence in the word from the main list of words. It provides a version
-        of a correct and incorrect examples of the same word
+        of a correct and incorrect examples of the same word. The first word of a sentence found in the words list is
+        replaced with a word from the vocabulary, drawn randomly amongst those with distance 'd' from it. The errors
+        are chosen by an 'ErrorInjector', so the same errors are put for the same seed whatever the number of
+        workers is.
         :param vocabulary: The vocabulary from which words will be looked up to replace other words.
-        :param n: Number of words amongst which an error will be placed. Default is 500.
-        :param d: The string distance between the correct word and the erroneous word. Default is 1.
+        :param d: The string distance between the correct word and the erroneous word (see
+        'CandidateIndex.candidates'). Default is 1.
+        :param seed: The master seed from which the seeds of the sentences are derived. If it is None, it is drawn
+        from the 'random' module. Default is None.
+        :param workers: The number of worker processes which choose the errors. If it is None, the number of CPUs
+        is used. Default is 1.
+        :param catalog: The ConfusionSetCatalog of the vocabulary, from which the replacements are drawn. If it is
+        None, the confusion sets of the words list are computed from the vocabulary. Default is None.
         :return: None
         """
 
@@ -871,73 +1482,45 @@ class Preprocessor:
             print("There are no words in the given vocabulary list! Errors cannot be put.")
             return
 
-        if d == 1:                                  # If distance is set to 1, set called method to edit1
-            distance = self.edits1_in_vocabulary
-        elif d == 2:                                # If distance is set to 2, set called method to edit 2
-            distance = self.edits2_in_vocabulary
-        else:                                       # Otherwise, unacceptable and return
+        if d < 1:                                   # The distance has to be at least one edit
             print("The value of the distance is not acceptable! No error will be put")
             return
 
-        # print("Introducing errors to the corpus in every " + str(n) + " words by replacing a randomly selected " +
-        #      "word with another from the given vocabulary ....")
-
         self.clear_errors()                                             # clear any previous list of errors
-        sentences = self.get_sentences()                                # get sentences
-
-        alphabet = Preprocessor.build_alphabet(vocabulary)
-
-        sentences_processed = 0                                         # start from the first sentence
-        # initialise a list of words. This list will contain words, the sentences they are in and the position in the
-        # sentences in a tuple as follows: [(word1,sent,position), ....]
-        words = list()
-        # This variable is the starting number of the sentences which the loop will look for a word to replace.
-        sentence_offset = 0
-        while sentences_processed < len(sentences):
-            # get the list of words in sentence number sentences_processed
-            list_of_words = self.divide_sentence_into_words(sentences[sentences_processed][0])
-            # add them to the list of words in the structure described above
-            words.extend([(wrd, sentences_processed, position) for (position, wrd) in enumerate(list_of_words)])
-            number_of_words = len(words)
-            # if the number of words reached the given parameter 'n', or no more sentences to processes,
-            # Then start looking for a ward to replace.
-            # get the word listed in the training words list
-            try:
-                # Select the first word found in the list
-                # to_delete_index = next(wrd[2] for wrd in words if wrd[0] in words_list)
-                # Select a word found in the list randomly
-                #to_delete_index = random.choice(list(wrd[2] for wrd in words if wrd[0] in self.__words_list))
-                to_delete_index = next(wrd[2] for wrd in words if wrd[0] in self.__words_list)
-            except (StopIteration, IndexError) as error:
-                sentences_processed += 1
-                continue
-            to_replace = words[to_delete_index]
-            # find a list of possible replacements with distance 'd'
-            possible_replacements = list(distance(to_replace[0], vocabulary, alphabet))
-            # If there are replacement to this word in the vocabulary distance
-            if possible_replacements:
-                replacement = possible_replacements[random.randint(0, len(possible_replacements) - 1)]
-                self.delete_word_from_corpus(to_replace[0], to_replace[1], to_replace[2])
-                self.add_word_to_corpus(replacement, to_replace[1], to_replace[2])
-                self.__errors[(to_replace[1], to_replace[2])] = (to_replace[0], replacement)
-                # Refresh the list of words for processing another group
-            del words
-            words = list()
-            # print("Finished inserting an error in sentence number : " + str(sentences_processed))
-            sentences_processed += 1
+        if catalog is None:
+            catalog = ConfusionSetCatalog(vocabulary, self.__words_list)
+        injector = ErrorInjector(catalog, self.__words_list, d, seed, workers)
+        print("Introducing errors to the corpus with the seed " + str(injector.get_seed()) + " ....")
 
-        print("Finished putting errors in the corpus.")
+        # Each sentence which has a word from the words list is a group by itself
+        groups = list()
+        for sent_num in range(len(self.get_sentences())):
+            words = self.get_sentence_words(sent_num)
+            if self.__words_filter.matches_words(words):
+                groups.append([(sent_num, words)])
+
+        self.__put_found_errors(injector.find_errors(groups, first_only=True))
 
+        print("Finished putting errors in the corpus.")
 
-    def put_errors_in_n_words_with_distance_from_list(self, vocabulary, n=300, d=1):
+    def put_errors_in_n_words_with_distance_from_list(self, vocabulary, n=300, d=1, seed=None, workers=1,
+                                                      catalog=None):
         """
         This method puts spelling errors in every 'n' words of the text. The error is made by choosing
         the least number of sentences constituting words greater than or equal to 'n', and then picking a word
         from the words' list found in these sentences and substituting with another word from the provided vocabulary
-        whose distance from correct word is 'd'.
+        whose distance from correct word is 'd'. The errors are chosen by an 'ErrorInjector', so the same errors are
+        put for the same seed whatever the number of workers is.
         :param vocabulary: The vocabulary from which words will be looked up to replace other words.
-        :param n: Number of words amongst which an error will be placed. Default is 500.
-        :param d: The string distance between the correct word and the erroneous word. Default is 1.
+        :param n: Number of words amongst which an error will be placed. Default is 300.
+        :param d: The string distance between the correct word and the erroneous word (see
+        'CandidateIndex.candidates'). Default is 1.
+        :param seed: The master seed from which the seeds of the groups of sentences are derived. If it is None, it
+        is drawn from the 'random' module. Default is None.
+        :param workers: The number of worker processes which choose the errors. If it is None, the number of CPUs
+        is used. Default is 1.
+        :param catalog: The ConfusionSetCatalog of the vocabulary, from which the replacements are drawn. If it is
+        None, the confusion sets of the words list are computed from the vocabulary. Default is None.
         :return: None
         """
 
@@ -945,75 +1528,56 @@ class Preprocessor:
             print("There are no words in the given vocabulary list! Errors cannot be put.")
             return
 
-        if d == 1:  # If distance is set to 1, set called method to edit1
-            distance = self.edits1_in_vocabulary
-        elif d == 2:  # If distance is set to 2, set called method to edit 2
-            distance = self.edits2_in_vocabulary
-        else:  # Otherwise, unacceptable and return
+        if d < 1:  # The distance has to be at least one edit
             print("The value of the distance is not acceptable! No error will be put")
             return
 
-        # print("Introducing errors to the corpus in every " + str(n) + " words by replacing a randomly selected " +
-        #      "word with another from the given vocabulary ....")
-
         self.clear_errors()  # clear any previous list of errors
-        sentences = self.get_sentences()  # get sentences
-
-        alphabet = Preprocessor.build_alphabet(vocabulary)
-
-        sentences_processed = 0  # start from the first sentence
-        # initialise a list of words. This list will contain words, the sentences they are in and the position in the
-        # sentences in a tuple as follows: [(word1,sent,position), ....]
-        words = list()
-        # This variable is the starting number of the sentences which the loop will look for a word to replace.
-        sentence_offset = 0
-        while sentences_processed < len(sentences):
-            # get the list of words in sentence number sentences_processed
-            list_of_words = self.divide_sentence_into_words(sentences[sentences_processed][0])
-            # add them to the list of words in the structure described above
-            words.extend([(wrd, sentences_processed, position) for (position, wrd) in enumerate(list_of_words)])
-            number_of_words = len(words)
-            # if the number of words reached the given parameter 'n', or no more sentences to processes,
-            # Then start looking for a ward to replace.
-            if number_of_words >= n or sentences_processed == (len(sentences) - 1):
-                found = False
-                # while a word with a vocabulary entry with the specified distance is found, and there is still
-                # words to look for then loop.
-                while words and not found:
-                    # look randomly for a word to replace in the list of words.
-                    to_delete_index = next(wrd[2] for wrd in words if wrd[0] in self.__words_list)
-                    to_replace = words[to_delete_index]
-                    # find a list of possible replacements with distance 'd'
-                    possible_replacements = list(distance(to_replace[0], vocabulary, alphabet))
-                    # If there are replacement to this word in the vocabulary distance
-                    if possible_replacements:
-                        replacement = possible_replacements[random.randint(0, len(possible_replacements) - 1)]
-                        # print("Replacing word '" + to_replace[0] + "' in sentence number " +
-                        #      str(to_replace[1]) + " at position " + str(to_replace[2]) +
-                        #      " with word '" + replacement + "'")
-                        self.delete_word_from_corpus(to_replace[0], to_replace[1], to_replace[2])
-                        self.add_word_to_corpus(replacement, to_replace[1], to_replace[2])
-                        self.__errors[(to_replace[1], to_replace[2])] = (to_replace[0], replacement)
-                        found = True
-                    else:
-                        # No vocabulary word exist which is with distance from this word
-                        # so delete this one from a possible to_replace list and check another word.
-                        del words[to_delete_index]
-                # If a word cannot be found with vocabulary list entry with the specified distance in the list of
-                # words built from the processed sentences.
-                if not found:
-                    print("Could not find a word to replace in the sentences residing between: " +
-                          str(sentence_offset) + " and " + str(sentences_processed))
-                # Refresh the list of words for processing another group
-                del words
-                words = list()
-                # Move to the next block to look for another word
-                sentence_offset = sentences_processed + 1
-
-            sentences_processed += 1
+        if catalog is None:
+            catalog = ConfusionSetCatalog(vocabulary, self.__words_list)
+        injector = ErrorInjector(catalog, self.__words_list, d, seed, workers)
+        print("Introducing errors to the corpus in every " + str(n) + " words with the seed " +
+              str(injector.get_seed()) + " ....")
+
+        # Divide the sentences into groups of the least number of sentences constituting 'n' words or more. The last
+        # group has the remaining sentences.
+        number_of_sentences = len(self.get_sentences())
+        groups = list()
+        group = list()
+        number_of_words = 0
+        for sent_num in range(number_of_sentences):
+            words = self.get_sentence_words(sent_num)
+            group.append((sent_num, words))
+            number_of_words += len(words)
+            if number_of_words >= n or sent_num == number_of_sentences - 1:
+                groups.append(group)
+                group = list()
+                number_of_words = 0
+
+        errors = injector.find_errors(groups)
+        for (group, error) in zip(groups, errors):
+            # If a word cannot be found with vocabulary list entry with the specified distance in the group
+            if error is None:
+                print("Could not find a word to replace in the sentences residing between: " +
+                      str(group[0][0]) + " and " + str(group[-1][0]))
+        self.__put_found_errors(errors)
 
         print("Finished putting errors in the corpus.")
 
+    def __put_found_errors(self, errors):
+        """
+        This is a private method which puts the errors chosen by an 'ErrorInjector' in the corpus and records them.
+        :param errors: A list of 4-tuple (sent_num, position, correct, replacement) or None.
+        :return: None
+        """
+
+        for error in errors:
+            if error is None:
+                continue
+            (sent_num, position, correct, replacement) = error
+            self.replace_word_in_corpus(correct, replacement, sent_num, position)
+            self.__errors[(sent_num, position)] = (correct, replacement)
+
     def write_sentences(self, file_name=sys.stdout):
         """
         This method writes the the current sentences to the given file. Each sentence is written in a separate line.
@@ -1080,13 +1644,13 @@ class Preprocessor:
         # Label columns
         out_f.write('{0:20}{1:<20}{2}'.format('WORD', 'SENTENCE NO.', 'POSITIONS') + '\n')
         out_f.write('{:_<80}'.format('') + '\n')                          # Write '_' under the labels
-        for word in self.__vocabulary:                                    # for each word in vocabulary
+        for (word, postings) in self.__vocabulary.items():               # for each word in vocabulary
             out_f.write(word + ":")                                       # write the word
             # get the sentences on which this word appears
             # sort them so for convenient printing
-            sent_num = sorted(self.__vocabulary[word].keys())
+            sent_num = sorted(postings.keys())
             for sent in sent_num:                                         # write the sentence numbers and the positions
-                out_f.write('{0:20}{1:<20}{2}'.format('', sent, str(self.__vocabulary[word][sent])) + '\n')
+                out_f.write('{0:20}{1:<20}{2}'.format('', sent, str(postings[sent])) + '\n')
 
             out_f.write("########################\n")                     # write this at the end of each word entry
 
@@ -0,0 +1,211 @@
+"""
+Created in 2016
+
+@authors: Atheer Alkhalifa, Lamia Alkwai, Waleed Alsanie and Mohamed Alkanhal
+         The National Center for Computation Technology & Applied Mathematics
+         {aalkhalifa,lalkwai,walsanie, alkanhal} [at] kacst [dot] edu [dot] sa
+
+This class is part of a context sensitive spell checking module. It is aimed to provide the semantic categories of
+the words of the corpus from the Arabic WordNet ontology.
+"""
+
+
+import os
+from subprocess import Popen, PIPE, DEVNULL, CalledProcessError, check_output
+from .stemming import get_default_stemming_service
+
+
+class OntologyQuery:
+
+    # The category given to the words which the ontology has not returned a category for
+    DEFAULT_CATEGORY = "Some_Name_Or_Act"
+    # The ontology answering a single query given as its arguments
+    DEFAULT_COMMAND = ['java', '-jar', 'queryAWOntology.jar']
+    # The ontology answering the queries in a loop, one per line (see 'lib/QueryAWOntologyLoop.java')
+    DEFAULT_LOOP_COMMAND = ['java', 'context_sensitive_spell_chk/lib/QueryAWOntologyLoop.java', 'queryAWOntology.jar']
+
+    def __init__(self, command=None, persistent=True):
+        """
+        This is a constructor of an object which queries the ontology for the semantic category of a word. The
+        ontology can be queried in two ways:
+            - persistent=True: the command is started once and kept running. Each query is written to its standard
+              input as a line: word<TAB>stem<TAB><TAB>0, and the answer is read from one line of its standard output.
+              The default command runs 'queryAWOntology.jar' in a loop through 'lib/QueryAWOntologyLoop.java', so
+              the JVM is started and the ontology is loaded only once.
+            - persistent=False: the command is run once for each word with the arguments: word stem "" 0. This is
+              how 'queryAWOntology.jar' answers queries.
+        In both ways the category is the last space-separated token before the first comma of the answer.
+        :param command: The command which runs the ontology as a list of arguments. Default is
+        OntologyQuery.DEFAULT_LOOP_COMMAND if the queries are persistent, OntologyQuery.DEFAULT_COMMAND otherwise. A
+        local script can be given instead for testing.
+        :param persistent: If True, a single process answers all the queries. Default is True.
+        :return:
+        """
+
+        if command is None:
+            command = OntologyQuery.DEFAULT_LOOP_COMMAND if persistent else OntologyQuery.DEFAULT_COMMAND
+        self.__command = command
+        self.__persistent = persistent
+        self.__process = None
+
+    @staticmethod
+    def __parse(answer):
+        """
+        This is a private method which extracts the category from the answer of the ontology.
+        """
+
+        category = answer.split(",")[0].split("\n")[0].split(" ")[-1].strip()
+        return category if category else OntologyQuery.DEFAULT_CATEGORY
+
+    def __ask(self, word, stem):
+        """
+        This is a private method which writes a query to the ontology process and reads its answer. The process is
+        started if it is not running.
+        :return: The answer, or None if the process has stopped before answering.
+        """
+
+        if self.__process is None or self.__process.poll() is not None:
+            self.__process = Popen(self.__command, stdin=PIPE, stdout=PIPE, stderr=DEVNULL, encoding="utf-8",
+                                   bufsize=1)
+        try:
+            self.__process.stdin.write(word + "\t" + stem + "\t\t0\n")
+            self.__process.stdin.flush()
+        except BrokenPipeError:
+            return None
+        answer = self.__process.stdout.readline()
+
+        return answer if answer else None
+
+    def query(self, word, stem):
+        """
+        Returns the semantic category of a word.
+        :param word: The word.
+        :param stem: The stem of the word.
+        :return: The category of the word, or OntologyQuery.DEFAULT_CATEGORY if the ontology has not returned any.
+        It raises IOError if the ontology process stops, and it is not answering after it has been started again.
+        """
+
+        if not self.__persistent:
+            try:
+                return OntologyQuery.__parse(check_output(self.__command + [word, stem, "", "0"],
+                                                          stderr=DEVNULL).decode(encoding="UTF-8"))
+            except (CalledProcessError, UnicodeDecodeError):    # the word is not in the ontology
+                return OntologyQuery.DEFAULT_CATEGORY
+
+        answer = self.__ask(word, stem)
+        if answer is None:                                      # the process has stopped, so it is started again
+            self.close()
+            answer = self.__ask(word, stem)
+        if answer is None:
+            self.close()
+            raise IOError("The ontology has stopped: " + ' '.join(self.__command))
+
+        return OntologyQuery.__parse(answer)
+
+    def close(self):
+        """
+        This method stops the ontology process when the queries are persistent.
+        :return: None
+        """
+
+        if self.__process is not None:
+            try:
+                self.__process.stdin.close()
+            except BrokenPipeError:                             # the process has already stopped
+                pass
+            self.__process.wait()
+            self.__process.stdout.close()
+            self.__process = None
+
+
+class SemanticCategoryTable:
+
+    def __init__(self, ontology=None, stem=None):
+        """
+        This is a constructor of an empty table of the semantic categories of words. The table is filled by 'build'
+        from a vocabulary, so the ontology is queried once for each distinct word (and its stem) instead of once for
+        each occurrence of the word in the corpus. The table can be saved to a file and loaded again.
+        :param ontology: The OntologyQuery object used to query the categories. Default is OntologyQuery().
+        :param stem: A function which returns the stem of a word. Default is the stem method of the stemming service
+        shared by the feature writers, in which case 'build' stems the vocabulary at once.
+        :return:
+        """
+
+        self.__ontology = ontology if ontology is not None else OntologyQuery()
+        self.__stemming = get_default_stemming_service() if stem is None else None
+        self.__stem = stem if stem is not None else self.__stemming.stem
+        # {word: (stem, category)}
+        self.__categories = dict()
+
+    def __len__(self):
+        return len(self.__categories)
+
+    def build(self, vocabulary):
+        """
+        This method queries the ontology for the categories of the words of the vocabulary which are not in the
+        table yet.
+        :param vocabulary: An iterable of words, e.g. the vocabulary returned by 'Preprocessor.get_vocabulary'.
+        :return: None
+        """
+
+        print("Querying the ontology for the semantic categories of the vocabulary ....")
+        if self.__stemming is not None:
+            self.__stemming.stem_words(word for word in vocabulary if word not in self.__categories)
+        for word in vocabulary:
+            if word not in self.__categories:
+                self.__add(word)
+
+        print("Finished querying the ontology for " + str(len(self.__categories)) + " words.")
+
+    def __add(self, word):
+        """
+        This is a private method which queries the ontology for the category of 'word' and adds it to the table.
+        """
+
+        stem = self.__stem(word)
+        self.__categories[word] = (stem, self.__ontology.query(word, stem))
+
+    def get_category(self, word):
+        """
+        Returns the category of a word. If the word is not in the table, the ontology is queried and the word is
+        added to the table.
+        :param word: The word.
+        :return: The semantic category of the word.
+        """
+
+        if word not in self.__categories:
+            self.__add(word)
+
+        return self.__categories[word][1]
+
+    def save(self, file_name):
+        """
+        This method writes the table to a file. Each line of the file has a word, its stem and its category
+        separated by tabs.
+        :param file_name: The file to which the table will be written.
+        :return: None
+        """
+
+        out_f = open(file_name, 'wt', encoding="utf-8")
+        for (word, (stem, category)) in self.__categories.items():
+            out_f.write(word + "\t" + stem + "\t" + category + "\n")
+        out_f.close()
+
+    def load(self, file_name):
+        """
+        This method adds the words in a file written by 'SemanticCategoryTable.save' to the table.
+        :param file_name: The file from which the table will be read.
+        :return: True if the file has been read, False if it does not exist.
+        """
+
+        if not os.path.isfile(file_name):
+            return False
+
+        in_f = open(file_name, 'rt', encoding="utf-8")
+        for line in in_f:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) == 3:
+                self.__categories[fields[0]] = (fields[1], fields[2])
+        in_f.close()
+
+        return True
@@ -0,0 +1,66 @@
+"""
+Created in 2016
+
+@authors: Atheer Alkhalifa, Lamia Alkwai, Waleed Alsanie and Mohamed Alkanhal
+         The National Center for Computation Technology & Applied Mathematics
+         {aalkhalifa,lalkwai,walsanie, alkanhal} [at] kacst [dot] edu [dot] sa
+
+This class is part of a context sensitive spell checking module. It is aimed to select the sentences of the corpus
+which have at least one of the words the model will learn to detect their contextual errors.
+"""
+
+
+class SentenceFilter:
+
+    def __init__(self, words_list):
+        """
+        This is a constructor of a filter compiled from a words list. The words are kept in a hashed set, so
+        duplicates in the list are dropped and looking up a word takes constant time whatever the length of the list.
+        A sentence matches the filter if one of its space-separated words is in the list. As the words are matched
+        as whole words, a set gives the same matches as a multi-pattern automaton.
+        :param words_list: An iterable of words.
+        :return:
+        """
+
+        self.__words = frozenset(words_list)
+
+    def __contains__(self, word):
+        return word in self.__words
+
+    def __len__(self):
+        return len(self.__words)
+
+    def matches(self, sentence):
+        """
+        This method checks if a sentence has at least one of the words of the filter.
+        :param sentence: The text of the sentence. Its words are separated by spaces.
+        :return: True if one of the words of the sentence is in the filter, False otherwise.
+        """
+
+        return not self.__words.isdisjoint(sentence.split(" "))
+
+    def matches_words(self, words):
+        """
+        This method checks if at least one of the given words is in the filter.
+        :param words: An iterable of words, e.g. the words of a sentence.
+        :return: True if one of the words is in the filter, False otherwise.
+        """
+
+        return not self.__words.isdisjoint(words)
+
+    def select(self, sentences):
+        """
+        This method selects the sentences which have at least one of the words of the filter.
+        :param sentences: An iterable of 2-tuple (sent, terminator).
+        :return: A 2-tuple (list of the selected sentences, number of the given sentences).
+        """
+
+        isdisjoint = self.__words.isdisjoint
+        selected = list()
+        number_of_sentences = 0
+        for sentence in sentences:
+            number_of_sentences += 1
+            if not isdisjoint(sentence[0].split(" ")):
+                selected.append(sentence)
+
+        return selected, number_of_sentences
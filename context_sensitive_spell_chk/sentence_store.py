@@ -0,0 +1,262 @@
+"""
+Created in 2016
+
+@authors: Atheer Alkhalifa, Lamia Alkwai, Waleed Alsanie and Mohamed Alkanhal
+         The National Center for Computation Technology & Applied Mathematics
+         {aalkhalifa,lalkwai,walsanie, alkanhal} [at] kacst [dot] edu [dot] sa
+
+This class is part of a context sensitive spell checking module. It is aimed to store the sentences of the corpus
+as arrays of word identifiers, so that words can be substituted in place.
+"""
+
+
+from array import array
+from .compact_vocabulary import Lexicon
+
+
+class SentenceStore:
+
+    def __init__(self, tokenize, lexicon=None):
+        """
+        This is a constructor of an empty store of sentences. The store is a sequence whose elements are 2-tuple
+        where each tuple represents a sentence and its terminator as follows:
+                       [(sent1, terminator1), .... ]
+        Internally, each sentence is kept as an array of the identifiers of its words, which is built the first time
+        the words of the sentence are needed. The text of a sentence is only kept if it cannot be rebuilt by joining
+        its words with a space, and it is built again when the sentence is asked for.
+        So each sentence is tokenized once and the tokens are shared by everything reading its words. The tokens are
+        edited in place, so nothing has to be invalidated when a word is substituted. The number of times the words
+        have been found tokenized (hits) or have had to be tokenized (misses) is counted.
+        :param tokenize: A function which divides the text of a sentence into a list of its words.
+        :param lexicon: The lexicon used to intern the words. If not given, a new lexicon will be created.
+        :return:
+        """
+
+        self.__tokenize = tokenize
+        self.__lexicon = lexicon if lexicon is not None else Lexicon()
+        # The text of each sentence, or None when it is the words of the sentence joined with a space.
+        self.__texts = list()
+        # The array of word identifiers of each sentence, or None if the sentence has not been tokenized yet.
+        self.__tokens = list()
+        self.__terminators = list()
+        self.__hits = 0
+        self.__misses = 0
+
+    def get_lexicon(self):
+        """
+        :return: The lexicon used to intern the words of the sentences.
+        """
+
+        return self.__lexicon
+
+    def __len__(self):
+        return len(self.__terminators)
+
+    def __getitem__(self, sent_num):
+        if isinstance(sent_num, slice):
+            return [self[i] for i in range(*sent_num.indices(len(self)))]
+
+        return self.get_text(sent_num), self.__terminators[sent_num]
+
+    def __iter__(self):
+        for sent_num in range(len(self)):
+            yield self[sent_num]
+
+    def append(self, sentence):
+        """
+        Appends a sentence to the end of the store.
+        :param sentence: A 2-tuple (sentence, terminator).
+        :return: None
+        """
+
+        (text, terminator) = sentence
+        self.__texts.append(text)
+        self.__tokens.append(None)
+        self.__terminators.append(terminator)
+
+    def extend(self, sentences):
+        """
+        Appends the given sentences to the end of the store.
+        :param sentences: An iterable of 2-tuple (sentence, terminator).
+        :return: None
+        """
+
+        for sentence in sentences:
+            self.append(sentence)
+
+    def insert(self, sent_num, sentence):
+        """
+        Inserts a sentence before sentence number 'sent_num'.
+        :param sent_num: The number the inserted sentence will have.
+        :param sentence: A 2-tuple (sentence, terminator).
+        :return: None
+        """
+
+        (text, terminator) = sentence
+        self.__texts.insert(sent_num, text)
+        self.__tokens.insert(sent_num, None)
+        self.__terminators.insert(sent_num, terminator)
+
+    def pop(self, sent_num=-1):
+        """
+        Removes sentence number 'sent_num' from the store and returns it.
+        :param sent_num: The number of the sentence. Default is the last sentence.
+        :return: A 2-tuple (sentence, terminator).
+        """
+
+        sentence = self[sent_num]
+        del self.__texts[sent_num]
+        del self.__tokens[sent_num]
+        del self.__terminators[sent_num]
+
+        return sentence
+
+    def clear(self):
+        """
+        Removes all the sentences from the store.
+        :return: None
+        """
+
+        self.__texts = list()
+        self.__tokens = list()
+        self.__terminators = list()
+
+    def subset(self, sent_nums, tokenize):
+        """
+        Returns a new store with the given sentences of this store. The new store shares the lexicon of this store,
+        so sentences which have been tokenized are copied without being tokenized again.
+        :param sent_nums: The numbers of the sentences, in the order they will have in the new store.
+        :param tokenize: The function which the new store will use to divide sentences into words.
+        :return: The new store.
+        """
+
+        store = SentenceStore(tokenize, self.__lexicon)
+        store.__texts = [self.__texts[n] for n in sent_nums]
+        store.__tokens = [self.__tokens[n] if self.__tokens[n] is None else array('I', self.__tokens[n])
+                          for n in sent_nums]
+        store.__terminators = [self.__terminators[n] for n in sent_nums]
+
+        return store
+
+    def invalidate_tokens(self):
+        """
+        This method drops the words of all the sentences, so that the sentences will be tokenized again the next
+        time their words are needed. It is called when the way sentences are divided into words has changed.
+        :return: None
+        """
+
+        for sent_num in range(len(self)):
+            if self.__tokens[sent_num] is not None:
+                self.__texts[sent_num] = self.get_text(sent_num)
+                self.__tokens[sent_num] = None
+
+    def get_word_ids(self, sent_num):
+        """
+        Returns the array of the identifiers of the words of sentence number 'sent_num'.
+        :param sent_num: The number of the sentence.
+        :return: An array of word identifiers. Words can be looked up with 'get_lexicon().get_word(id)'.
+        """
+
+        tokens = self.__tokens[sent_num]
+        if tokens is not None:
+            self.__hits += 1
+        else:
+            self.__misses += 1
+            text = self.__texts[sent_num]
+            words = self.__tokenize(text)
+            intern = self.__lexicon.intern
+            tokens = array('I', [intern(word) for word in words])
+            self.__tokens[sent_num] = tokens
+            if ' '.join(words) == text:                     # The text can be rebuilt from the words
+                self.__texts[sent_num] = None
+
+        return tokens
+
+    def get_words(self, sent_num):
+        """
+        Returns the list of the words of sentence number 'sent_num'.
+        :param sent_num: The number of the sentence.
+        :return: A list of words.
+        """
+
+        get_word = self.__lexicon.get_word
+        return [get_word(word_id) for word_id in self.get_word_ids(sent_num)]
+
+    def get_text(self, sent_num):
+        """
+        Returns the text of sentence number 'sent_num'.
+        :param sent_num: The number of the sentence.
+        :return: The text of the sentence without its terminator.
+        """
+
+        text = self.__texts[sent_num]
+        if text is None:
+            text = ' '.join(self.get_words(sent_num))
+
+        return text
+
+    def get_terminator(self, sent_num):
+        """
+        Returns the terminator of sentence number 'sent_num'.
+        :param sent_num: The number of the sentence.
+        :return: The terminator of the sentence.
+        """
+
+        return self.__terminators[sent_num]
+
+    def replace_word(self, sent_num, position, word):
+        """
+        Replaces the word at position 'position' in sentence number 'sent_num' with 'word'. This is done in place
+        and the positions of the other words do not change. The text of the sentence becomes its words joined
+        with a space.
+        :param sent_num: The number of the sentence.
+        :param position: The position of the word in the sentence.
+        :param word: The new word.
+        :return: None
+        """
+
+        self.get_word_ids(sent_num)[position] = self.__lexicon.intern(word)
+        self.__texts[sent_num] = None
+
+    def delete_word(self, sent_num, position):
+        """
+        Deletes the word at position 'position' in sentence number 'sent_num'. The text of the sentence becomes its
+        words joined with a space.
+        :param sent_num: The number of the sentence.
+        :param position: The position of the word in the sentence.
+        :return: None
+        """
+
+        del self.get_word_ids(sent_num)[position]
+        self.__texts[sent_num] = None
+
+    def insert_word(self, sent_num, position, word):
+        """
+        Inserts 'word' at position 'position' in sentence number 'sent_num'. The text of the sentence becomes its
+        words joined with a space.
+        :param sent_num: The number of the sentence.
+        :param position: The position the word will have in the sentence.
+        :param word: The word to insert.
+        :return: None
+        """
+
+        self.get_word_ids(sent_num).insert(position, self.__lexicon.intern(word))
+        self.__texts[sent_num] = None
+
+    def get_cache_statistics(self):
+        """
+        Returns the number of times the words of a sentence have been asked for and found already tokenized (hits),
+        and the number of times a sentence has had to be tokenized (misses).
+        :return: A 2-tuple (hits, misses).
+        """
+
+        return self.__hits, self.__misses
+
+    def reset_cache_statistics(self):
+        """
+        This method sets the numbers of hits and misses to zero.
+        :return: None
+        """
+
+        self.__hits = 0
+        self.__misses = 0
@@ -0,0 +1,376 @@
+"""
+Created in 2016
+
+@authors: Atheer Alkhalifa, Lamia Alkwai, Waleed Alsanie and Mohamed Alkanhal
+         The National Center for Computation Technology & Applied Mathematics
+         {aalkhalifa,lalkwai,walsanie, alkanhal} [at] kacst [dot] edu [dot] sa
+
+This class is part of a context sensitive spell checking module. It is aimed to check texts sent to a long-lived
+service, labelling the sentences of concurrent requests together in small batches with a model loaded once.
+"""
+
+
+import os
+import json
+import math
+import time
+import asyncio
+import tempfile
+import collections
+from .preprocessing import Preprocessor
+
+
+class SpellCheckService:
+
+    # The number of the latest requests whose latencies are kept for the percentiles
+    LATENCY_WINDOW = 10000
+    # The greatest length of a line of a request, in bytes
+    MAX_LINE = 2 ** 20
+
+    def __init__(self, error_marker, decoder=None, model_file=None, preprocessing_obj=None, max_batch_size=32,
+                 max_delay=0.005):
+        """
+        This is a constructor of a spell checking service. The texts are divided into sentences and words by the
+        tokenizer of the preprocessing object, as the corpus is, and each sentence is labelled by the model with
+        its words and its terminator as tokens, as in the CRF++ files written by 'learn_with_crf.py' (the model has
+        to be trained on the words only). The words labelled as errors are returned with their probabilities.
+
+        The sentences of all the requests are put in a queue, from which they are taken in batches: a batch is
+        labelled as soon as it has 'max_batch_size' sentences or its first sentence has waited 'max_delay' seconds.
+        The batches are labelled either by a decoder in this process (a CRFDecoder or a HashedCRFModel, run in a
+        thread so that requests are still accepted), or by running 'crf_test' on the model file once per batch.
+
+        A ValueError is raised if neither a decoder nor a model file is given, or if the model uses more columns than
+        the words (for 'crf_test', this is only checked if the text model, the model file with '.txt' added to its
+        name, is next to it).
+        :param error_marker: The label of the spelling errors.
+        :param decoder: The decoder. Default is None, which means that 'crf_test' is run.
+        :param model_file: The CRF++ model file for 'crf_test'. It is not used if a decoder is given. Default is None.
+        :param preprocessing_obj: The Preprocessor object whose tokenizer is used. Default is None, which means a
+        Preprocessor with the default regular expressions.
+        :param max_batch_size: The greatest number of sentences of a batch. Default is 32.
+        :param max_delay: The longest time, in seconds, a sentence waits for a batch to be filled. Default is 0.005.
+        :return:
+        """
+
+        if decoder is None and not model_file:
+            raise ValueError("Cannot make the service! Either a decoder or a model file has to be given.")
+        xsize = decoder.get_xsize() if decoder is not None else SpellCheckService.read_xsize(model_file + ".txt")
+        if xsize is not None and xsize != 1:
+            raise ValueError("Cannot make the service! The model uses " + str(xsize) + " columns of the tokens, but "
+                             "the service labels the words only. The model has to be trained on the words only.")
+
+        self.__error_identifier = str(error_marker)
+        self.__decoder = decoder
+        self.__model_file = model_file
+        self.__tokenizer = (preprocessing_obj if preprocessing_obj is not None else Preprocessor()).get_tokenizer()
+        self.__max_batch_size = max(1, max_batch_size)
+        self.__max_delay = max_delay
+        self.__queue = None
+        self.__batcher = None
+        self.__server = None
+        # The open connections as follows: {task of the connection: its writer}
+        self.__connections = dict()
+        # The statistics as follows: latencies of the latest requests (seconds), numbers of requests, sentences and
+        # batches, and the time at which the service has started
+        self.__latencies = collections.deque(maxlen=SpellCheckService.LATENCY_WINDOW)
+        self.__requests = 0
+        self.__sentences = 0
+        self.__batches = 0
+        self.__start_time = None
+
+    @staticmethod
+    def read_xsize(text_model_file):
+        """
+        This method reads the number of the columns of the tokens from the header of a CRF++ text model.
+        :param text_model_file: The text model file written by 'crf_learn -t'.
+        :return: The number of the columns, or None if the file does not exist or has no 'xsize' in its header.
+        """
+
+        if not os.path.isfile(text_model_file):
+            return
+
+        f = open(text_model_file, 'rt', encoding="utf-8")
+        xsize = None
+        for line in f:
+            if line.isspace():
+                break
+            (name, _, value) = line.partition(":")
+            if name.strip() == "xsize":
+                xsize = int(value)
+                break
+        f.close()
+
+        return xsize
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """
+        This method starts the service on a TCP socket. Each request is a line of JSON with the text to check, e.g.
+        {"id": 1, "text": "..."}, and it is answered with a line of JSON as follows:
+            {"id": 1, "sentences": [{"words": [...], "errors": [{"position": 0, "word": "...",
+                                                                  "probability": 0.9}, ...]}, ...]}
+        The requests of a connection are answered as soon as they are checked, so the answers may come in another
+        order than the requests, and they are matched by their ids. The request {"stats": true} is answered with
+        the statistics of the service (see 'get_statistics').
+        :param host: The address on which the service listens. Default is '127.0.0.1' (local connections only).
+        :param port: The port on which the service listens. Default is 8765.
+        :return: None
+        """
+
+        self.__start_batcher()
+        self.__server = await asyncio.start_server(self.__handle_connection, host, port,
+                                                   limit=SpellCheckService.MAX_LINE)
+        print("The spell checking service is listening on " + host + ":" + str(port))
+
+    async def stop(self):
+        """
+        This method stops accepting connections, closes the open ones and stops the batcher. The connections are
+        closed rather than cancelled, so each of them ends as if its client had closed it.
+        :return: None
+        """
+
+        if self.__server is not None:
+            self.__server.close()
+            for writer in list(self.__connections.values()):
+                writer.close()
+            await asyncio.gather(*self.__connections, return_exceptions=True)
+            await self.__server.wait_closed()
+            self.__server = None
+        if self.__batcher is not None:
+            self.__batcher.cancel()
+            try:
+                await self.__batcher
+            except asyncio.CancelledError:
+                pass
+            self.__batcher = None
+
+    def __start_batcher(self):
+        """
+        This is a private method which makes the queue of the sentences and starts the batcher in the running loop.
+        """
+
+        if self.__batcher is None:
+            self.__queue = asyncio.Queue()
+            self.__batcher = asyncio.ensure_future(self.__run_batches())
+            self.__start_time = time.perf_counter()
+
+    async def __run_batches(self):
+        """
+        This is a private method which takes the sentences from the queue in batches and labels them. The result of
+        each sentence is set to its future.
+        """
+
+        loop = asyncio.get_event_loop()
+        while True:
+            batch = [await self.__queue.get()]
+            deadline = loop.time() + self.__max_delay
+            while len(batch) < self.__max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.__queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self.__batches += 1
+            self.__sentences += len(batch)
+            try:
+                results = await self.__label([tokens for (tokens, _) in batch])
+            except Exception as err:                                    # the batch fails, not the service
+                for (_, future) in batch:
+                    if not future.done():
+                        future.set_exception(err)
+                continue
+            for ((_, future), result) in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def __label(self, batch):
+        """
+        This is a private method which labels a batch of sentences.
+        :return: A list of 2-tuple (labels, probabilities of the labels), one for each sentence.
+        """
+
+        if self.__decoder is not None:
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(None, self.__tag_batch, batch)
+
+        return await self.__test_batch(batch)
+
+    def __tag_batch(self, batch):
+        """
+        This is a private method which labels a batch of sentences with the decoder.
+        """
+
+        results = list()
+        for tokens in batch:
+            (labels, probabilities, _) = self.__decoder.tag(tokens, True)
+            results.append((labels, probabilities))
+
+        return results
+
+    async def __test_batch(self, batch):
+        """
+        This is a private method which labels a batch of sentences by running 'crf_test -v1' on a file of the batch.
+        """
+
+        (handle, test_file) = tempfile.mkstemp(suffix=".crf")
+        f = os.fdopen(handle, 'wt', encoding="utf-8")
+        for tokens in batch:
+            f.write("".join("\t".join(columns) + "\n" for columns in tokens) + "\n")
+        f.close()
+        try:
+            process = await asyncio.create_subprocess_exec("crf_test", "-v1", "-m", self.__model_file, test_file,
+                                                           stdout=asyncio.subprocess.PIPE)
+            (output, _) = await process.communicate()
+        finally:
+            os.remove(test_file)
+
+        results = list()
+        (labels, probabilities) = (list(), list())
+        for line in output.decode("utf-8").splitlines():
+            if line.startswith("#"):
+                continue
+            if not line.strip():
+                if labels:
+                    results.append((labels, probabilities))
+                    (labels, probabilities) = (list(), list())
+                continue
+            (label, _, probability) = line.split()[-1].rpartition("/")
+            labels.append(label)
+            probabilities.append(float(probability))
+        if labels:
+            results.append((labels, probabilities))
+
+        if len(results) != len(batch):
+            raise RuntimeError("crf_test has labelled " + str(len(results)) + " of the " + str(len(batch)) +
+                               " sentences of the batch")
+
+        return results
+
+    async def check(self, text):
+        """
+        This method checks a text. Its sentences are queued to be labelled in the next batches.
+        :param text: The text.
+        :return: A list of dictionaries, one for each sentence, as follows:
+        {"words": list of the words, "errors": list of {"position": ..., "word": ..., "probability": ...}}
+        The positions are those of the words in the sentence.
+        """
+
+        start = time.perf_counter()
+        self.__start_batcher()
+        loop = asyncio.get_event_loop()
+        sentences = list()
+        futures = list()
+        for (_, terminator, words) in self.__tokenizer.split_text(text) or list():
+            if not words:
+                continue
+            future = loop.create_future()
+            self.__queue.put_nowait(([[word] for word in words] + ([[terminator]] if terminator else []), future))
+            sentences.append(words)
+            futures.append(future)
+
+        response = list()
+        for (words, (labels, probabilities)) in zip(sentences, await asyncio.gather(*futures)):
+            errors = [{"position": position, "word": words[position], "probability": probabilities[position]}
+                      for position in range(len(words)) if labels[position] == self.__error_identifier]
+            response.append({"words": words, "errors": errors})
+
+        self.__requests += 1
+        self.__latencies.append(time.perf_counter() - start)
+
+        return response
+
+    async def __answer(self, request, writer):
+        """
+        This is a private method which answers a request and writes the answer as a line of JSON.
+        """
+
+        try:
+            request = json.loads(request)
+            if not isinstance(request, dict):
+                raise ValueError("A request has to be a JSON object")
+            if request.get("stats"):
+                answer = {"stats": self.get_statistics()}
+            elif isinstance(request.get("text"), str):
+                answer = {"sentences": await self.check(request["text"])}
+            else:
+                raise ValueError("A request has to have a 'text' or 'stats'")
+        except Exception as err:
+            answer = {"error": format(err)}
+        if isinstance(request, dict) and "id" in request:
+            answer["id"] = request["id"]
+
+        writer.write((json.dumps(answer, ensure_ascii=False) + "\n").encode("utf-8"))
+
+    async def __handle_connection(self, reader, writer):
+        """
+        This is a private method which reads the requests of a connection, one per line, and answers each of them
+        as soon as it has been checked.
+        """
+
+        task = asyncio.current_task()
+        self.__connections[task] = writer
+        answers = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:                                      # a line longer than MAX_LINE
+                    writer.write(b'{"error": "The request is too long"}\n')
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    answer = asyncio.ensure_future(self.__answer(line.decode("utf-8", "replace"), writer))
+                    answers.add(answer)
+                    answer.add_done_callback(answers.discard)
+            if answers:
+                await asyncio.gather(*answers)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            del self.__connections[task]
+
+    @staticmethod
+    def percentile(values, p):
+        """
+        Returns the p-th percentile of the values by the nearest rank.
+        :param values: A list of values.
+        :param p: The percentile, from 0 to 100.
+        :return: The value, or None if there are no values.
+        """
+
+        if not values:
+            return
+
+        values = sorted(values)
+        rank = int(math.ceil(p * len(values) / 100))
+        return values[min(len(values), max(1, rank)) - 1]
+
+    def get_statistics(self):
+        """
+        This method returns the statistics of the service. The latencies are those of the latest LATENCY_WINDOW
+        requests, from the time a text is received until it has been checked, in milliseconds. The throughput is
+        averaged since the service has started.
+        :return: A dictionary of the statistics.
+        """
+
+        latencies = list(self.__latencies)
+        elapsed = time.perf_counter() - self.__start_time if self.__start_time is not None else 0
+        p50 = SpellCheckService.percentile(latencies, 50)
+        p99 = SpellCheckService.percentile(latencies, 99)
+
+        return {
+            "requests": self.__requests,
+            "sentences": self.__sentences,
+            "batches": self.__batches,
+            "mean_batch_size": self.__sentences / self.__batches if self.__batches else 0,
+            "latency_p50_ms": 1000 * p50 if p50 is not None else None,
+            "latency_p99_ms": 1000 * p99 if p99 is not None else None,
+            "requests_per_second": self.__requests / elapsed if elapsed else 0,
+            "sentences_per_second": self.__sentences / elapsed if elapsed else 0
+            }
@@ -0,0 +1,148 @@
+"""
+Created in 2016
+
+@authors: Atheer Alkhalifa, Lamia Alkwai, Waleed Alsanie and Mohamed Alkanhal
+         The National Center for Computation Technology & Applied Mathematics
+         {aalkhalifa,lalkwai,walsanie, alkanhal} [at] kacst [dot] edu [dot] sa
+
+This class is part of a context sensitive spell checking module. It is aimed to stem each distinct word only once
+and share the stems between all the feature writers.
+"""
+
+
+import os
+import nltk
+from multiprocessing import Pool
+from nltk.stem.isri import ISRIStemmer
+
+
+def _stem_words(words):
+    """
+    Returns the ISRI stems of the given words. This is run in the worker processes of 'StemmingService.stem_words'.
+    """
+
+    stemmer = ISRIStemmer()
+    return [stemmer.stem(word) for word in words]
+
+
+class StemmingService:
+
+    # The number of words sent at once to a worker process
+    CHUNK_SIZE = 2000
+
+    def __init__(self, cache_file=None):
+        """
+        This is a constructor of a service which stems words with the ISRI stemmer and keeps the stems in memory, so
+        each distinct word is only stemmed once. If a cache file is given, the stems in it are loaded, provided that
+        they have been written by the same version of the stemmer, and 'save' writes the stems to it.
+        :param cache_file: The file where the stems are kept between runs. Default is None (no file).
+        :return:
+        """
+
+        self.__stems = dict()
+        self.__stemmer = ISRIStemmer()
+        self.__cache_file = cache_file
+        if cache_file is not None:
+            self.__load()
+
+    @staticmethod
+    def get_stemmer_version():
+        """
+        Returns the version of the stemmer. Stems cached by another version are not loaded.
+        :return: The version of the stemmer as a string.
+        """
+
+        return "nltk-" + nltk.__version__ + "-" + ISRIStemmer.__name__
+
+    def __load(self):
+        """
+        This is a private method which loads the stems from the cache file.
+        """
+
+        if not os.path.isfile(self.__cache_file):
+            return
+
+        in_f = open(self.__cache_file, 'rt', encoding="utf-8")
+        if in_f.readline().rstrip("\n") == "# " + StemmingService.get_stemmer_version():
+            for line in in_f:
+                fields = line.rstrip("\n").split("\t")
+                if len(fields) == 2:
+                    self.__stems[fields[0]] = fields[1]
+        else:
+            print("The stems in " + self.__cache_file + " have been made by another version of the stemmer. "
+                  "They will not be used.")
+        in_f.close()
+
+    def save(self):
+        """
+        This method writes the stems to the cache file given to the constructor. The first line of the file is the
+        version of the stemmer, and each other line has a word and its stem separated by a tab.
+        :return: None
+        """
+
+        if self.__cache_file is None:
+            print("ERROR: Cannot save the stems! No cache file has been given.")
+            return
+
+        out_f = open(self.__cache_file, 'wt', encoding="utf-8")
+        out_f.write("# " + StemmingService.get_stemmer_version() + "\n")
+        for (word, stem) in self.__stems.items():
+            out_f.write(word + "\t" + stem + "\n")
+        out_f.close()
+
+    def __len__(self):
+        return len(self.__stems)
+
+    def stem(self, word):
+        """
+        Returns the stem of a word.
+        :param word: The word.
+        :return: The stem of the word.
+        """
+
+        stem = self.__stems.get(word)
+        if stem is None:
+            stem = self.__stemmer.stem(word)
+            self.__stems[word] = stem
+
+        return stem
+
+    def stem_words(self, words, workers=None):
+        """
+        This method stems the given words which have not been stemmed yet, in parallel across worker processes.
+        It is meant to be called once with the vocabulary before the stems are asked for one by one with 'stem'.
+        :param words: An iterable of words.
+        :param workers: The number of worker processes. Default is the number of CPUs. If it is 1, or there are
+        few words to stem, the words are stemmed in this process.
+        :return: None
+        """
+
+        missing = list({word for word in words if word not in self.__stems})
+        workers = workers if workers is not None else os.cpu_count()
+        if workers is None or workers <= 1 or len(missing) <= StemmingService.CHUNK_SIZE:
+            for word in missing:
+                self.stem(word)
+            return
+
+        chunks = [missing[i:i + StemmingService.CHUNK_SIZE]
+                  for i in range(0, len(missing), StemmingService.CHUNK_SIZE)]
+        with Pool(workers) as pool:
+            for (chunk, stems) in zip(chunks, pool.imap(_stem_words, chunks)):
+                self.__stems.update(zip(chunk, stems))
+
+
+# The stemming service shared by all the feature writers
+_default_service = None
+
+
+def get_default_stemming_service():
+    """
+    Returns the stemming service shared by the whole program.
+    :return: A StemmingService object.
+    """
+
+    global _default_service
+    if _default_service is None:
+        _default_service = StemmingService()
+
+    return _default_service
@@ -0,0 +1,133 @@
+"""
+Created in 2016
+
+@authors: Atheer Alkhalifa, Lamia Alkwai, Waleed Alsanie and Mohamed Alkanhal
+         The National Center for Computation Technology & Applied Mathematics
+         {aalkhalifa,lalkwai,walsanie, alkanhal} [at] kacst [dot] edu [dot] sa
+
+This class is part of a context sensitive spell checking module. It is aimed to divide texts into sentences and
+sentences into words with regular expressions which are compiled only once.
+"""
+
+
+import re
+
+
+class Tokenizer:
+
+    def __init__(self, ar_sent_terminator_regex, special_words_regex):
+        """
+        This is a constructor of a tokenizer. The regular expressions are compiled here, so a new tokenizer has to
+        be made when any of them changes (as 'Preprocessor.set_ar_sent_terminator_regex' and
+        'Preprocessor.set_special_words_regex' do).
+        :param ar_sent_terminator_regex: The regular expression of the terminators of the Arabic sentences.
+        :param special_words_regex: The regular expression of the special words which are words by themselves.
+        :return:
+        """
+
+        self.__ar_sent_terminator_regex = ar_sent_terminator_regex
+        self.__special_words_regex = special_words_regex
+        self.__terminators = re.compile("(?:" + ar_sent_terminator_regex + ")")
+        self.__terminator = re.compile(ar_sent_terminator_regex + "$")
+        self.__word_separators = re.compile(r"\s|(" + special_words_regex + ")")
+
+    def get_ar_sent_terminator_regex(self):
+        """
+        :return: The regular expression of the terminators of the Arabic sentences.
+        """
+
+        return self.__ar_sent_terminator_regex
+
+    def get_special_words_regex(self):
+        """
+        :return: The regular expression of the special words.
+        """
+
+        return self.__special_words_regex
+
+    def is_terminator(self, string):
+        """
+        This method checks if the given 'string' is a sentence terminator.
+        :param string: To check
+        :return: True if sentence terminator, False otherwise.
+        """
+
+        return self.__terminator.match(string) is not None
+
+    def split_sentences(self, text):
+        """
+        This method divides a text into sentences. The sentences are the same as those of
+        'Preprocessor.chop_off_text_into_sentences'.
+        :param text: A text to split.
+        :return: A list of 2-tuple (sentence, terminator), or None if the text is empty or just spaces.
+        """
+
+        if text.isspace() or not text:                                          # if the text is just spaces or empty
+            return
+
+        is_terminator = self.is_terminator
+        final_list = list()
+        pieces = list()                                                         # the pieces of the current sentence
+        start = 0
+        for match in self.__terminators.finditer(text):
+            piece = text[start:match.start()].strip()
+            if piece:
+                if is_terminator(piece):
+                    final_list.append((''.join(pieces), piece))
+                    pieces = list()
+                else:
+                    pieces.append(piece)
+            terminator = match.group().strip()
+            if terminator:
+                if is_terminator(terminator):
+                    final_list.append((''.join(pieces), terminator))
+                    pieces = list()
+                else:
+                    pieces.append(terminator)
+            start = match.end()
+
+        piece = text[start:].strip()
+        if piece and is_terminator(piece):
+            final_list.append((''.join(pieces), piece))
+        elif piece or pieces:                                               # If the last sentence is not terminated
+            pieces.append(piece)                                            # by a terminator
+            final_list.append((''.join(pieces), ""))
+
+        return final_list
+
+    def split_words(self, sentence):
+        """
+        This method divides a sentence into a list of its words. Special words are words by themselves. The words
+        are the same as those of 'Preprocessor.divide_sentence_into_words'.
+        :param sentence: The sentence to be divided
+        :return: A list of words constituting the sentence.
+        """
+
+        return [word for word in self.__word_separators.split(sentence) if word and not word.isspace()]
+
+    def split_words_batch(self, sentences):
+        """
+        This method divides each of the given sentences into a list of its words.
+        :param sentences: An iterable of sentences.
+        :return: A list of the lists of words of the sentences, in the order of the sentences.
+        """
+
+        split = self.__word_separators.split
+        return [[word for word in split(sentence) if word and not word.isspace()] for sentence in sentences]
+
+    def split_text(self, text):
+        """
+        This method divides a text into sentences and the sentences into words. The text is divided into sentences
+        first, and then each sentence is divided into words with the compiled regular expression of the separators.
+        The sentences and their words are the same as those of 'split_sentences' and 'split_words'.
+        :param text: A text to split.
+        :return: A list of 3-tuple (sentence, terminator, words), or None if the text is empty or just spaces.
+        """
+
+        sentences = self.split_sentences(text)
+        if sentences is None:
+            return
+
+        split = self.__word_separators.split
+        return [(sentence, terminator, [word for word in split(sentence) if word and not word.isspace()])
+                for (sentence, terminator) in sentences]
@@ -0,0 +1,110 @@
+"""
+Created in 2016
+
+@authors: Atheer Alkhalifa, Lamia Alkwai, Waleed Alsanie and Mohamed Alkanhal
+         The National Center for Computation Technology & Applied Mathematics
+         {aalkhalifa,lalkwai,walsanie, alkanhal} [at] kacst [dot] edu [dot] sa
+
+This class is part of a context sensitive spell checking module. It is aimed to build the list of verbs, from the
+output of the POS tagger, from which the words list of the model is drawn.
+"""
+
+
+import random
+
+
+class VerbLexicon:
+
+    def __init__(self, tag="VB", min_length=5):
+        """
+        This is a constructor of an empty lexicon of verbs. Verbs are added from tagged sentences (word/TAG tokens
+        separated by spaces) in the order they are met. A word is added if:
+            - its tag has 'tag' in it,
+            - it has at least 'min_length' characters, all of them letters, and
+            - it is not part of (or equal to) a verb already in the lexicon.
+        The last rule is checked by looking the word up in the set of the substrings of the verbs in the lexicon, so
+        adding a word does not take longer as the lexicon grows.
+        :param tag: The string which the tags of verbs have in them. Default is "VB".
+        :param min_length: The least number of characters of a verb. Default is 5.
+        :return:
+        """
+
+        self.__tag = tag
+        self.__min_length = min_length
+        self.__verbs = list()
+        # The substrings of the verbs which are not shorter than 'min_length'
+        self.__substrings = set()
+
+    def __len__(self):
+        return len(self.__verbs)
+
+    def get_verbs(self):
+        """
+        :return: The list of the verbs in the order they have been added.
+        """
+
+        return self.__verbs
+
+    def add_tagged_sentence(self, tagged_sentence):
+        """
+        This method adds the verbs of a tagged sentence to the lexicon. Tokens without a tag are skipped.
+        :param tagged_sentence: The tagged sentence as word/TAG tokens separated by spaces. If a token has more than
+        one '/', the word is the part before the first one and the tag is the part after it up to the next one.
+        :return: None
+        """
+
+        tag = self.__tag
+        min_length = self.__min_length
+        substrings = self.__substrings
+        for token in tagged_sentence.split():
+            (word, separator, tags) = token.partition("/")
+            if (separator and tag in tags.partition("/")[0] and len(word) >= min_length and word.isalpha()
+                    and word not in substrings):
+                self.__verbs.append(word)
+                substrings.update(word[i:j] for i in range(len(word) - min_length + 1)
+                                  for j in range(i + min_length, len(word) + 1))
+
+    def add_tagged_sentences(self, tagged_sentences):
+        """
+        This method adds the verbs of the given tagged sentences to the lexicon.
+        :param tagged_sentences: An iterable of tagged sentences.
+        :return: None
+        """
+
+        for tagged_sentence in tagged_sentences:
+            self.add_tagged_sentence(tagged_sentence)
+
+    def sample(self, n=100):
+        """
+        This method draws 'n' verbs from the lexicon randomly with replacement, using the 'random' module, so the
+        drawn verbs depend on its seed. There can be duplicates in the list.
+        :param n: The number of verbs to draw. Default is 100.
+        :return: A list of 'n' verbs, or an empty list if the lexicon is empty.
+        """
+
+        if not self.__verbs:
+            return list()
+
+        return [self.__verbs[random.randrange(len(self.__verbs))] for item in range(n)]
+
+    @staticmethod
+    def sample_sentences(sentences, k):
+        """
+        This method draws 'k' sentences uniformly from an iterable of sentences of any length in one pass (reservoir
+        sampling), using the 'random' module. The drawn sentences are returned in the order they have in the
+        iterable.
+        :param sentences: An iterable of sentences.
+        :param k: The number of sentences to draw.
+        :return: A list of at most 'k' sentences.
+        """
+
+        reservoir = list()
+        for (i, sentence) in enumerate(sentences):
+            if i < k:
+                reservoir.append((i, sentence))
+            else:
+                j = random.randint(0, i)
+                if j < k:
+                    reservoir[j] = (i, sentence)
+
+        return [sentence for (i, sentence) in sorted(reservoir, key=lambda item: item[0])]
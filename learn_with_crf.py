@@ -6,132 +6,128 @@ import random
 import os, shutil
 from context_sensitive_spell_chk.preprocessing import Preprocessor
 from context_sensitive_spell_chk.crf_pp_interface import CRFPlusPlusInterface
+from context_sensitive_spell_chk.semantic_categories import SemanticCategoryTable
+from context_sensitive_spell_chk.stemming import StemmingService
+from context_sensitive_spell_chk.crf_features import CRFFileBuilder, WordColumn, StemColumn, POSColumn, SemanticColumn
+from context_sensitive_spell_chk.confusion_sets import ConfusionSetCatalog
+from context_sensitive_spell_chk.hyperparameter_search import HyperparameterSearch
+from context_sensitive_spell_chk.cross_validation import CrossValidation
+from context_sensitive_spell_chk.crf_decoder import CRFDecoder
 from subprocess import *
-from nltk.stem.isri import ISRIStemmer
 
 
-def format_crf_pp_file_semantic_features(file_name, preprocessing_obj, error_marker, correct_marker):
+def format_crf_pp_file_semantic_features(file_name, preprocessing_obj, error_marker, correct_marker, table=None,
+                                         workers=1):
 
-    f_out = open(file_name, 'wt', encoding="utf-8")
-    sentences = preprocessing_obj.get_sentences()
-    errors = preprocessing_obj.get_errors()
-    t = 0
-    try:
+    # The categories are looked up in a table filled once per distinct word. If no table is given, one is built from
+    # the words of the sentences.
+    CRFFileBuilder([WordColumn(), SemanticColumn(table)], workers).write(file_name, preprocessing_obj, error_marker,
+                                                                        correct_marker)
 
-        for (sent_num, (sent, terminator)) in enumerate(sentences):
-            words = preprocessing_obj.divide_sentence_into_words(sent)
-            for (pos, wrd) in enumerate(words):
-                st = ISRIStemmer()
-                try:
-                    s = check_output(["java", "-jar", "queryAWOntology.jar", wrd, st.stem(wrd), "", "0"])
-                    s = s.decode(encoding="UTF-8")
-                    s = s.split(",")[0].split("\n")[0].split(" ")
-                    t = t+1
-                except Exception:
-                    s = "Some_Name_Or_Act"
 
-                # For the words that didn't return  category
-                if s[len(s)-1] == "":
-                    s = "Some_Name_Or_Act"
+def format_crf_pp_file_pos_tags(file_name, preprocessing_obj, error_marker, correct_marker, stemming=None,
+                                workers=1):
 
+    # The sentences are tagged by the tagger of the preprocessing object, and the stems are shared with the other
+    # writers through the stemming service.
+    CRFFileBuilder([WordColumn(), StemColumn(stemming), POSColumn()], workers).write(file_name, preprocessing_obj,
+                                                                                    error_marker, correct_marker)
 
-                if (sent_num, pos) in errors:
-                    f_out.write(wrd + "\t" + s[len(s)-1] + "\t" + error_marker + "\n")
-                    print(t)
 
-                else:
-                    f_out.write(wrd + "\t" + s[len(s)-1]+ "\t" + correct_marker + "\n")
-                    #print(wrd + "\t" + s[len(s)-1]+ "\t" + correct_marker + "\n")
-                    print(t)
+def format_crf_pp_file_no_pos_tags(file_name, preprocessing_obj, error_marker, correct_marker, workers=1):
 
-            f_out.write(terminator +"\t" + "###############################"+ "\t" + correct_marker + "\n\n")
-    except ValueError:
-            print("passed")
-            pass
-    f_out.close()
-
-
-def format_crf_pp_file_pos_tags(file_name, preprocessing_obj, error_marker, correct_marker):
-
-    file = open("temp.txt", 'w', encoding="utf-8")
-    for s in preprocessing_obj.get_sentences():
-        print(s[0]  + '/n'  , file=file)
-    temp = check_output('java    -mx1g   -cp   stanford-postagger.jar:context_sensitive_spell_chk/lib/* edu.stanford.nlp.tagger.maxent.MaxentTagger    -model    context_sensitive_spell_chk/lib/arabic.tagger    -textFile temp.txt' , shell=True, stderr=PIPE)
-    tagged_subset = temp.decode("utf-8").split("/n")
-    #tagged_subset = preprocessing_obj.chop_off_text_into_sentences(temp.decode("utf-8"))
-
-    file.close()
-
-
-    f_out = open(file_name, 'wt', encoding="utf-8")
-    sentences = preprocessing_obj.get_sentences()
-    errors = preprocessing_obj.get_errors()
-    st = ISRIStemmer()
-
-    for (sent_num, (sent, terminator)), t_sent in zip(enumerate(sentences), tagged_subset ):
-
-        words = preprocessing_obj.divide_sentence_into_words(sent)
-        tagged_sent = preprocessing_obj.divide_sentence_into_words(t_sent)
-
-        for (pos, wrd) in enumerate(words):
-            try:
-                tag = tagged_sent[tagged_sent.index(wrd)+2]
-            except IndexError:
-                tag = tagged_subset[sent_num+1].split("/")[1].split("\n")[0]
-            except ValueError:
-                continue
-            if (sent_num, pos) in errors:
-                f_out.write(wrd + "\t"  + st.stem(wrd)+  "\t" + tag +  "\t" + error_marker + "\n")
-               # print(wrd + "\t" + tag + "\t" + error_marker + "\n")
-            else:
-                f_out.write(wrd + "\t" + st.stem(wrd)+  "\t" + tag +  "\t" + correct_marker + "\n")
-              #  print(wrd + "\t" + tag + "\t" + correct_marker + "\n")
-
-        f_out.write(terminator + "\t" + terminator + "\tnull\t" + correct_marker + "\n\n")
-
-
-
-    f_out.close()
-
-
-def format_crf_pp_file_no_pos_tags(file_name, preprocessing_obj, error_marker, correct_marker):
-
-    f_out = open(file_name, 'wt', encoding="utf-8")
-    sentences = preprocessing_obj.get_sentences()
-    errors = preprocessing_obj.get_errors()
-    try:
-
-        for (sent_num, (sent, terminator)) in enumerate(sentences):
-            words = preprocessing_obj.divide_sentence_into_words(sent)
-            for (pos, wrd) in enumerate(words):
-                if (sent_num, pos) in errors:
-                    f_out.write(wrd + "\t" + error_marker + "\n")
-                else:
-                    f_out.write(wrd + "\t" + correct_marker + "\n")
-
-            f_out.write(terminator + "\t" + correct_marker + "\n\n")
-    except ValueError:
-            print("passed")
-            pass
-    f_out.close()
+    CRFFileBuilder([WordColumn()], workers).write(file_name, preprocessing_obj, error_marker, correct_marker)
 
 
 def extract_random_sentences(preprocess_obj, percentage):
 
-    if 1 < percentage < 0:
-        print("The value of test set percentage is invalid! Exiting the system")
+    # The sentences are drawn as they were drawn by popping them one by one after calling 'random.seed(10)'
+    return preprocess_obj.split(percentage, 10)
+
+
+def cross_validate(preprocessing_obj, k, template, directory, train_file, test_file, error_marker, correct_marker, a,
+                   c, f, confusion_sets_file=None, workers=1):
+
+    # The folds are prepared one after another (each with its own vocabulary and errors), and then CRF++ is trained
+    # and tested on all of them at the same time, each fold in its own directory.
+    folds = list()
+    for (i, (training_obj, test_obj)) in enumerate(preprocessing_obj.k_fold_split(k), 1):
+        print("Preparing fold " + str(i) + " of " + str(k) + " ....")
+        fold_directory = os.path.join(directory, "fold_" + str(i))
+        os.mkdir(fold_directory)
+        training_obj.build_vocabulary()
+        catalog = ConfusionSetCatalog(training_obj.get_vocabulary(), training_obj.get_words_list(),
+                                      confusion_sets_file + "." + str(i) if confusion_sets_file else None)
+        training_obj.put_errors_in_n_words_from_list(training_obj.get_vocabulary(), workers=workers, catalog=catalog)
+        test_obj.put_errors_in_n_words_from_list(training_obj.get_vocabulary(), workers=workers, catalog=catalog)
+        training = os.path.join(fold_directory, os.path.basename(train_file))
+        test = os.path.join(fold_directory, os.path.basename(test_file))
+        format_crf_pp_file_no_pos_tags(training, training_obj, error_marker, correct_marker, workers)
+        format_crf_pp_file_no_pos_tags(test, test_obj, error_marker, correct_marker, workers)
+        folds.append((training, test, fold_directory))
+
+    results = CrossValidation(template, error_marker, a, c, f).run(folds)
+    aggregate = CrossValidation.aggregate(results)
+    if aggregate is None:
+        print("No model could be trained on any fold! Exiting the system")
         sys.exit(1)
 
-    length = len(preprocess_obj.get_sentences())
-    test_size = math.ceil(length * percentage)
+    results_file = open("final_result.txt", 'a+', encoding="utf-8")
+    results_file.write("\n" + '{0:#<61}'.format(''))
+    results_file.write("\n" + "Cross-validation on " + str(k) + " folds with a = " + a + ", c = " + str(c) +
+                       " and f = " + str(f))
+    results_file.write("\n" + '{0:22}'.format('FOLD') +
+                       ''.join('{0:<22}'.format(metric.upper()) for metric in CrossValidation.METRICS))
+    for (i, metrics) in enumerate(results, 1):
+        if metrics is None:
+            results_file.write("\n" + '{0:22}'.format(str(i)) + "No model has been trained")
+        else:
+            results_file.write("\n" + '{0:22}'.format(str(i)) +
+                               ''.join('{0:<22}'.format(str(metrics[metric])) for metric in CrossValidation.METRICS))
+    results_file.write("\n" + '{0:22}'.format('MEAN') +
+                       ''.join('{0:<22}'.format(str(aggregate[metric][0])) for metric in CrossValidation.METRICS))
+    results_file.write("\n" + '{0:22}'.format('STANDARD DEVIATION') +
+                       ''.join('{0:<22}'.format(str(aggregate[metric][1])) for metric in CrossValidation.METRICS))
+    results_file.write("\n" + '{0:#<61}'.format(''))
+    results_file.close()
+
+    for (name, metric) in (('Precision:', "precision"), ('Recall:', "recall"), ('F-measure:', "f_measure")):
+        print('{0:20}{1:<24}{2}'.format(name, str(100 * aggregate[metric][0]),
+                                        "+/- " + str(100 * aggregate[metric][1])))
+
+
+def search_crf_parameters(preprocessing_obj, template, directory, error_marker, correct_marker, a_values, c_values,
+                          f_values, mode, jobs, cpu_budget, log_file, min_iterations, max_iterations,
+                          validation_fraction):
+
+    # The settings are compared on a validation set drawn from the training sentences, so the test set is left for
+    # the final model only. The state of the 'random' module is restored after the validation set has been drawn, so
+    # the rest of the run does not depend on whether the parameters have been searched.
+    state = random.getstate()
+    training_obj, validation_obj = preprocessing_obj.split(validation_fraction, 11)
+    random.setstate(state)
+    training = os.path.join(directory, "search_train")
+    validation = os.path.join(directory, "search_validation")
+    format_crf_pp_file_no_pos_tags(training, training_obj, error_marker, correct_marker)
+    format_crf_pp_file_no_pos_tags(validation, validation_obj, error_marker, correct_marker)
+
+    search = HyperparameterSearch(template, training, validation, os.path.join(directory, "search"), error_marker,
+                                  jobs, cpu_budget, log_file)
+    if re.match("[hH][aA][lL][vV][iI][nN][gG]$", mode):
+        ranked = search.successive_halving(a_values, c_values, f_values, min_iterations, max_iterations)
+    else:
+        ranked = search.grid(a_values, c_values, f_values)
+
+    if not ranked:
+        print("No setting of the CRF++ parameters could be trained! Exiting the system")
+        sys.exit(1)
 
-    random.seed(10)
-    sentences = list()
-    for i in range(0, test_size):
-        sentences.append(preprocess_obj.pop_sentence(random.randint(0, length - 1)))
-        length -= 1
+    print('{0:12}{1:<16}{2:<8}{3:<12}{4}'.format('A', 'C', 'F', 'ITERATIONS', 'OBJECTIVE'))
+    for trial in ranked:
+        print('{0:12}{1:<16}{2:<8}{3:<12}{4}'.format(trial["a"], str(trial["c"]), str(trial["f"]),
+                                                     str(trial["iterations"]), str(trial["objective"])))
 
-    return Preprocessor(sentences)
+    return ranked[0]["a"], ranked[0]["c"], ranked[0]["f"]
 
 if __name__ == "__main__":
 
@@ -141,7 +137,10 @@ if __name__ == "__main__":
     crf_test_with_prob = None; crf_result_file = None; corpus_training_sentences = None; corpus_test_sentences = None;
     corpus_vocab = None; corpus_training_errors = None; corpus_test_errors = None; uncertain_file = None;
     crf_uncertainty_threshold = None; error_label = None; correct_label = None; training_error_every = None;
-    testing_error_every = None; percentage_of_test_set = None
+    testing_error_every = None; percentage_of_test_set = None; workers = None; confusion_sets_file = None
+    search_mode = "GRID"; search_jobs = "1"; search_cpu_budget = ""; search_log_file = None
+    search_min_iterations = "10"; search_max_iterations = "1000"; search_validation_set = "0.20"
+    cross_validation_folds = "0"; crf_test_in_process = "False"
     #
     # Read configuration file
     config_file = open("config.cfg", "rt", encoding="utf-8")
@@ -201,10 +200,75 @@ if __name__ == "__main__":
             testing_error_every = value.strip()
         elif re.match('PERCENTAGE_OF_TEST_SET$', var):
             percentage_of_test_set = value.strip()
+        elif re.match('WORKERS$', var):
+            workers = value.strip()
+        elif re.match('CONFUSION_SETS_FILE$', var):
+            confusion_sets_file = value.strip()
+        elif re.match('CRF_SEARCH_MODE$', var):
+            search_mode = value.strip()
+        elif re.match('CRF_SEARCH_JOBS$', var):
+            search_jobs = value.strip()
+        elif re.match('CRF_SEARCH_CPU_BUDGET$', var):
+            search_cpu_budget = value.strip()
+        elif re.match('CRF_SEARCH_LOG_FILE$', var):
+            search_log_file = value.strip()
+        elif re.match('CRF_SEARCH_MIN_ITERATIONS$', var):
+            search_min_iterations = value.strip()
+        elif re.match('CRF_SEARCH_MAX_ITERATIONS$', var):
+            search_max_iterations = value.strip()
+        elif re.match('CRF_SEARCH_VALIDATION_SET$', var):
+            search_validation_set = value.strip()
+        elif re.match('CROSS_VALIDATION_FOLDS$', var):
+            cross_validation_folds = value.strip()
+        elif re.match('CRF_TEST_IN_PROCESS$', var):
+            crf_test_in_process = value.strip()
 
     config_file.close()
 
 
+    if workers is not None and re.match('[0-9]+$', workers) and int(workers) > 0:
+        workers = int(workers)
+    else:
+        workers = 1
+        print("Unknown number of worker processes, setting it to the default value: 1")
+
+    # Set the CRF++ parameters. Each parameter can have a comma-separated list of values, in which case the best
+    # setting is searched for.
+    a_values = list()
+    for value in a.split(','):
+        if re.match('CRF-L1$', value.strip()):
+            value = 'CRF-L1'
+        elif re.match('CRF-L2$', value.strip()):
+            value = 'CRF-L2'
+        else:
+            print("Unknown CRF++ 'a' option, setting 'a' to the default value: CRF-L2")
+            value = 'CRF-L2'
+        if value not in a_values:
+            a_values.append(value)
+
+    c_values = list()
+    for value in c.split(','):
+        # Match float or int
+        if re.match(r'[0-9]+(\.[0-9])?[0-9]*', value.strip()):
+            value = float(value)
+        else:
+            value = 1
+            print("Unknown CRF++ 'c' option, setting it to the default value: 1.0")
+        if value not in c_values:
+            c_values.append(value)
+
+    f_values = list()
+    for value in f.split(','):
+        if re.match('[0-9]+', value.strip()):                       # match integer value
+            value = int(value)
+        else:
+            value = 1
+            print("Unknown CRF++ 'f' option, setting it to the default value: 1")
+        if value not in f_values:
+            f_values.append(value)
+
+    (a, c, f) = (a_values[0], c_values[0], f_values[0])
+
     # delete previous files
     print("Deleting previous output files.")
     if os.path.exists(destination):
@@ -215,23 +279,32 @@ if __name__ == "__main__":
     p = Preprocessor()
     if re.match("[xX][mM][lL]$", corpus_mode):                                  # If xml mode is triggered
         p.set_xml_path_and_corpus_path(source, destination)
-        p.remove_xml_tags()
+        p.remove_xml_tags(workers)
     elif re.match("[pP][lL][aA][iI][nN]$", corpus_mode):                        # If plain mode is triggered
         p.set_corpus_path(source)
     else:
         print("Unknown corpus mode! Corpus mode has to be either 'XML' or 'PLAIN'. Exiting the system")
         sys.exit(1)
 
-    p.load_corpus_sentences()                                                   # load corpus
+    p.load_corpus_sentences(workers)                                            # load corpus
     print ("Number of sentences in general = " + str(len(p.get_sentences())))
 
+    # In the cross-validation mode, the results are aggregated over the folds instead of being measured on one
+    # random test set.
+    if re.match('[0-9]+$', cross_validation_folds) and int(cross_validation_folds) > 1:
+        if len(a_values) * len(c_values) * len(f_values) > 1:
+            print("Only one setting of the CRF++ parameters can be cross-validated. Using the first setting: a = " +
+                  a + ", c = " + str(c) + " and f = " + str(f))
+        cross_validate(p, int(cross_validation_folds), crf_template_file, destination, crf_train_file, crf_test_file,
+                       error_label, correct_label, a, c, f, confusion_sets_file or None, workers)
+        sys.exit(0)
+
 
 
     # Match a percentage value
     if re.match('[0]\.[0-9][0-9]*', percentage_of_test_set):
         # Create the test set by extracting some sentences from 'p' object.
-        test_obj = extract_random_sentences(p, float(percentage_of_test_set))
-        test_obj.set_words_list(p.get_words_list())
+        p, test_obj = extract_random_sentences(p, float(percentage_of_test_set))
     else:
         print("The percentage of the test set is unacceptable! Exiting the system")
         sys.exit(1)
@@ -242,9 +315,12 @@ if __name__ == "__main__":
     if re.match('[0-9]+', training_error_every) and re.match('[0-9]+', testing_error_every):
         training_error_every = int(training_error_every)
         testing_error_every = int(testing_error_every)
-        p.put_errors_in_n_words_from_list(p.get_vocabulary())
-        #test_obj.put_errors_in_n_words_with_distance_from_list(p.get_vocabulary())
-        test_obj.put_errors_in_n_words_from_list(p.get_vocabulary())
+        # The confusion sets of the words list are computed once (or loaded from the file if they have been computed
+        # from the same vocabulary before) and used for both sets.
+        catalog = ConfusionSetCatalog(p.get_vocabulary(), p.get_words_list(), confusion_sets_file or None)
+        p.put_errors_in_n_words_from_list(p.get_vocabulary(), workers=workers, catalog=catalog)
+        #test_obj.put_errors_in_n_words_with_distance_from_list(p.get_vocabulary(), catalog=catalog)
+        test_obj.put_errors_in_n_words_from_list(p.get_vocabulary(), workers=workers, catalog=catalog)
     else:
         print("The value of the variable 'ERRORS_IN_EVERY' is unacceptable! It has to be an integer number. "
               "Exiting the system")
@@ -263,41 +339,48 @@ if __name__ == "__main__":
         test_obj.write_errors(corpus_test_errors)
 
     crf = CRFPlusPlusInterface(error_label)                                     # Create the CRF++ object
-    # Set the CRF++ parameters
-    if re.match('CRF-L1$', a):
-        a = 'CRF-L1'
-    elif re.match('CRF-L2$', a):
-        a = 'CRF-L2'
-    else:
-        print("Unknown CRF++ 'a' option, setting 'a' to the default value: CRF-L2")
-        a = 'CRF-L2'
-
-    # Match float or int
-    if re.match('[0-9]+(\.[0-9])?[0-9]*', c):
-        c = float(c)
-    else:
-        c = 1
-        print("Unknown CRF++ 'c' option, setting it to the default value: 1.0")
-    if re.match('[0-9]+', f):                                       # match integer value
-        f = int(f)
-    else:
-        f = 1
-        print("Unknown CRF++ 'f' option, setting it to the default value: 1")
-
     # Format the training and testing sentences to be fed to the CRF++
-    #format_crf_pp_file_semantic_features(crf_train_file, p, error_label, correct_label)
-    #format_crf_pp_file_semantic_features(crf_test_file, test_obj, error_label, correct_label)
+    #stemming = StemmingService("stems_cache.txt")
+    #format_crf_pp_file_pos_tags(crf_train_file, p, error_label, correct_label, stemming)
+    #format_crf_pp_file_pos_tags(crf_test_file, test_obj, error_label, correct_label, stemming)
+    #stemming.save()
+    #semantic_table = SemanticCategoryTable()
+    #semantic_table.load("semantic_categories.txt")
+    #semantic_table.build(p.get_vocabulary())
+    #semantic_table.save("semantic_categories.txt")
+    #format_crf_pp_file_semantic_features(crf_train_file, p, error_label, correct_label, semantic_table)
+    #format_crf_pp_file_semantic_features(crf_test_file, test_obj, error_label, correct_label, semantic_table)
     format_crf_pp_file_no_pos_tags(crf_train_file, p, error_label, correct_label)
     format_crf_pp_file_no_pos_tags(crf_test_file, test_obj, error_label, correct_label)
+    # Search for the best setting of the CRF++ parameters if more than one value is given
+    if len(a_values) * len(c_values) * len(f_values) > 1:
+        if not (re.match('[0-9]+$', search_jobs) and int(search_jobs) > 0):
+            print("Unknown number of search jobs, setting it to the default value: 1")
+            search_jobs = "1"
+        if not re.match('[0-9]+$', search_min_iterations) or not re.match('[0-9]+$', search_max_iterations):
+            print("Unknown number of search iterations, setting them to the default values: 10 and 1000")
+            (search_min_iterations, search_max_iterations) = ("10", "1000")
+        if not re.match(r'0\.[0-9]+', search_validation_set):
+            print("Unknown fraction of the validation set, setting it to the default value: 0.20")
+            search_validation_set = "0.20"
+        (a, c, f) = search_crf_parameters(p, crf_template_file, destination, error_label, correct_label, a_values,
+                                          c_values, f_values, search_mode, int(search_jobs),
+                                          int(search_cpu_budget) if re.match('[0-9]+$', search_cpu_budget) else None,
+                                          search_log_file or None, int(search_min_iterations),
+                                          int(search_max_iterations), float(search_validation_set))
+        print("The best setting of the CRF++ parameters: a = " + a + ", c = " + str(c) + " and f = " + str(f))
     # Train CRF++
     if os.path.isfile(crf_template_file) or os.path.isfile(crf_train_file) or os.path.isfile(crf_test_file):
-        crf.train(crf_template_file, crf_train_file, crf_model_file, a, c, f)
+        crf.train(crf_template_file, crf_train_file, crf_model_file, a, c, f,
+                  text_model=re.match('[tT][rR][uU][eE]$', crf_test_in_process) is not None)
     else:
         print("Training, test or template file is missing! Exiting the system")
         sys.exit(1)
     # Test CRF++
+    # The model is loaded once into a decoder in this process if the test is not to be done by 'crf_test'
+    decoder = CRFDecoder(crf_model_file + ".txt") if re.match('[tT][rR][uU][eE]$', crf_test_in_process) else None
     if re.match('[tT][rR][uU][eU]$', crf_test_with_prob):
-        crf.test(crf_test_file, crf_result_file, crf_model_file, True)
+        crf.test(crf_test_file, crf_result_file, crf_model_file, True, decoder)
         if re.match('[0]\.[5-9][0-9]*', crf_uncertainty_threshold):
             uncertainty = float(crf_uncertainty_threshold)
             crf.write_lines_for_tokens_with_assignment_less_than(uncertainty, uncertain_file)
@@ -305,7 +388,7 @@ if __name__ == "__main__":
             print("The value of the 'CRF_UNCERTAINTY_THRESHOLD' parameter is unacceptable! A file with uncertainty "
                   "labeling will not be generated.")
     else:
-        crf.test(crf_test_file, crf_result_file, crf_model_file)
+        crf.test(crf_test_file, crf_result_file, crf_model_file, decoder=decoder)
     # Show results
     results = open("final_result.txt", 'a+', encoding="utf-8")
 
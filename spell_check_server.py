@@ -0,0 +1,103 @@
+import re
+import sys
+import asyncio
+from context_sensitive_spell_chk.crf_decoder import CRFDecoder
+from context_sensitive_spell_chk.numpy_crf import HashedCRFModel
+from context_sensitive_spell_chk.spell_check_service import SpellCheckService
+
+
+async def serve(service, host, port, stats_interval):
+
+    # The statistics are printed every 'stats_interval' seconds until the service is interrupted
+    await service.start(host, port)
+    try:
+        while True:
+            await asyncio.sleep(stats_interval if stats_interval > 0 else 3600)
+            if stats_interval > 0:
+                print_statistics(service)
+    finally:
+        await service.stop()
+
+
+def print_statistics(service):
+
+    statistics = service.get_statistics()
+    print("Requests: " + str(statistics["requests"]) + ", sentences: " + str(statistics["sentences"]) +
+          ", batches: " + str(statistics["batches"]) + " (" + "%.1f" % statistics["mean_batch_size"] +
+          " sentences per batch)")
+    if statistics["latency_p50_ms"] is not None:
+        print("Latency p50: " + "%.2f" % statistics["latency_p50_ms"] + " ms, p99: " +
+              "%.2f" % statistics["latency_p99_ms"] + " ms, throughput: " +
+              "%.1f" % statistics["requests_per_second"] + " requests/s, " +
+              "%.1f" % statistics["sentences_per_second"] + " sentences/s")
+
+
+if __name__ == "__main__":
+
+    # initialisation
+    crf_model_file = None; error_label = None; service_backend = "CRF_TEST"; service_host = "127.0.0.1"
+    service_port = "8765"; service_max_batch_size = "32"; service_max_batch_delay = "5"
+    service_stats_interval = "60"
+    #
+    # Read configuration file
+    config_file = open("config.cfg", "rt", encoding="utf-8")
+    for line in config_file:
+        # If comment or empty line in the configuration file then skip
+        if re.match('#', line) or re.match(r'\s*$', line):
+            continue
+        # Set variables
+        [var, value] = line.split('=')
+        if re.match('CRF_MODEL_FILE$', var):
+            crf_model_file = value.strip()
+        elif re.match('SPELLING_ERROR_LABEL$', var):
+            error_label = value.strip()
+        elif re.match('SERVICE_BACKEND$', var):
+            service_backend = value.strip()
+        elif re.match('SERVICE_HOST$', var):
+            service_host = value.strip()
+        elif re.match('SERVICE_PORT$', var):
+            service_port = value.strip()
+        elif re.match('SERVICE_MAX_BATCH_SIZE$', var):
+            service_max_batch_size = value.strip()
+        elif re.match('SERVICE_MAX_BATCH_DELAY$', var):
+            service_max_batch_delay = value.strip()
+        elif re.match('SERVICE_STATS_INTERVAL$', var):
+            service_stats_interval = value.strip()
+
+    config_file.close()
+
+    if not re.match('[0-9]+$', service_port):
+        print("The port of the service is unacceptable! Exiting the system")
+        sys.exit(1)
+    if not re.match('[0-9]+$', service_max_batch_size) or int(service_max_batch_size) < 1:
+        print("Unknown batch size, setting it to the default value: 32")
+        service_max_batch_size = "32"
+    if not re.match(r'[0-9]+(\.[0-9]*)?$', service_max_batch_delay):
+        print("Unknown batch delay, setting it to the default value: 5")
+        service_max_batch_delay = "5"
+    if not re.match('[0-9]+$', service_stats_interval):
+        print("Unknown interval of the statistics, setting it to the default value: 60")
+        service_stats_interval = "60"
+
+    # The model is loaded once: as a CRF++ text model or a numpy model in this process, or left to 'crf_test'
+    decoder = None
+    try:
+        if re.match('[iI][nN][-_][pP][rR][oO][cC][eE][sS][sS]$', service_backend):
+            decoder = CRFDecoder(crf_model_file + ".txt")
+        elif re.match('[nN][uU][mM][pP][yY]$', service_backend):
+            decoder = HashedCRFModel.load(crf_model_file)
+        elif not re.match('[cC][rR][fF][-_][tT][eE][sS][tT]$', service_backend):
+            print("Unknown backend of the service! It has to be 'CRF_TEST', 'IN_PROCESS' or 'NUMPY'. Exiting the "
+                  "system")
+            sys.exit(1)
+
+        service = SpellCheckService(error_label, decoder, crf_model_file, max_batch_size=int(service_max_batch_size),
+                                    max_delay=float(service_max_batch_delay) / 1000)
+    except ValueError as err:
+        print("ERROR: " + format(err) + " Exiting the system")
+        sys.exit(1)
+    try:
+        asyncio.run(serve(service, service_host, int(service_port), int(service_stats_interval)))
+    except KeyboardInterrupt:
+        print("The service has been stopped.")
+        print_statistics(service)
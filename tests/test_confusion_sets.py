@@ -0,0 +1,85 @@
+"""
+This script checks that 'ConfusionSetCatalog' reuses the confusion sets kept in its cache file only if they have been
+computed from the same vocabulary. It is run from the main directory as follows:
+
+    python3 -m unittest tests.test_confusion_sets
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from context_sensitive_spell_chk.confusion_sets import ConfusionSetCatalog
+
+
+class ConfusionSetCatalogTest(unittest.TestCase):
+
+    VOCABULARY = ["cat", "car", "bat", "cart", "at", "dog", "dot", "do"]
+    WORDS_LIST = ["cat", "dog"]
+
+    def setUp(self):
+
+        self.directory = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.directory, "confusion_sets.txt")
+
+    def tearDown(self):
+
+        shutil.rmtree(self.directory)
+
+    def read_cache(self):
+
+        f = open(self.cache_file, 'rt', encoding="utf-8")
+        lines = f.read().split("\n")
+        f.close()
+
+        return lines
+
+    def write_cache(self, lines):
+
+        f = open(self.cache_file, 'wt', encoding="utf-8")
+        f.write("\n".join(lines))
+        f.close()
+
+    def test_confusion_sets(self):
+
+        catalog = ConfusionSetCatalog(self.VOCABULARY, self.WORDS_LIST)
+        self.assertEqual(len(catalog), 2)
+        self.assertIn("cat", catalog)
+        self.assertEqual(catalog.get_confusion_set("cat"), ("at", "bat", "car", "cart"))
+        self.assertEqual(catalog.get_confusion_set("dog"), ("do", "dot"))
+        self.assertEqual(catalog.get_confusion_set("cot"), ("cat", "dot"))          # not kept, but computed
+
+    def test_cache_reused_for_the_same_vocabulary(self):
+
+        catalog = ConfusionSetCatalog(self.VOCABULARY, self.WORDS_LIST, self.cache_file)
+        lines = self.read_cache()
+        self.assertEqual(lines[0], "# " + catalog.get_key())
+        self.assertEqual(catalog.get_key(), ConfusionSetCatalog.get_vocabulary_key(reversed(self.VOCABULARY)))
+
+        # The sets are read from the file: a set changed in the file is returned as it is
+        self.write_cache([line.replace("at bat car cart", "bat") for line in lines])
+        catalog = ConfusionSetCatalog(list(reversed(self.VOCABULARY)), self.WORDS_LIST, self.cache_file)
+        self.assertEqual(catalog.get_confusion_set("cat"), ("bat",))
+
+        # A word which is not in the file is added to it
+        catalog = ConfusionSetCatalog(self.VOCABULARY, self.WORDS_LIST + ["bat"], self.cache_file)
+        self.assertEqual(catalog.get_confusion_set("cat"), ("bat",))
+        self.assertEqual(catalog.get_confusion_set("bat"), ("at", "cat"))
+        self.assertIn("bat\tat cat\t", "\n".join(self.read_cache()))
+
+    def test_cache_rebuilt_for_another_vocabulary(self):
+
+        catalog = ConfusionSetCatalog(self.VOCABULARY, self.WORDS_LIST, self.cache_file)
+        key = catalog.get_key()
+        self.write_cache([line.replace("at bat car cart", "bat") for line in self.read_cache()])
+
+        catalog = ConfusionSetCatalog(self.VOCABULARY + ["hat"], self.WORDS_LIST, self.cache_file)
+        self.assertNotEqual(catalog.get_key(), key)
+        self.assertEqual(catalog.get_confusion_set("cat"), ("at", "bat", "car", "cart", "hat"))
+        lines = self.read_cache()
+        self.assertEqual(lines[0], "# " + catalog.get_key())
+        self.assertIn("cat\tat bat car cart hat\t", "\n".join(lines))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+This script checks that 'CRFDecoder' labels a CRF++ file as 'crf_test -v1' does. The text model in tests/data has the
+format written by 'crf_learn -t', and the expected result has the format of 'crf_test -v1'. It is run from the main
+directory as follows:
+
+    python3 -m unittest tests.test_crf_decoder
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from context_sensitive_spell_chk.crf_decoder import CRFDecoder
+
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+class CRFDecoderTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.mkdtemp()
+        self.model = os.path.join(DATA_DIRECTORY, "crf_model.txt")
+        self.test_file = os.path.join(DATA_DIRECTORY, "crf_test.txt")
+
+    def tearDown(self):
+
+        shutil.rmtree(self.directory)
+
+    @staticmethod
+    def read_lines(file_name):
+
+        f = open(file_name, 'rt', encoding="utf-8")
+        lines = f.read().splitlines()
+        f.close()
+
+        return lines
+
+    def test_same_output_as_crf_test(self):
+
+        decoder = CRFDecoder(self.model)
+        self.assertEqual(decoder.get_labels(), ["0", "1", "2"])
+        self.assertEqual(decoder.get_xsize(), 1)
+
+        result = os.path.join(self.directory, "result.txt")
+        tokens = decoder.test(self.test_file, result, probabilities=True)
+        expected = self.read_lines(os.path.join(DATA_DIRECTORY, "crf_result.txt"))
+        self.assertEqual(self.read_lines(result), expected)
+
+        # The line numbers of the tokens are those of the result file
+        for (line_number, columns, label, probability) in tokens:
+            self.assertEqual(expected[line_number - 1], "\t".join(columns) + "\t" + label + "/" + "%g" % probability)
+
+    def test_labels_without_probabilities(self):
+
+        result = os.path.join(self.directory, "result.txt")
+        CRFDecoder(self.model).test(self.test_file, result)
+        expected = [line.rpartition("/")[0] for line in self.read_lines(os.path.join(DATA_DIRECTORY, "crf_result.txt"))
+                    if not line.startswith("#")]
+        self.assertEqual(self.read_lines(result), expected)
+
+    def test_model_cut_off(self):
+
+        lines = self.read_lines(self.model)
+        model = os.path.join(self.directory, "model.txt")
+        f = open(model, 'wt', encoding="utf-8")
+        f.write("\n".join(lines[:-2]) + "\n")
+        f.close()
+
+        with self.assertRaises(ValueError):
+            CRFDecoder(model)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+This script checks that the folds of 'Preprocessor.k_fold_split' partition the sentences, and the aggregation of the
+metrics of the folds by 'CrossValidation'. It is run from the main directory as follows:
+
+    python3 -m unittest tests.test_cross_validation
+"""
+
+import unittest
+from context_sensitive_spell_chk.preprocessing import Preprocessor
+from context_sensitive_spell_chk.cross_validation import CrossValidation
+
+
+class KFoldSplitTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.sentences = [("word" + str(n) + " is here", ".") for n in range(23)]
+
+    def get_folds(self, k, seed=10):
+
+        folds = list()
+        for (training_obj, test_obj) in Preprocessor(self.sentences).k_fold_split(k, seed):
+            folds.append(([tuple(sentence) for sentence in training_obj.get_sentences()],
+                          [tuple(sentence) for sentence in test_obj.get_sentences()]))
+
+        return folds
+
+    def test_folds_partition_the_sentences(self):
+
+        for k in (2, 5, 23):
+            folds = self.get_folds(k)
+            self.assertEqual(len(folds), k)
+
+            tested = [sentence for (_, test) in folds for sentence in test]
+            self.assertEqual(len(tested), len(self.sentences))
+            self.assertEqual(set(tested), set(self.sentences))
+
+            sizes = [len(test) for (_, test) in folds]
+            self.assertLessEqual(max(sizes) - min(sizes), 1)
+
+            for (training, test) in folds:
+                # Both keep the original order, and the training sentences are all the others
+                self.assertEqual(test, [sentence for sentence in self.sentences if sentence in test])
+                self.assertEqual(training, [sentence for sentence in self.sentences if sentence not in test])
+
+    def test_same_folds_for_the_same_seed(self):
+
+        self.assertEqual(self.get_folds(5, 3), self.get_folds(5, 3))
+        self.assertNotEqual(self.get_folds(5, 3), self.get_folds(5, 4))
+
+    def test_errors_follow_their_sentences(self):
+
+        p = Preprocessor(self.sentences)
+        p.set_words_list(["is"])
+        p.build_vocabulary()
+        p.put_errors_in_n_words_from_list(["is", "in", "it"], 1, 7)
+        errors = {(p.get_sentence_words(sent_num)[0], pos): error for (sent_num, pos), error in p.get_errors().items()}
+        self.assertTrue(errors)
+
+        for (training_obj, test_obj) in p.k_fold_split(4):
+            for obj in (training_obj, test_obj):
+                for (sent_num, pos), error in obj.get_errors().items():
+                    self.assertEqual(errors[(obj.get_sentence_words(sent_num)[0], pos)], error)
+
+
+class AggregateTest(unittest.TestCase):
+
+    def test_aggregate(self):
+
+        results = [{metric: 0.5 for metric in CrossValidation.METRICS}, None,
+                   {metric: 1.0 for metric in CrossValidation.METRICS}]
+        aggregate = CrossValidation.aggregate(results)
+        for metric in CrossValidation.METRICS:
+            self.assertAlmostEqual(aggregate[metric][0], 0.75)
+            self.assertAlmostEqual(aggregate[metric][1], 0.5 ** 0.5 / 2)
+
+        self.assertEqual(CrossValidation.aggregate([results[0]])[CrossValidation.METRICS[0]], (0.5, 0))
+        self.assertIsNone(CrossValidation.aggregate([None]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+This script checks that 'ErrorInjector' chooses the same errors for the same seed whatever the number of worker
+processes is. It is run from the main directory as follows:
+
+    python3 -m unittest tests.test_error_injection
+"""
+
+import random
+import itertools
+import unittest
+from context_sensitive_spell_chk.preprocessing import Preprocessor
+from context_sensitive_spell_chk.error_injection import ErrorInjector
+
+
+class ErrorInjectorTest(unittest.TestCase):
+
+    def setUp(self):
+
+        # The words are made of three letters, so most of them are one edit from many others
+        words = [''.join(letters) for letters in itertools.product("abcd", repeat=3)]
+        generator = random.Random(5)
+        self.sentences = [(' '.join(generator.choice(words) for _ in range(generator.randint(3, 9))), ".")
+                          for _ in range(600)]
+        self.words_list = words[::7]
+        self.shard_size = ErrorInjector.SHARD_SIZE
+        ErrorInjector.SHARD_SIZE = 16                       # so that the groups are shared between the workers
+
+    def tearDown(self):
+
+        ErrorInjector.SHARD_SIZE = self.shard_size
+
+    def put_errors(self, every_n_words, seed, workers):
+
+        p = Preprocessor(self.sentences)
+        p.set_words_list(self.words_list)
+        p.build_vocabulary()
+        if every_n_words:
+            p.put_errors_in_n_words_with_distance_from_list(p.get_vocabulary(), 20, 1, seed, workers)
+        else:
+            p.put_errors_in_n_words_from_list(p.get_vocabulary(), 1, seed, workers)
+
+        return p.get_errors(), [p.get_sentence_words(sent_num) for sent_num in range(len(self.sentences))]
+
+    def test_same_errors_for_any_number_of_workers(self):
+
+        for every_n_words in (False, True):
+            (errors, sentences) = self.put_errors(every_n_words, 17, 1)
+            self.assertTrue(errors)
+            for workers in (2, 3):
+                self.assertEqual(self.put_errors(every_n_words, 17, workers), (errors, sentences))
+            self.assertNotEqual(self.put_errors(every_n_words, 18, 1)[0], errors)
+
+    def test_group_seed(self):
+
+        self.assertEqual(ErrorInjector.get_group_seed(17, 3), ErrorInjector.get_group_seed(17, 3))
+        self.assertNotEqual(ErrorInjector.get_group_seed(17, 3), ErrorInjector.get_group_seed(17, 4))
+        self.assertLess(ErrorInjector.get_group_seed(17, 3), 2 ** 64)
+
+
+if __name__ == '__main__':
+    unittest.main()
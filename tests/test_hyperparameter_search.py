@@ -0,0 +1,126 @@
+"""
+This script checks that 'HyperparameterSearch' resumed from its log does not run again the trials in it. CRF++ is
+replaced by stubs of 'crf_learn' and 'crf_test'. It is run from the main directory as follows:
+
+    python3 -m unittest tests.test_hyperparameter_search
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from context_sensitive_spell_chk.hyperparameter_search import HyperparameterSearch
+
+
+# The stub of 'crf_learn' logs its arguments, and its model is the value of 'c'. Without arguments, it writes the
+# banner by which CRF++ is detected.
+CRF_LEARN_STUB = """
+import os, sys
+args = sys.argv[1:]
+if not args:
+    print("CRF++: Yet Another CRF Tool Kit")
+    sys.exit(1)
+f = open(os.path.join(os.path.dirname(sys.argv[0]), "calls.txt"), "at")
+f.write(" ".join(args) + "\\n")
+f.close()
+f = open(args[-1], "wt")
+f.write(args[args.index("-c") + 1])
+f.close()
+"""
+# The stub of 'crf_test' labels every token with its correct label if c >= 10, and with '0' otherwise
+CRF_TEST_STUB = """
+import sys
+args = sys.argv[1:]
+c = float(open(args[args.index("-m") + 1]).read())
+for line in open(args[-1], encoding="utf-8"):
+    line = line.rstrip("\\n")
+    print(line + "\\t" + (line.split("\\t")[-1] if c >= 10 else "0") if line else "")
+"""
+
+
+class HyperparameterSearchTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.mkdtemp()
+        bin_dir = os.path.join(self.directory, "bin")
+        os.mkdir(bin_dir)
+        for (name, script) in (("crf_learn", CRF_LEARN_STUB), ("crf_test", CRF_TEST_STUB)):
+            self.write(os.path.join(bin_dir, name), "#!" + sys.executable + "\n" + script)
+            os.chmod(os.path.join(bin_dir, name), 0o755)
+        self.calls = os.path.join(bin_dir, "calls.txt")
+        self.path = os.environ["PATH"]
+        os.environ["PATH"] = bin_dir + os.pathsep + self.path
+
+        self.template = os.path.join(self.directory, "template")
+        self.training = os.path.join(self.directory, "training")
+        self.validation = os.path.join(self.directory, "validation")
+        self.log = os.path.join(self.directory, "log.jsonl")
+        self.write(self.template, "U00:%x[0,0]\n")
+        self.write(self.training, "a\t0\nb\t1\n\nc\t0\n")
+        self.write(self.validation, "a\t1\nb\t0\n\nc\t1\n")
+
+    def tearDown(self):
+
+        os.environ["PATH"] = self.path
+        shutil.rmtree(self.directory)
+
+    @staticmethod
+    def write(file_name, text):
+
+        f = open(file_name, 'wt', encoding="utf-8")
+        f.write(text)
+        f.close()
+
+    def read_lines(self, file_name):
+
+        if not os.path.isfile(file_name):
+            return list()
+        f = open(file_name, 'rt', encoding="utf-8")
+        lines = f.read().splitlines()
+        f.close()
+
+        return lines
+
+    def search(self, c_values, jobs=1):
+
+        search = HyperparameterSearch(self.template, self.training, self.validation,
+                                      os.path.join(self.directory, "models"), "1", jobs=jobs, cpu_budget=2,
+                                      log_file=self.log)
+        return search.grid(["CRF-L2"], c_values, [1])
+
+    def test_resume(self):
+
+        trials = self.search([1, 10])
+        self.assertEqual([trial["c"] for trial in trials], [10.0, 1.0])
+        self.assertEqual(trials[0]["objective"], 1.0)
+        self.assertEqual(len(self.read_lines(self.calls)), 2)
+
+        # The search is interrupted after the first trial has been logged, while the second is being written
+        lines = self.read_lines(self.log)
+        self.assertEqual(len(lines), 2)
+        self.write(self.log, lines[0] + "\n" + lines[1][:20])
+        logged = 1.0 if '"c": 1.0' in lines[0] else 10.0
+
+        trials = self.search([1, 10, 100], jobs=2)
+        self.assertEqual(sorted(trial["c"] for trial in trials), [1.0, 10.0, 100.0])
+        calls = self.read_lines(self.calls)[2:]
+        self.assertEqual(len(calls), 2)
+        self.assertFalse(any(" -c " + str(logged) + " " in call for call in calls))
+
+        # Everything is in the log now
+        self.search([1, 10, 100])
+        self.assertEqual(len(self.read_lines(self.calls)), 4)
+
+    def test_log_of_other_data_not_used(self):
+
+        self.search([1])
+        self.write(self.validation, "a\t1\nb\t1\n")
+        trials = self.search([1])
+        self.assertEqual(len(self.read_lines(self.calls)), 2)
+        self.assertEqual(len(trials), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
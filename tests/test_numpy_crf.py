@@ -0,0 +1,144 @@
+"""
+This script checks the gradient of the objective function of 'NumpyCRFLearner' against finite differences, and trains,
+tests, saves and loads a small model. It is run from the main directory as follows:
+
+    python3 -m unittest tests.test_numpy_crf
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from context_sensitive_spell_chk.crf_decoder import CRFDecoder
+from context_sensitive_spell_chk.numpy_crf import HashedCRFModel, NumpyCRFLearner, _compute_shard
+
+
+TEMPLATES = ["U00:%x[-1,0]", "U01:%x[0,0]", "U02:%x[0,0]/%x[1,0]", "B"]
+
+
+class GradientTest(unittest.TestCase):
+
+    def setUp(self):
+
+        # Few buckets, so that features share them, and sentences of different lengths, so that they are padded
+        self.model = HashedCRFModel(TEMPLATES, ["0", "1", "2"], 1, hash_bits=4, bigram_hash_bits=2)
+        self.sentences = [(["a", "b", "c"], [0, 1, 2]), (["b"], [1]), (["c", "a", "d", "b", "a"], [2, 0, 0, 1, 1]),
+                          (["d", "d"], [0, 2])]
+        generator = np.random.RandomState(7)
+        self.weights = generator.uniform(-1, 1, self.model.get_number_of_weights())
+        (self.unigram_buckets, _) = self.model.get_buckets()
+
+    def compute(self, weights, shard_size):
+
+        sentences = [self.model.extract_features([[word] for word in words]) + (labels,)
+                     for (words, labels) in self.sentences]
+        loss = 0.0
+        gradient = np.zeros(len(weights))
+        for shard in NumpyCRFLearner.make_shards(sentences, shard_size):
+            (shard_loss, shard_gradient) = _compute_shard(weights, shard, 3, self.unigram_buckets)
+            loss += shard_loss
+            gradient += shard_gradient
+
+        return loss, gradient
+
+    def test_loss(self):
+
+        # The negative log-likelihood of each sentence, from the costs of the decoder
+        self.model.set_weights(self.weights)
+        expected = 0.0
+        for (words, labels) in self.sentences:
+            (unigram_costs, bigram_costs) = self.model.compute_costs([[word] for word in words])
+            (_, log_z) = CRFDecoder.forward_backward(unigram_costs, bigram_costs)
+            gold_cost = sum(unigram_costs[position, label] for (position, label) in enumerate(labels))
+            gold_cost += sum(bigram_costs[position, labels[position - 1], labels[position]]
+                             for position in range(1, len(labels)))
+            expected += log_z - gold_cost
+
+        for shard_size in (1, 2, 10):
+            self.assertAlmostEqual(self.compute(self.weights, shard_size)[0], expected, places=9)
+
+    def test_gradient(self):
+
+        (_, gradient) = self.compute(self.weights, 2)
+        step = 1e-5
+        differences = np.empty(len(self.weights))
+        for i in range(len(self.weights)):
+            weights = self.weights.copy()
+            weights[i] += step
+            higher = self.compute(weights, 2)[0]
+            weights[i] -= 2 * step
+            lower = self.compute(weights, 2)[0]
+            differences[i] = (higher - lower) / (2 * step)
+
+        self.assertTrue(np.any(gradient != 0))
+        self.assertLess(np.abs(gradient - differences).max(), 1e-9)
+
+
+class TrainTestTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.mkdtemp()
+        self.template = os.path.join(self.directory, "template")
+        self.training = os.path.join(self.directory, "training")
+        self.test_file = os.path.join(self.directory, "test")
+        self.model = os.path.join(self.directory, "model")
+        self.write(self.template, "\n".join(TEMPLATES) + "\n")
+
+        # The word 'x' is always an error
+        training = list()
+        for n in range(30):
+            words = ["w" + str((n * 7 + i) % 11) for i in range(n % 5 + 2)]
+            words[n % len(words)] = "x"
+            training.append("\n".join(word + "\t" + ("1" if word == "x" else "0") for word in words))
+        self.write(self.training, "\n\n".join(training) + "\n")
+        self.write(self.test_file, "w3\t0\nx\t1\nw5\t0\n\nx\t1\nw1\t0\n")
+
+    def tearDown(self):
+
+        shutil.rmtree(self.directory)
+
+    @staticmethod
+    def write(file_name, text):
+
+        f = open(file_name, 'wt', encoding="utf-8")
+        f.write(text)
+        f.close()
+
+    @staticmethod
+    def read(file_name):
+
+        f = open(file_name, 'rt', encoding="utf-8")
+        text = f.read()
+        f.close()
+
+        return text
+
+    def test_train_test_save_load(self):
+
+        for a in ("CRF-L2", "CRF-L1"):
+            learner = NumpyCRFLearner("1", hash_bits=8, bigram_hash_bits=4)
+            learner.train(self.template, self.training, self.model, a, 10, 1, max_iterations=200)
+            result = os.path.join(self.directory, "result_" + a)
+            learner.test(self.test_file, result, probabilities=True)
+            self.assertEqual(learner.get_correct_detections(), 2)
+            self.assertEqual(learner.get_incorrect_detections(), 0)
+            self.assertEqual(learner.get_total_errors(), 2)
+
+            # The model read from the file labels the sentences as the trained one
+            model = HashedCRFModel.load(self.model)
+            self.assertEqual(model.get_labels(), ["0", "1"])
+            self.assertEqual(model.get_xsize(), 1)
+            self.assertEqual(model.get_buckets(), (2 ** 8, 2 ** 4))
+            self.assertTrue(np.array_equal(model.get_weights(), learner.get_model().get_weights()))
+
+            loaded_result = os.path.join(self.directory, "loaded_result_" + a)
+            loaded = NumpyCRFLearner("1")
+            loaded.test(self.test_file, loaded_result, self.model, probabilities=True)
+            self.assertEqual(self.read(loaded_result), self.read(result))
+            self.assertEqual(loaded.get_correct_detections(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
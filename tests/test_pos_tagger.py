@@ -0,0 +1,83 @@
+"""
+This script checks 'POSTagger' against a stub of the tagger, and the alignment of its output with the words. It is
+run from the main directory as follows:
+
+    python3 -m unittest tests.test_pos_tagger
+"""
+
+import sys
+import unittest
+from context_sensitive_spell_chk.pos_tagger import POSTagger
+
+
+# Each word is tagged with the number of the sentence, so a sentence tagged twice gets other tags
+TAGGER_STUB = """
+import sys
+for (n, line) in enumerate(sys.stdin):
+    print(" ".join(word + "/T" + str(n) for word in line.split()), flush=True)
+"""
+
+
+class POSTaggerTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tagger = POSTagger([sys.executable, "-c", TAGGER_STUB])
+
+    def tearDown(self):
+
+        self.tagger.close()
+
+    def test_cache(self):
+
+        self.assertEqual(self.tagger.tag("a b"), "a/T0 b/T0")
+        self.assertEqual(self.tagger.tag_sentences(["c", "a b", "c\nd"]), ["c/T1", "a/T0 b/T0", "c/T2 d/T2"])
+        self.assertEqual(self.tagger.tag("a b"), "a/T0 b/T0")           # from the cache
+        self.assertEqual(self.tagger.tag(" \n "), "")                     # not sent to the tagger
+
+        self.tagger.clear_cache()
+        self.assertEqual(self.tagger.tag("a b"), "a/T3 b/T3")
+
+    def test_restart(self):
+
+        self.assertEqual(self.tagger.tag("a"), "a/T0")
+        self.tagger.close()
+        self.assertEqual(self.tagger.tag("a"), "a/T0")                    # from the cache
+        self.assertEqual(self.tagger.tag("b"), "b/T0")                    # by a new process
+
+    def test_stopped_tagger(self):
+
+        with POSTagger([sys.executable, "-c", "import sys"]) as tagger:
+            with self.assertRaises(IOError):
+                tagger.tag("a")
+
+
+class AlignTagsTest(unittest.TestCase):
+
+    def test_same_tokens(self):
+
+        # A repeated word gets the tag of its own occurrence
+        self.assertEqual(POSTagger.align_tags(["a", "b", "a"], "a/X b/Y a/Z"), ["X", "Y", "Z"])
+
+    def test_split_tokens(self):
+
+        # The tagger has split 'wal' into 'wa' and 'l'
+        self.assertEqual(POSTagger.align_tags(["wal", "kitab", "."], "wa/CC l/DT kitab/NN ./PUNC"),
+                         ["CC", "NN", "PUNC"])
+
+    def test_merged_tokens(self):
+
+        # The tagger has joined 'al' and 'kitab'
+        self.assertEqual(POSTagger.align_tags(["al", "kitab", "jadid"], "alkitab/NN jadid/JJ"), ["NN", "NN", "JJ"])
+
+    def test_skipped_and_unknown_tokens(self):
+
+        self.assertEqual(POSTagger.align_tags(["a", "b"], "x/1 a/X b/Y"), ["X", "Y"])
+        self.assertEqual(POSTagger.align_tags(["a", "zz", "b"], "a/X q/Q b/Y"), ["X", POSTagger.UNKNOWN_TAG, "Y"])
+        self.assertEqual(POSTagger.align_tags(["a", "b"], "x/1 y/2 a/X b/Y", lookahead=1),
+                         [POSTagger.UNKNOWN_TAG, POSTagger.UNKNOWN_TAG])
+        self.assertEqual(POSTagger.align_tags(["a", "b"], "", fallback="F"), ["F", "F"])
+
+
+if __name__ == '__main__':
+    unittest.main()
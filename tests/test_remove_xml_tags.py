@@ -0,0 +1,64 @@
+"""
+This script checks that 'Preprocessor.remove_xml_tags' ignores the text which is not in an xml document. It is run
+from the main directory as follows:
+
+    python3 -m unittest tests.test_remove_xml_tags
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from context_sensitive_spell_chk.preprocessing import Preprocessor
+
+
+class RemoveXMLTagsTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.mkdtemp()
+        self.xml_dir = os.path.join(self.directory, "xml")
+        self.corpus_dir = os.path.join(self.directory, "corpus")
+        os.mkdir(self.xml_dir)
+        os.mkdir(self.corpus_dir)
+
+    def tearDown(self):
+
+        shutil.rmtree(self.directory)
+
+    def write(self, name, text):
+
+        f = open(os.path.join(self.xml_dir, name), 'wt', encoding="utf-8")
+        f.write(text)
+        f.close()
+
+    def remove_xml_tags(self, workers):
+
+        p = Preprocessor()
+        p.set_xml_path_and_corpus_path(self.xml_dir, self.corpus_dir)
+        p.remove_xml_tags(workers)
+        f = open(os.path.join(self.corpus_dir, "a.txt"), 'rt', encoding="utf-8")
+        text = f.read()
+        f.close()
+
+        return text
+
+    def test_trailing_text_and_non_xml_file(self):
+
+        self.write("a.xml", "<DOC>\nfirst\n</DOC>\n<DOC>\nsecond\n</DOC>\nend of corpus\n")
+        self.write("readme.txt", "This directory has the xml files of the corpus.\n")
+        for workers in (1, 2):
+            text = self.remove_xml_tags(workers)
+            self.assertIn("first", text)
+            self.assertIn("second", text)
+            self.assertNotIn("end of corpus", text)
+
+    def test_malformed_document(self):
+
+        self.write("a.xml", "<DOC>\n<P>first\n</DOC>\n")
+        with self.assertRaises(SystemExit):
+            self.remove_xml_tags(1)
+
+
+if __name__ == '__main__':
+    unittest.main()
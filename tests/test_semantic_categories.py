@@ -0,0 +1,106 @@
+"""
+This script checks 'SemanticCategoryTable' and 'OntologyQuery' against stubs of the ontology answering the queries
+in a loop. It is run from the main directory as follows:
+
+    python3 -m unittest tests.test_semantic_categories
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from context_sensitive_spell_chk.semantic_categories import OntologyQuery, SemanticCategoryTable
+
+
+# The category of a word is the word reversed, and the words ending with 'x' are not in the ontology
+ONTOLOGY_STUB = """
+import sys
+for line in sys.stdin:
+    word = line.split("\\t")[0]
+    print("" if word.endswith("x") else "category " + word[::-1] + ",more", flush=True)
+"""
+# The category is the number of the query, so a query answered twice gets another category
+COUNTING_STUB = """
+import sys
+for (n, line) in enumerate(sys.stdin):
+    print("query " + str(n), flush=True)
+"""
+# The process answers one query and stops
+ONE_QUERY_STUB = """
+import sys
+print("category " + sys.stdin.readline().split("\\t")[0], flush=True)
+"""
+
+
+def stub(script):
+
+    return [sys.executable, "-c", script]
+
+
+class SemanticCategoryTableTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+
+        shutil.rmtree(self.directory)
+
+    def test_build_save_load(self):
+
+        ontology = OntologyQuery(stub(ONTOLOGY_STUB))
+        table = SemanticCategoryTable(ontology, stem=lambda word: word[:2])
+        table.build(["kitab", "qalam", "wax"])
+        ontology.close()
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.get_category("kitab"), "batik")
+        self.assertEqual(table.get_category("wax"), OntologyQuery.DEFAULT_CATEGORY)
+
+        file_name = os.path.join(self.directory, "categories.txt")
+        table.save(file_name)
+        f = open(file_name, 'rt', encoding="utf-8")
+        self.assertIn("qalam\tqa\tmalaq\n", f.read())
+        f.close()
+
+        # The loaded words are not queried again: the ontology of this table would fail
+        loaded = SemanticCategoryTable(OntologyQuery(stub("import sys")), stem=lambda word: word[:2])
+        self.assertTrue(loaded.load(file_name))
+        self.assertFalse(loaded.load(os.path.join(self.directory, "missing.txt")))
+        self.assertEqual(len(loaded), 3)
+        for word in ("kitab", "qalam", "wax"):
+            self.assertEqual(loaded.get_category(word), table.get_category(word))
+
+    def test_each_word_queried_once_by_one_process(self):
+
+        ontology = OntologyQuery(stub(COUNTING_STUB))
+        table = SemanticCategoryTable(ontology, stem=lambda word: word)
+        table.build(["a", "b"])
+        table.build(["b", "c"])
+        self.assertEqual([table.get_category(word) for word in ("a", "b", "c", "a")], ["0", "1", "2", "0"])
+        ontology.close()
+
+    def test_stopped_process_is_started_again(self):
+
+        ontology = OntologyQuery(stub(ONE_QUERY_STUB))
+        self.assertEqual(ontology.query("first", "fi"), "first")
+        self.assertEqual(ontology.query("second", "se"), "second")
+        ontology.close()
+
+    def test_process_which_does_not_answer(self):
+
+        ontology = OntologyQuery(stub("import sys"))
+        with self.assertRaises(IOError):
+            ontology.query("word", "wo")
+
+    def test_one_process_per_query(self):
+
+        ontology = OntologyQuery(stub("import sys; print('category ' + sys.argv[1])"), persistent=False)
+        self.assertEqual(ontology.query("word", "wo"), "word")
+        ontology = OntologyQuery(stub("import sys; sys.exit(1)"), persistent=False)
+        self.assertEqual(ontology.query("word", "wo"), OntologyQuery.DEFAULT_CATEGORY)
+
+
+if __name__ == '__main__':
+    unittest.main()
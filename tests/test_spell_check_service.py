@@ -0,0 +1,83 @@
+"""
+This script checks that 'SpellCheckService' refuses the models it cannot use, and checks texts with a stub of the
+decoder. It is run from the main directory as follows:
+
+    python3 -m unittest tests.test_spell_check_service
+"""
+
+import os
+import shutil
+import asyncio
+import tempfile
+import unittest
+from context_sensitive_spell_chk.spell_check_service import SpellCheckService
+
+
+class DecoderStub:
+
+    def __init__(self, xsize=1):
+
+        self.xsize = xsize
+        self.sentences = list()
+
+    def get_xsize(self):
+
+        return self.xsize
+
+    def tag(self, tokens, probabilities=False):
+
+        # The words which begin with 'x' are errors
+        self.sentences.append(tokens)
+        labels = ["1" if columns[0].startswith("x") else "0" for columns in tokens]
+        return labels, [0.75] * len(tokens), 0.5
+
+
+class SpellCheckServiceTest(unittest.TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+
+        shutil.rmtree(self.directory)
+
+    def test_models_refused(self):
+
+        with self.assertRaises(ValueError):
+            SpellCheckService("1")
+        with self.assertRaises(ValueError):
+            SpellCheckService("1", DecoderStub(2))
+
+        # For 'crf_test', the columns are read from the text model next to the model file
+        model = os.path.join(self.directory, "model")
+        SpellCheckService("1", model_file=model)
+        f = open(model + ".txt", 'wt', encoding="utf-8")
+        f.write("version: 100\ncost-factor: 1\nmaxid: 10\nxsize: 2\n\n0\n1\n")
+        f.close()
+        self.assertEqual(SpellCheckService.read_xsize(model + ".txt"), 2)
+        with self.assertRaises(ValueError):
+            SpellCheckService("1", model_file=model)
+
+    def test_check(self):
+
+        decoder = DecoderStub()
+        service = SpellCheckService("1", decoder, max_batch_size=4, max_delay=0.001)
+
+        async def check():
+            try:
+                return await service.check("xa b c. d xe")
+            finally:
+                await service.stop()
+
+        response = asyncio.run(check())
+        self.assertEqual([sentence["words"] for sentence in response], [["xa", "b", "c"], ["d", "xe"]])
+        self.assertEqual([sentence["errors"] for sentence in response],
+                         [[{"position": 0, "word": "xa", "probability": 0.75}],
+                          [{"position": 1, "word": "xe", "probability": 0.75}]])
+        self.assertTrue(all(len(columns) == 1 for tokens in decoder.sentences for columns in tokens))
+        self.assertEqual(service.get_statistics()["requests"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()